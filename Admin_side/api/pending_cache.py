@@ -0,0 +1,112 @@
+# Admin_side/api/pending_cache.py
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from controllers.cache_version_controller import PENDING_EVALUATIONS_VERSION, student_pending_version
+
+
+class PendingEvaluationCache:
+    """
+    Per-process cache of each student's pending evaluations (/api/student/evaluations/assigned),
+    with an ETag per list so an unchanged list is answered with 304 Not Modified.
+
+    A cached list is served while the versions it was built under are unchanged: the
+    'pending_evaluations' version bumped by the admin app (template assignments, deadlines, course and
+    batch assignments), the student's own version bumped by their submissions, the student's batch and
+    session, and the date, since templates drop out after their last_date. Versions are read from the
+    cache_versions table at most every sync_seconds, so changes made by the admin app or another API
+    process apply here within that delay; submissions made through this process apply at once. ETags
+    are hashes of the lists themselves, so every API process gives the same list the same ETag.
+    """
+    SYNC_OVERLAP = timedelta(seconds=60) # Rows updated this long before the newest one seen are re-read, for late commits
+
+    def __init__(self, max_students=10000, sync_seconds=5):
+        """
+        :param max_students: Number of students whose lists are kept, least recently used first out.
+        :param sync_seconds: Seconds between two reads of the versions.
+        """
+        self.max_students = max(1, max_students)
+        self.sync_seconds = sync_seconds
+        self.versions = {} # version name -> version
+        self._entries = OrderedDict() # student_id -> (version key, etag, pending list)
+        self._watermark = None # Newest updated_at seen in cache_versions
+        self._synced = False
+        self._next_sync = 0
+        self._lock = threading.Lock()
+
+    def sync_due(self):
+        """True when the versions should be read again (see apply_versions())."""
+        return time.monotonic() >= self._next_sync
+
+    def sync_since(self):
+        """Lower bound on updated_at for the next read of the versions."""
+        return self._watermark - self.SYNC_OVERLAP if self._watermark else datetime(1970, 1, 1)
+
+    def apply_versions(self, rows):
+        """
+        Applies the versions read with CacheVersionController.get_versions(sync_since()).
+        :param rows: The version rows, or None if the read failed; nothing is served from the cache
+                     until a read succeeds again.
+        :return: The names of the versions that changed (all of them on the first read), so the
+                 caller can refresh other caches keyed by them, e.g. student identities.
+        """
+        changed = []
+        with self._lock:
+            self._next_sync = time.monotonic() + self.sync_seconds
+            if rows is None:
+                self._synced = False
+                return changed
+            for row in rows:
+                if self.versions.get(row['name']) != row['version']:
+                    changed.append(row['name'])
+                self.versions[row['name']] = row['version']
+                if self._watermark is None or row['updated_at'] > self._watermark:
+                    self._watermark = row['updated_at']
+            self._synced = True
+        return changed
+
+    def version_key(self, student):
+        """
+        What a list built now for the student (a StudentContext) depends on; take it before querying the list.
+        """
+        return (
+            self.versions.get(PENDING_EVALUATIONS_VERSION, 0),
+            self.versions.get(student_pending_version(student.student_id), 0),
+            student.batch,
+            student.session,
+            date.today()
+        )
+
+    def get(self, student):
+        """Returns (etag, pending list) cached for the student under the current versions, or None."""
+        with self._lock:
+            if not self._synced:
+                return None
+            entry = self._entries.get(student.student_id)
+            if entry is None or entry[0] != self.version_key(student):
+                return None
+            self._entries.move_to_end(student.student_id)
+            return entry[1], entry[2]
+
+    def put(self, student, version_key, pending):
+        """
+        Caches a student's pending list.
+        :param version_key: version_key(student) taken before the list was queried.
+        :return: The ETag of the list.
+        """
+        etag = hashlib.sha1(json.dumps(pending, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        with self._lock:
+            self._entries[student.student_id] = (version_key, etag, pending)
+            self._entries.move_to_end(student.student_id)
+            while len(self._entries) > self.max_students:
+                self._entries.popitem(last=False)
+        return etag
+
+    def bump_student(self, student_id):
+        """Marks the student's cached list out of date after their submission went through this process."""
+        name = student_pending_version(student_id)
+        with self._lock:
+            self.versions[name] = self.versions.get(name, 0) + 1
@@ -0,0 +1,346 @@
+# Admin_side/api/session_store.py
+import base64
+import hashlib
+import hmac
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from config import SESSION_STORE_CONFIG, SECRET_KEY
+
+
+class SessionStore:
+    """
+    Maps student API session tokens to student IDs, with expiry after ttl_seconds.
+
+    Backends implement _save(), _load() and _remove() on the SHA-256 hash of the token, so a
+    leaked store does not reveal usable tokens. Shared backends (database, Redis) can keep a
+    small per-process read-through cache of recent lookups: a token is then re-read from the
+    store at most every cache_seconds, which also bounds how long a logout made by another
+    API process takes to apply here.
+    """
+    def __init__(self, ttl_seconds=8 * 3600, cache_size=0, cache_seconds=0):
+        """
+        :param ttl_seconds: Lifetime of a session from login.
+        :param cache_size: Number of lookups cached in this process (0 disables the cache).
+        :param cache_seconds: Seconds a cached lookup is served before the store is asked again.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.cache_size = cache_size
+        self.cache_seconds = cache_seconds
+        self._cache = OrderedDict() # token hash -> (student_id, cached_until)
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def _key(token):
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def create(self, student_id, claims=None):
+        """
+        Starts a session for a student.
+        :param claims: Extra identity data (e.g. batch, session); only SignedSessionStore keeps it.
+        :return: A new random token (32 hex characters).
+        """
+        token = os.urandom(16).hex()
+        self._save(self._key(token), student_id, time.time() + self.ttl_seconds)
+        return token
+
+    def get(self, token):
+        """
+        Retrieves the student_id of a live session.
+        :return: The student_id, or None for unknown or expired tokens.
+        """
+        if not token:
+            return None
+        key = self._key(token)
+        if self.cache_size:
+            with self._cache_lock:
+                cached = self._cache.get(key)
+                if cached is not None and cached[1] > time.monotonic():
+                    self._cache.move_to_end(key)
+                    return cached[0]
+        student_id = self._load(key)
+        if student_id is not None and self.cache_size:
+            with self._cache_lock:
+                self._cache[key] = (student_id, time.monotonic() + self.cache_seconds)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return student_id
+
+    def claims(self, token):
+        """
+        Returns the identity data carried by the token ({student_id, batch, session}), or None if the
+        store does not keep any (all but SignedSessionStore) or the token is not valid.
+        """
+        return None
+
+    def delete(self, token):
+        """
+        Ends a session (logout).
+        :return: True if the token belonged to a live session, False otherwise.
+        """
+        if not token:
+            return False
+        key = self._key(token)
+        with self._cache_lock:
+            self._cache.pop(key, None)
+        return self._remove(key)
+
+    def _save(self, key, student_id, expires_at):
+        raise NotImplementedError
+
+    def _load(self, key):
+        raise NotImplementedError
+
+    def _remove(self, key):
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """Sessions in this process only, evicting the least recently used beyond max_sessions."""
+    def __init__(self, ttl_seconds=8 * 3600, max_sessions=10000):
+        super().__init__(ttl_seconds)
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict() # token hash -> (student_id, expires_at)
+        self._lock = threading.Lock()
+
+    def _save(self, key, student_id, expires_at):
+        with self._lock:
+            self._sessions[key] = (student_id, expires_at)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def _load(self, key):
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                return None
+            if session[1] <= time.time():
+                del self._sessions[key]
+                return None
+            self._sessions.move_to_end(key)
+            return session[0]
+
+    def _remove(self, key):
+        with self._lock:
+            session = self._sessions.pop(key, None)
+        return session is not None and session[1] > time.time()
+
+
+class DatabaseSessionStore(SessionStore):
+    """
+    Sessions in the student_sessions table (student_sessions.sql), shared by every API process
+    using the same database. Expired rows are purged at most every purge_interval seconds, on login.
+    """
+    def __init__(self, db, ttl_seconds=8 * 3600, cache_size=1024, cache_seconds=5, purge_interval=300):
+        """
+        :param db: DBManager used for the session queries.
+        """
+        super().__init__(ttl_seconds, cache_size, cache_seconds)
+        self.db = db
+        self.purge_interval = purge_interval
+        self._next_purge = 0
+
+    def _save(self, key, student_id, expires_at):
+        now = time.time()
+        if now >= self._next_purge:
+            self._next_purge = now + self.purge_interval
+            self.db.execute_query("DELETE FROM student_sessions WHERE expires_at <= %s", (datetime.now(),))
+        if not self.db.execute_query(
+            "INSERT INTO student_sessions (token_hash, student_id, expires_at) VALUES (%s, %s, %s)",
+            (key, student_id, datetime.fromtimestamp(expires_at))
+        ):
+            raise RuntimeError("Could not store the session.")
+
+    def _load(self, key):
+        # Primary: a token is used right after the login that wrote it
+        row = self.db.fetch_data(
+            "SELECT student_id FROM student_sessions WHERE token_hash = %s AND expires_at > %s",
+            (key, datetime.now()), fetch_one=True, primary=True
+        )
+        return row['student_id'] if row else None
+
+    def _remove(self, key):
+        if self._load(key) is None:
+            return False
+        return bool(self.db.execute_query("DELETE FROM student_sessions WHERE token_hash = %s", (key,)))
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Sessions in a Redis-protocol server, expired by the server (SET ... EX ttl).
+    `client` is any object with redis-py's set(name, value, ex=...), get(name) and delete(name);
+    by default a redis.Redis client for `url`.
+    """
+    def __init__(self, url='redis://localhost:6379/0', prefix='ces:session:', ttl_seconds=8 * 3600,
+                 cache_size=1024, cache_seconds=5, client=None):
+        super().__init__(ttl_seconds, cache_size, cache_seconds)
+        if client is None:
+            import redis # Requires `pip install redis`
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def _save(self, key, student_id, expires_at):
+        self.client.set(self.prefix + key, str(student_id), ex=max(1, int(expires_at - time.time())))
+
+    def _load(self, key):
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        value = value.decode('utf-8') if isinstance(value, bytes) else str(value)
+        return int(value) if value.isdigit() else value
+
+    def _remove(self, key):
+        return bool(self.client.delete(self.prefix + key))
+
+
+def _b64encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(text):
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+class SignedSessionStore(SessionStore):
+    """
+    Stateless sessions: the token itself carries the student_id, batch, session and expiry,
+    signed with HMAC-SHA256 under SECRET_KEY, so get() verifies it without any lookup.
+
+    Logout adds the token's random id to a revocation list that only holds tokens until they
+    would have expired anyway. With `db`, revocations are also written to revoked_student_tokens
+    (student_sessions.sql) and every process reloads that list at most every sync_seconds, so a
+    logout applies to all API processes within that delay. Without `db` a logout applies to this
+    process only, and the token stays valid in every other worker until it expires.
+    Expired token ids are dropped from the list at most every sync_seconds in either mode.
+    """
+    def __init__(self, secret_key, ttl_seconds=8 * 3600, db=None, sync_seconds=5):
+        """
+        :param secret_key: Signing key (config.SECRET_KEY); changing it invalidates every token.
+        :param db: DBManager for a revocation list shared between processes, or None.
+        """
+        super().__init__(ttl_seconds)
+        self.secret_key = secret_key.encode('utf-8') if isinstance(secret_key, str) else secret_key
+        self.db = db
+        self.sync_seconds = sync_seconds
+        self._revoked = {} # token id -> expiry timestamp
+        self._revoked_lock = threading.Lock()
+        self._next_sync = 0
+
+    def _sign(self, payload):
+        return _b64encode(hmac.new(self.secret_key, payload.encode('utf-8'), hashlib.sha256).digest())
+
+    def create(self, student_id, claims=None):
+        """
+        Issues a signed token for a student.
+        :param claims: Optional {'batch': ..., 'session': ...} carried in the token.
+        :return: The token, "<payload>.<signature>" in base64url.
+        """
+        claims = claims or {}
+        payload = _b64encode(json.dumps({
+            "sid": student_id,
+            "batch": claims.get('batch'),
+            "session": claims.get('session'),
+            "exp": int(time.time() + self.ttl_seconds),
+            "jti": os.urandom(8).hex()
+        }, separators=(',', ':')).encode('utf-8'))
+        return f"{payload}.{self._sign(payload)}"
+
+    def _verify(self, token):
+        """Returns the payload of a correctly signed, unexpired and unrevoked token, None otherwise."""
+        if not token or token.count('.') != 1:
+            return None
+        payload, signature = token.split('.')
+        if not hmac.compare_digest(signature.encode('utf-8'), self._sign(payload).encode('utf-8')):
+            return None
+        try:
+            data = json.loads(_b64decode(payload))
+        except (ValueError, UnicodeDecodeError):
+            return None
+        now = time.time()
+        if data.get('exp', 0) <= now:
+            return None
+        if now >= self._next_sync:
+            if self.db is not None:
+                self._sync_revocations(now)
+            else:
+                self._prune_revocations(now)
+        if data.get('jti') in self._revoked:
+            return None
+        return data
+
+    def get(self, token):
+        data = self._verify(token)
+        return data['sid'] if data else None
+
+    def claims(self, token):
+        data = self._verify(token)
+        if not data:
+            return None
+        return {"student_id": data['sid'], "batch": data.get('batch'), "session": data.get('session')}
+
+    def delete(self, token):
+        data = self._verify(token)
+        if not data:
+            return False
+        with self._revoked_lock:
+            self._revoked[data['jti']] = data['exp']
+        if self.db is not None:
+            self.db.execute_query(
+                "INSERT IGNORE INTO revoked_student_tokens (token_id, expires_at) VALUES (%s, %s)",
+                (data['jti'], datetime.fromtimestamp(data['exp']))
+            )
+        return True
+
+    def _prune_revocations(self, now):
+        """Drops the entries of the revocation list for tokens that have expired."""
+        self._next_sync = now + self.sync_seconds
+        with self._revoked_lock:
+            self._revoked = {token_id: expires_at for token_id, expires_at in self._revoked.items() if expires_at > now}
+
+    def _sync_revocations(self, now):
+        """Reloads the shared revocation list and drops entries for tokens that have expired."""
+        self._next_sync = now + self.sync_seconds
+        rows = self.db.fetch_data(
+            "SELECT token_id, expires_at FROM revoked_student_tokens WHERE expires_at > %s",
+            (datetime.fromtimestamp(now),), fetch_all=True, primary=True
+        )
+        with self._revoked_lock:
+            revoked = {token_id: expires_at for token_id, expires_at in self._revoked.items() if expires_at > now}
+            for row in rows or []:
+                revoked[row['token_id']] = row['expires_at'].timestamp()
+            self._revoked = revoked
+
+
+def create_session_store(config=SESSION_STORE_CONFIG, db=None):
+    """
+    Builds the session store selected by SESSION_STORE_CONFIG['backend'].
+    :param db: DBManager for the 'database' backend and the shared revocation list of the 'signed' backend.
+    """
+    backend = config.get('backend', 'memory')
+    ttl_seconds = config.get('ttl_seconds', 8 * 3600)
+    if backend == 'database':
+        if db is None:
+            from database.db_manager import DBManager
+            db = DBManager()
+        return DatabaseSessionStore(db, ttl_seconds, config.get('cache_size', 1024), config.get('cache_seconds', 5))
+    if backend == 'redis':
+        return RedisSessionStore(
+            config.get('redis_url', 'redis://localhost:6379/0'), config.get('redis_prefix', 'ces:session:'),
+            ttl_seconds, config.get('cache_size', 1024), config.get('cache_seconds', 5)
+        )
+    if backend == 'signed':
+        if config.get('revocations', 'database') == 'database' and db is None:
+            from database.db_manager import DBManager
+            db = DBManager()
+        return SignedSessionStore(
+            SECRET_KEY, ttl_seconds, db if config.get('revocations', 'database') == 'database' else None,
+            config.get('revocation_sync_seconds', 5)
+        )
+    if backend != 'memory':
+        raise ValueError(f"Unknown session store backend: {backend}")
+    return MemorySessionStore(ttl_seconds, config.get('max_sessions', 10000))
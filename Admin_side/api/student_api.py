@@ -1,9 +1,10 @@
 # Admin_side/api/student_api.py
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, g
 from flask_cors import CORS
 import sys
 import os
 import json # Ensure json is imported
+from functools import wraps
 from datetime import datetime # Ensure datetime is imported
 
 # Get the path to the 'Admin_side' directory to set up module imports
@@ -12,10 +13,16 @@ admin_side_dir = os.path.abspath(os.path.join(current_dir, '..'))
 sys.path.insert(0, admin_side_dir)
 
 from database.db_manager import DBManager
+from config import METRICS_ALLOWED_ADDRESSES, SESSION_STORE_CONFIG, PENDING_CACHE_CONFIG
 from controllers.auth_controller import AuthController # Potentially unused for student API directly, but part of context
 from controllers.student_controller import StudentController
 from controllers.evaluation_template_controller import EvaluationTemplateController
 from controllers.faculty_request_controller import FacultyRequestController # NEW: Import FacultyRequestController
+from controllers.evaluation_stats_controller import EvaluationStatsController
+from controllers.cache_version_controller import CacheVersionController, student_pending_version, identity_version_student_id
+from api.pending_cache import PendingEvaluationCache
+from api.session_store import create_session_store
+from api.student_context import StudentContext, IdentityCache
 from models.evaluation_completion_model import EvaluationCompletion
 from models.evaluation_model import Evaluation
 
@@ -28,6 +35,9 @@ auth_controller = AuthController() # Still keeping this, though it's primarily f
 student_controller = StudentController()
 evaluation_template_controller = EvaluationTemplateController()
 faculty_request_controller = FacultyRequestController() # NEW: Initialize faculty request controller
+evaluation_stats_controller = EvaluationStatsController()
+cache_version_controller = CacheVersionController()
+pending_cache = PendingEvaluationCache(PENDING_CACHE_CONFIG.get('max_students', 10000), PENDING_CACHE_CONFIG.get('sync_seconds', 5))
 
 
 # Connect to the database on app startup
@@ -35,28 +45,101 @@ if not db_manager.connect():
     print("FATAL: Could not connect to the database. Exiting API.")
     sys.exit(1) # Exit if database connection fails
 
-# --- Helper Function for Auth Token (Basic for now) ---
-SESSION_TOKENS = {} # In-memory store for session tokens, for demonstration purposes
+# Each request is one logical operation for N+1 query detection (no-op unless QUERY_PROFILER_CONFIG is enabled)
+@app.before_request
+def begin_query_profiling():
+    db_manager.profiler.begin_operation(f"{request.method} {request.url_rule or request.path}")
 
-def generate_session_token(student_id):
+# Reads made on behalf of a student go to the primary database shortly after that student's own writes
+# (e.g. the pending/completed lists right after a submission), and to the read replica otherwise.
+@app.before_request
+def set_read_consistency_key():
+    student_id = get_request_student_id()
+    db_manager.set_consistency_key(f"student:{student_id}" if student_id else None)
+
+@app.teardown_request
+def end_query_profiling(exception=None):
+    db_manager.profiler.end_operation()
+    db_manager.set_consistency_key(None)
+
+# --- Helper Function for Auth Token ---
+# Token -> student_id sessions; shared across API processes unless SESSION_STORE_CONFIG['backend'] is 'memory'
+session_store = create_session_store(db=db_manager)
+
+def generate_session_token(student):
     """
-    Generates a simple session token for a student.
-    In a production environment, use more robust token generation (e.g., JWTs)
-    and persistent storage (e.g., database, Redis).
-    :param student_id: The ID of the student.
-    :return: A hexadecimal string token.
+    Generates a session token for a student and stores it in the session store
+    (or, with the 'signed' backend, signs the student's ID, batch and session into it).
+    :param student: The authenticated Student.
+    :return: The token string.
     """
-    token = os.urandom(16).hex() # Generates a random 32-character hex string
-    SESSION_TOKENS[token] = student_id # Store token -> student_id mapping
-    return token
+    return session_store.create(student.student_id, {"batch": student.batch, "session": student.session})
 
 def get_student_id_from_token(token):
     """
     Retrieves the student_id associated with a given session token.
     :param token: The session token.
-    :return: The student_id if found, None otherwise.
-    """
-    return SESSION_TOKENS.get(token)
+    :return: The student_id if found (and not expired), None otherwise.
+    """
+    return session_store.get(token)
+
+def get_request_token():
+    """Returns the Bearer token of the current request, or None."""
+    auth_header = request.headers.get('Authorization', '')
+    return auth_header[7:] if auth_header.startswith('Bearer ') else None
+
+def get_request_student_id():
+    """Validates the current request's token once per request (memoized on flask.g)."""
+    if 'token_student_id' not in g:
+        token = get_request_token()
+        g.token_student_id = get_student_id_from_token(token) if token else None
+    return g.token_student_id
+
+identity_cache = IdentityCache(SESSION_STORE_CONFIG.get('identity_cache_size', 4096), SESSION_STORE_CONFIG.get('identity_cache_seconds', 30))
+
+def sync_cache_versions():
+    """
+    Reads the cache versions changed by the admin app and other API processes, at most every
+    PENDING_CACHE_CONFIG['sync_seconds']: pending_cache rebuilds out-of-date lists, and students
+    edited or deleted since are dropped from identity_cache.
+    """
+    if not pending_cache.sync_due():
+        return
+    for name in pending_cache.apply_versions(cache_version_controller.get_versions(pending_cache.sync_since())):
+        student_id = identity_version_student_id(name)
+        if student_id is not None:
+            identity_cache.invalidate_student(student_id)
+
+def require_student(handler):
+    """
+    Decorator for endpoints of logged-in students: validates the Bearer token and sets g.student
+    to the student's StudentContext (student_id, batch, session). The identity comes from a signed
+    token's claims or from one narrow query, cached per token in identity_cache; students edited
+    since login are always read from the database.
+    Responds 401 without a valid token and 404 if the student no longer exists.
+    """
+    @wraps(handler)
+    def wrapper(*args, **kwargs):
+        token = get_request_token()
+        if not token:
+            return jsonify({"message": "Authentication required."}), 401
+        student_id = get_request_student_id()
+        if not student_id:
+            return jsonify({"message": "Invalid session token."}), 401
+
+        sync_cache_versions()
+        context = identity_cache.get(token, student_id)
+        if context is None:
+            if identity_cache.trusts_claims(student_id):
+                context = StudentContext.from_claims(session_store.claims(token))
+            if context is None:
+                context = StudentContext.from_db_row(student_controller.get_student_identity(student_id))
+                if context is None:
+                    return jsonify({"message": "Student not found."}), 404
+            identity_cache.put(token, context)
+        g.student = context
+        return handler(*args, **kwargs)
+    return wrapper
 
 # --- API Endpoints ---
 
@@ -88,7 +171,7 @@ def student_login():
     student_user = student_controller.authenticate_student(student_id=student_id_int, password=password)
 
     if student_user:
-        token = generate_session_token(student_user.student_id)
+        token = generate_session_token(student_user)
         return jsonify({
             "message": "Login successful.",
             "token": token,
@@ -106,91 +189,50 @@ def student_logout():
     token = request.headers.get('Authorization')
     if token and token.startswith('Bearer '):
         token = token.split(' ')[1] # Extract the token string
-        if token in SESSION_TOKENS:
-            del SESSION_TOKENS[token] # Remove token from in-memory store
+        identity_cache.discard(token)
+        if session_store.delete(token):
             return jsonify({"message": "Logout successful."}), 200
     return jsonify({"message": "Invalid token or not logged in."}), 401
 
 @app.route('/api/student/evaluations/assigned', methods=['GET'])
+@require_student
 def get_assigned_evaluations():
     """
     Retrieves evaluations currently assigned to the logged-in student that are
     pending completion.
+    Served from pending_cache while unchanged, as 304 Not Modified if the client already has it.
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
-
-    student_details = student_controller.get_student_by_id(student_id)
-    if not student_details:
-        return jsonify({"message": "Student not found."}), 404
-
-    assigned_evals = []
-    all_ongoing = evaluation_template_controller.get_ongoing_evaluations()
-
-    # Get all courses the student is assigned to (individually or by batch)
-    student_assigned_courses = {item['course_code'] for item in student_controller.get_courses_for_student(student_id)}
-
-    # Get all evaluations already completed by this student
-    completed_eval_ids = set()
-    completed_records = db_manager.fetch_data(
-        "SELECT template_id, course_code FROM evaluation_completion WHERE student_id = %s AND is_completed = TRUE",
-        (student_id,), fetch_all=True
-    )
-    for rec in completed_records:
-        # Use a tuple (template_id, course_code) as the key for completion status,
-        # as a template might be assigned to different courses.
-        completed_eval_ids.add((rec['template_id'], rec['course_code']))
-
-    for eval_temp in all_ongoing:
-        is_relevant = False
-        # Check if the evaluation template applies to the student's context
-        # It's relevant if:
-        # 1. It's assigned to a course the student is in.
-        # 2. It's assigned to the student's batch.
-        # 3. It's assigned to the student's session.
-        if eval_temp.course_code and eval_temp.course_code in student_assigned_courses:
-            is_relevant = True
-        elif eval_temp.batch and student_details.batch == eval_temp.batch:
-            is_relevant = True
-        elif eval_temp.session and student_details.session == eval_temp.session:
-            is_relevant = True
-
-        if is_relevant:
-            # Check if this specific assignment (template_id, course_code) has been completed
-            is_completed = (eval_temp.id, eval_temp.course_code) in completed_eval_ids
-
-            if not is_completed:
-                # Add to assigned_evals if it's relevant and not yet completed
-                assigned_evals.append({
-                    "id": eval_temp.id,
-                    "title": eval_temp.title,
-                    "course_code": eval_temp.course_code,
-                    "batch": eval_temp.batch,
-                    "session": eval_temp.session,
-                    "last_date": eval_temp.last_date.strftime("%Y-%m-%d") if eval_temp.last_date else None
-                })
-
-    return jsonify(assigned_evals), 200
+    student = g.student
+    cached = pending_cache.get(student)
+    if cached:
+        etag, assigned_evals = cached
+    else:
+        version_key = pending_cache.version_key(student)
+        pending = student_controller.get_pending_evaluations(student.student_id, student.batch, student.session)
+        assigned_evals = [{
+            "id": row['id'],
+            "title": row['title'],
+            "course_code": row['course_code'],
+            "batch": row['batch'],
+            "session": row['session'],
+            "last_date": row['last_date'].strftime("%Y-%m-%d") if row['last_date'] else None
+        } for row in pending]
+        etag = pending_cache.put(student, version_key, assigned_evals)
+
+    response = Response(status=304) if request.if_none_match.contains(etag) else jsonify(assigned_evals)
+    response.set_etag(etag)
+    # Browsers revalidate every time (If-None-Match), and shared caches never store a student's list
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 @app.route('/api/student/evaluations/template/<int:template_id>', methods=['GET'])
+@require_student
 def get_evaluation_template_details(template_id):
     """
     Retrieves the details of a specific evaluation template by its ID.
     Used by the frontend when a student goes to "Take Evaluation".
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
-
     template = evaluation_template_controller.get_template_by_id(template_id)
     if not template:
         return jsonify({"message": "Evaluation template not found."}), 404
@@ -212,17 +254,12 @@ def get_evaluation_template_details(template_id):
 
 
 @app.route('/api/student/evaluations/submit', methods=['POST'])
+@require_student
 def submit_evaluation():
     """
     Submits a student's evaluation responses and marks the evaluation as complete.
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
+    student_id = g.student.student_id
 
     data = request.get_json()
     course_code = data.get('course_code')
@@ -247,45 +284,54 @@ def submit_evaluation():
             comment=comment,
             date=datetime.now() # Record current timestamp
         )
-        # Execute query to insert evaluation feedback
-        eval_success = db_manager.execute_query(
-            "INSERT INTO evaluations (course_code, template_id, feedback, comment, date) VALUES (%s, %s, %s, %s, %s)",
-            (new_evaluation.course_code, new_evaluation.template_id, json.dumps(new_evaluation.feedback), new_evaluation.comment, new_evaluation.date)
-        )
-
-        if not eval_success:
-            raise Exception("Failed to save evaluation feedback.")
-
-        # Mark evaluation as complete in the evaluation_completion table
-        # Handle null course_code for batch/session-only evaluations
-        if course_code:
-            existing_completion = db_manager.fetch_data(
-                "SELECT id FROM evaluation_completion WHERE template_id = %s AND course_code = %s AND student_id = %s",
-                (template_id, course_code, student_id), fetch_one=True
+        # Insert the feedback and mark the evaluation complete as one unit of work,
+        # so a failure can never leave a feedback row without its completion row.
+        with db_manager.transaction():
+            eval_success = db_manager.execute_query(
+                "INSERT INTO evaluations (course_code, template_id, feedback, comment, date) VALUES (%s, %s, %s, %s, %s)",
+                (new_evaluation.course_code, new_evaluation.template_id, json.dumps(new_evaluation.feedback), new_evaluation.comment, new_evaluation.date)
             )
-        else:
-            # For evaluations without course_code, use NULL in the query
-            existing_completion = db_manager.fetch_data(
-                "SELECT id FROM evaluation_completion WHERE template_id = %s AND course_code IS NULL AND student_id = %s",
-                (template_id, student_id), fetch_one=True
-            )
-
-        if existing_completion:
-            # If a completion record already exists, update it to 'completed'
-            completion_success = db_manager.execute_query(
-                "UPDATE evaluation_completion SET is_completed = TRUE, completion_date = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
-                (datetime.now(), existing_completion['id'])
-            )
-        else:
-            # If no record exists, insert a new one
-            completion_success = db_manager.execute_query(
-                "INSERT INTO evaluation_completion (template_id, course_code, student_id, is_completed, completion_date) VALUES (%s, %s, %s, TRUE, %s)",
-                (template_id, course_code, student_id, datetime.now())
-            )
-
-        if not completion_success:
-            raise Exception("Failed to mark evaluation as complete.")
 
+            if not eval_success:
+                raise Exception("Failed to save evaluation feedback.")
+
+            # Mark evaluation as complete in the evaluation_completion table
+            # Handle null course_code for batch/session-only evaluations
+            if course_code:
+                existing_completion = db_manager.fetch_data(
+                    "SELECT id FROM evaluation_completion WHERE template_id = %s AND course_code = %s AND student_id = %s",
+                    (template_id, course_code, student_id), fetch_one=True
+                )
+            else:
+                # For evaluations without course_code, use NULL in the query
+                existing_completion = db_manager.fetch_data(
+                    "SELECT id FROM evaluation_completion WHERE template_id = %s AND course_code IS NULL AND student_id = %s",
+                    (template_id, student_id), fetch_one=True
+                )
+
+            if existing_completion:
+                # If a completion record already exists, update it to 'completed'
+                completion_success = db_manager.execute_query(
+                    "UPDATE evaluation_completion SET is_completed = TRUE, completion_date = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
+                    (datetime.now(), existing_completion['id'])
+                )
+            else:
+                # If no record exists, insert a new one
+                completion_success = db_manager.execute_query(
+                    "INSERT INTO evaluation_completion (template_id, course_code, student_id, is_completed, completion_date) VALUES (%s, %s, %s, TRUE, %s)",
+                    (template_id, course_code, student_id, datetime.now())
+                )
+
+            if not completion_success:
+                raise Exception("Failed to mark evaluation as complete.")
+
+            # Keep the report counts (evaluation_question_stats) in step with the new submission
+            if not evaluation_stats_controller.record_submission(template_id, course_code, new_evaluation.feedback):
+                raise Exception("Failed to update evaluation statistics.")
+
+        # Tells every API process that this student's pending list changed (best effort, after the commit)
+        cache_version_controller.bump(student_pending_version(student_id))
+        pending_cache.bump_student(student_id)
         return jsonify({"message": "Evaluation submitted successfully."}), 200
 
     except Exception as e:
@@ -293,35 +339,23 @@ def submit_evaluation():
         return jsonify({"message": f"Failed to submit evaluation: {str(e)}"}), 500
 
 @app.route('/api/student/courses_faculty/<string:course_code>', methods=['GET'])
+@require_student
 def get_course_faculty_api(course_code):
     """
     Retrieves faculty members assigned to a specific course.
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
-
     faculty_list = student_controller.get_faculty_for_course(course_code)
     return jsonify(faculty_list), 200
 
 # --- NEW: Endpoints for Profile, Completed Evaluations, Complaints ---
 
 @app.route('/api/student/profile', methods=['GET'])
+@require_student
 def get_student_profile():
     """
     Retrieves the logged-in student's profile data.
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
+    student_id = g.student.student_id
 
     profile_data = student_controller.get_student_profile_data(student_id)
     if not profile_data:
@@ -330,17 +364,12 @@ def get_student_profile():
     return jsonify(profile_data), 200
 
 @app.route('/api/student/profile/update', methods=['PUT'])
+@require_student
 def update_student_profile_api():
     """
     Updates the logged-in student's profile data.
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
+    student_id = g.student.student_id
 
     data = request.get_json()
     if not data:
@@ -361,34 +390,24 @@ def update_student_profile_api():
         return jsonify({"message": message}), 500
 
 @app.route('/api/student/evaluations/completed', methods=['GET'])
+@require_student
 def get_completed_evaluations():
     """
     Retrieves a list of evaluations completed by the logged-in student.
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
+    student_id = g.student.student_id
 
     completed_evals = student_controller.get_completed_evaluations_for_student(student_id)
     return jsonify(completed_evals), 200
 
 @app.route('/api/student/evaluations/completed/details', methods=['GET'])
+@require_student
 def get_completed_evaluation_details_api():
     """
     Retrieves the full feedback and comment for a specific completed evaluation.
     Requires template_id and optionally course_code as query parameters.
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
+    student_id = g.student.student_id
 
     template_id = request.args.get('template_id', type=int)
     course_code = request.args.get('course_code')
@@ -405,17 +424,12 @@ def get_completed_evaluation_details_api():
 
 
 @app.route('/api/student/complaints/submit', methods=['POST'])
+@require_student
 def submit_complaint_api():
     """
     Submits a new complaint from the logged-in student.
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
+    student_id = g.student.student_id
 
     data = request.get_json()
     course_code = data.get('course_code')
@@ -432,17 +446,12 @@ def submit_complaint_api():
         return jsonify({"message": message}), 500
 
 @app.route('/api/student/complaints/list', methods=['GET'])
+@require_student
 def get_student_complaints_list():
     """
     Returns all complaints submitted by the logged-in student.
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
+    student_id = g.student.student_id
 
     complaints = student_controller.get_complaints_for_student(student_id)
     # Each complaint should have: issue_type, details, course_code, status
@@ -450,17 +459,12 @@ def get_student_complaints_list():
 
 # NEW: Endpoint for submitting faculty requests
 @app.route('/api/student/requests/faculty_request', methods=['POST'])
+@require_student
 def submit_faculty_request_api():
     """
     Allows a student to submit a request for a new faculty for a course.
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
+    student_id = g.student.student_id
 
     data = request.get_json()
     course_name = data.get('course_name') # Changed from course_code
@@ -481,18 +485,11 @@ def submit_faculty_request_api():
 
 # NEW: Endpoint to get available upcoming courses for student requests
 @app.route('/api/student/courses/upcoming', methods=['GET'])
+@require_student
 def get_upcoming_courses_api():
     """
     Retrieves a list of courses with 'upcoming' status.
     """
-    token = request.headers.get('Authorization')
-    if not token or not token.startswith('Bearer '):
-        return jsonify({"message": "Authentication required."}), 401
-
-    student_id = get_student_id_from_token(token.split(' ')[1])
-    if not student_id:
-        return jsonify({"message": "Invalid session token."}), 401
-    
     # Using student_controller to get courses which in turn uses CourseController
     upcoming_courses = student_controller.get_courses_by_status(status='upcoming')
     
@@ -504,6 +501,30 @@ def get_upcoming_courses_api():
 
     return jsonify(formatted_courses), 200
 
+# --- Operational Endpoints ---
+
+@app.route('/api/metrics', methods=['GET'])
+def get_db_metrics():
+    """
+    Exposes per-query-shape database timings, the slow-query log, connection pool usage
+    and (when query profiling is enabled) recent N+1 reports.
+    Returns JSON by default, or the Prometheus text format with ?format=prometheus.
+    Only reachable from the addresses listed in config.METRICS_ALLOWED_ADDRESSES.
+    """
+    if request.remote_addr not in METRICS_ALLOWED_ADDRESSES:
+        return jsonify({"message": "Forbidden."}), 403
+
+    pool_stats = db_manager.pool.stats() if db_manager.pool else None
+    if request.args.get('format') == 'prometheus':
+        return Response(db_manager.query_stats.to_prometheus(pool_stats), mimetype='text/plain; version=0.0.4')
+
+    metrics = db_manager.query_stats.snapshot()
+    metrics["pool"] = pool_stats
+    metrics["replica_pool"] = db_manager.replica_pool.stats() if db_manager.replica_pool else None
+    metrics["query_cache"] = db_manager.query_cache.stats()
+    metrics["n_plus_one"] = db_manager.profiler.reports()
+    return jsonify(metrics), 200
+
 
 if __name__ == '__main__':
     # Ensure this runs from the project root if using relative imports
@@ -0,0 +1,478 @@
+# Admin_side/api/student_asgi.py
+from quart import Quart, request, jsonify, Response, g
+from quart_cors import cors
+import sys
+import os
+import json
+import asyncio
+from functools import wraps
+from datetime import datetime
+
+# Get the path to the 'Admin_side' directory to set up module imports
+current_dir = os.path.dirname(__file__)
+admin_side_dir = os.path.abspath(os.path.join(current_dir, '..'))
+sys.path.insert(0, admin_side_dir)
+
+from database.async_db_manager import AsyncDBManager
+from database.db_manager import DBManager
+from config import METRICS_ALLOWED_ADDRESSES, SESSION_STORE_CONFIG, PENDING_CACHE_CONFIG
+from controllers.async_student_controller import AsyncStudentController
+from controllers.cache_version_controller import student_pending_version, identity_version_student_id
+from models.evaluation_model import Evaluation
+from api.session_store import create_session_store
+from api.student_context import StudentContext, IdentityCache
+from api.pending_cache import PendingEvaluationCache
+
+# ASGI variant of api/student_api.py: same routes, payloads and status codes, but every
+# database call is awaited, so a worker is not blocked while a query runs.
+# Serve with an ASGI server, e.g.:  hypercorn api.student_asgi:app  or  uvicorn api.student_asgi:app
+app = Quart(__name__)
+app = cors(app) # Enable Cross-Origin Resource Sharing for frontend interaction
+
+db = AsyncDBManager()
+student_controller = AsyncStudentController()
+pending_cache = PendingEvaluationCache(PENDING_CACHE_CONFIG.get('max_students', 10000), PENDING_CACHE_CONFIG.get('sync_seconds', 5))
+session_store_uses_database = SESSION_STORE_CONFIG.get('backend') == 'database' or (
+    SESSION_STORE_CONFIG.get('backend') == 'signed' and SESSION_STORE_CONFIG.get('revocations', 'database') == 'database'
+)
+
+
+# The async pool belongs to the server's event loop, so it is created when serving starts
+@app.before_serving
+async def connect_database():
+    if not await db.connect():
+        print("FATAL: Could not connect to the database. Exiting API.")
+        sys.exit(1)
+    # The 'database' session store (and the 'signed' one's shared revocation list) use the synchronous
+    # DBManager, called from worker threads
+    if session_store_uses_database and not DBManager().connect():
+        print("FATAL: Could not connect the session store to the database. Exiting API.")
+        sys.exit(1)
+
+@app.after_serving
+async def disconnect_database():
+    await db.disconnect()
+    if session_store_uses_database:
+        DBManager().disconnect()
+
+# --- Helper Function for Auth Token ---
+# Same session store as api/student_api.py, so both APIs (and all their worker processes) accept each other's tokens
+session_store = create_session_store()
+
+async def _call_session_store(method, *args):
+    """Runs a session store call; shared backends do blocking I/O, so they run in a worker thread."""
+    backend = SESSION_STORE_CONFIG.get('backend', 'memory')
+    if backend == 'memory' or (backend == 'signed' and SESSION_STORE_CONFIG.get('revocations', 'database') == 'memory'):
+        return method(*args)
+    return await asyncio.to_thread(method, *args)
+
+async def generate_session_token(student):
+    """
+    Generates a session token for a student and stores it in the session store
+    (or, with the 'signed' backend, signs the student's ID, batch and session into it).
+    :param student: The authenticated Student.
+    :return: The token string.
+    """
+    return await _call_session_store(session_store.create, student.student_id, {"batch": student.batch, "session": student.session})
+
+async def get_student_id_from_token(token):
+    """
+    Retrieves the student_id associated with a given session token.
+    :param token: The session token.
+    :return: The student_id if found (and not expired), None otherwise.
+    """
+    return await _call_session_store(session_store.get, token)
+
+identity_cache = IdentityCache(SESSION_STORE_CONFIG.get('identity_cache_size', 4096), SESSION_STORE_CONFIG.get('identity_cache_seconds', 30))
+
+async def sync_cache_versions():
+    """Reads the changed cache versions into pending_cache and identity_cache, as in student_api.py."""
+    if not pending_cache.sync_due():
+        return
+    for name in pending_cache.apply_versions(await student_controller.get_cache_versions(pending_cache.sync_since())):
+        student_id = identity_version_student_id(name)
+        if student_id is not None:
+            identity_cache.invalidate_student(student_id)
+
+def require_student(handler):
+    """
+    Decorator for endpoints of logged-in students; same checks and g.student context as
+    require_student in api/student_api.py, with the identity query awaited on the async pool.
+    """
+    @wraps(handler)
+    async def wrapper(*args, **kwargs):
+        auth_header = request.headers.get('Authorization', '')
+        if not auth_header.startswith('Bearer '):
+            return jsonify({"message": "Authentication required."}), 401
+        token = auth_header[7:]
+        student_id = await get_student_id_from_token(token)
+        if not student_id:
+            return jsonify({"message": "Invalid session token."}), 401
+
+        await sync_cache_versions()
+        context = identity_cache.get(token, student_id)
+        if context is None:
+            if identity_cache.trusts_claims(student_id):
+                context = StudentContext.from_claims(await _call_session_store(session_store.claims, token))
+            if context is None:
+                context = StudentContext.from_db_row(await student_controller.get_student_identity(student_id))
+                if context is None:
+                    return jsonify({"message": "Student not found."}), 404
+            identity_cache.put(token, context)
+        g.student = context
+        return await handler(*args, **kwargs)
+    return wrapper
+
+# --- API Endpoints ---
+
+@app.route('/api/student/login', methods=['POST'])
+async def student_login():
+    """
+    Handles student login using student ID and password.
+    Returns a session token upon successful authentication.
+    """
+    data = await request.get_json()
+    student_id = data.get('student_id')
+    password = data.get('password')
+
+    if not student_id or not password:
+        return jsonify({"message": "Student ID and password are required."}), 400
+
+    try:
+        student_id_int = int(student_id)
+    except ValueError:
+        return jsonify({"message": "Invalid Student ID format."}), 400
+
+    student_user = await student_controller.authenticate_student(student_id=student_id_int, password=password)
+
+    if student_user:
+        token = await generate_session_token(student_user)
+        return jsonify({
+            "message": "Login successful.",
+            "token": token,
+            "student_id": student_user.student_id,
+            "student_name": student_user.name
+        }), 200
+    else:
+        return jsonify({"message": "Invalid student ID or password."}), 401
+
+@app.route('/api/student/logout', methods=['POST'])
+async def student_logout():
+    """
+    Invalidates a student session token upon logout.
+    """
+    token = request.headers.get('Authorization')
+    if token and token.startswith('Bearer '):
+        token = token.split(' ')[1]
+        identity_cache.discard(token)
+        if await _call_session_store(session_store.delete, token):
+            return jsonify({"message": "Logout successful."}), 200
+    return jsonify({"message": "Invalid token or not logged in."}), 401
+
+@app.route('/api/student/evaluations/assigned', methods=['GET'])
+@require_student
+async def get_assigned_evaluations():
+    """
+    Retrieves evaluations currently assigned to the logged-in student that are
+    pending completion, with an ETag (304 Not Modified while unchanged) as in student_api.py.
+    """
+    student = g.student
+    cached = pending_cache.get(student)
+    if cached:
+        etag, assigned_evals = cached
+    else:
+        version_key = pending_cache.version_key(student)
+        pending = await student_controller.get_pending_evaluations(student.student_id, student.batch, student.session)
+        assigned_evals = [{
+            "id": row['id'],
+            "title": row['title'],
+            "course_code": row['course_code'],
+            "batch": row['batch'],
+            "session": row['session'],
+            "last_date": row['last_date'].strftime("%Y-%m-%d") if row['last_date'] else None
+        } for row in pending]
+        etag = pending_cache.put(student, version_key, assigned_evals)
+
+    response = Response("", status=304) if request.if_none_match.contains(etag) else jsonify(assigned_evals)
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+@app.route('/api/student/evaluations/template/<int:template_id>', methods=['GET'])
+@require_student
+async def get_evaluation_template_details(template_id):
+    """
+    Retrieves the details of a specific evaluation template by its ID.
+    """
+    template = await student_controller.get_template_by_id(template_id)
+    if not template:
+        return jsonify({"message": "Evaluation template not found."}), 404
+
+    questions_set = template.questions_set
+    if not isinstance(questions_set, dict):
+        try:
+            questions_set = json.loads(questions_set)
+        except json.JSONDecodeError:
+            return jsonify({"message": "Invalid questions_set format in template."}), 500
+
+    return jsonify({
+        "id": template.id,
+        "title": template.title,
+        "instructions": questions_set.get('instructions', ''),
+        "questions": questions_set.get('questions', [])
+    }), 200
+
+
+@app.route('/api/student/evaluations/submit', methods=['POST'])
+@require_student
+async def submit_evaluation():
+    """
+    Submits a student's evaluation responses and marks the evaluation as complete.
+    """
+    student_id = g.student.student_id
+
+    data = await request.get_json()
+    course_code = data.get('course_code')
+    template_id = data.get('template_id')
+    feedback = data.get('feedback')
+    comment = data.get('comment')
+
+    if not all([template_id, feedback]):
+        return jsonify({"message": "Missing required data (template_id, feedback)."}), 400
+
+    if course_code == "N/A" or not course_code:
+        course_code = None
+
+    try:
+        new_evaluation = Evaluation(
+            id=None,
+            course_code=course_code,
+            template_id=template_id,
+            feedback=feedback,
+            comment=comment,
+            date=datetime.now()
+        )
+        # Feedback row and completion row are committed together, as in student_api.py
+        async with db.transaction():
+            eval_success = await db.execute_query(
+                "INSERT INTO evaluations (course_code, template_id, feedback, comment, date) VALUES (%s, %s, %s, %s, %s)",
+                (new_evaluation.course_code, new_evaluation.template_id, json.dumps(new_evaluation.feedback), new_evaluation.comment, new_evaluation.date)
+            )
+
+            if not eval_success:
+                raise Exception("Failed to save evaluation feedback.")
+
+            if course_code:
+                existing_completion = await db.fetch_data(
+                    "SELECT id FROM evaluation_completion WHERE template_id = %s AND course_code = %s AND student_id = %s",
+                    (template_id, course_code, student_id), fetch_one=True
+                )
+            else:
+                existing_completion = await db.fetch_data(
+                    "SELECT id FROM evaluation_completion WHERE template_id = %s AND course_code IS NULL AND student_id = %s",
+                    (template_id, student_id), fetch_one=True
+                )
+
+            if existing_completion:
+                completion_success = await db.execute_query(
+                    "UPDATE evaluation_completion SET is_completed = TRUE, completion_date = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s",
+                    (datetime.now(), existing_completion['id'])
+                )
+            else:
+                completion_success = await db.execute_query(
+                    "INSERT INTO evaluation_completion (template_id, course_code, student_id, is_completed, completion_date) VALUES (%s, %s, %s, TRUE, %s)",
+                    (template_id, course_code, student_id, datetime.now())
+                )
+
+            if not completion_success:
+                raise Exception("Failed to mark evaluation as complete.")
+
+            if not await student_controller.record_evaluation_stats(template_id, course_code, new_evaluation.feedback):
+                raise Exception("Failed to update evaluation statistics.")
+
+        await student_controller.bump_cache_version(student_pending_version(student_id))
+        pending_cache.bump_student(student_id)
+        return jsonify({"message": "Evaluation submitted successfully."}), 200
+
+    except Exception as e:
+        print(f"Error submitting evaluation: {e}")
+        return jsonify({"message": f"Failed to submit evaluation: {str(e)}"}), 500
+
+@app.route('/api/student/courses_faculty/<string:course_code>', methods=['GET'])
+@require_student
+async def get_course_faculty_api(course_code):
+    """
+    Retrieves faculty members assigned to a specific course.
+    """
+    faculty_list = await student_controller.get_faculty_for_course(course_code)
+    return jsonify(faculty_list), 200
+
+@app.route('/api/student/profile', methods=['GET'])
+@require_student
+async def get_student_profile():
+    """
+    Retrieves the logged-in student's profile data.
+    """
+    student_id = g.student.student_id
+
+    profile_data = await student_controller.get_student_profile_data(student_id)
+    if not profile_data:
+        return jsonify({"message": "Student profile not found."}), 404
+
+    return jsonify(profile_data), 200
+
+@app.route('/api/student/profile/update', methods=['PUT'])
+@require_student
+async def update_student_profile_api():
+    """
+    Updates the logged-in student's profile data.
+    """
+    student_id = g.student.student_id
+
+    data = await request.get_json()
+    if not data:
+        return jsonify({"message": "No data provided for update."}), 400
+
+    editable_fields = ['name', 'contact_no', 'profile_picture']
+    update_data = {k: v for k, v in data.items() if k in editable_fields}
+
+    if not update_data:
+        return jsonify({"message": "No editable fields provided for update."}), 400
+
+    success, message = await student_controller.update_student_profile(student_id, update_data)
+    if success:
+        return jsonify({"message": message}), 200
+    else:
+        return jsonify({"message": message}), 500
+
+@app.route('/api/student/evaluations/completed', methods=['GET'])
+@require_student
+async def get_completed_evaluations():
+    """
+    Retrieves a list of evaluations completed by the logged-in student.
+    """
+    student_id = g.student.student_id
+
+    completed_evals = await student_controller.get_completed_evaluations_for_student(student_id)
+    return jsonify(completed_evals), 200
+
+@app.route('/api/student/evaluations/completed/details', methods=['GET'])
+@require_student
+async def get_completed_evaluation_details_api():
+    """
+    Retrieves the full feedback and comment for a specific completed evaluation.
+    Requires template_id and optionally course_code as query parameters.
+    """
+    student_id = g.student.student_id
+
+    template_id = request.args.get('template_id', type=int)
+    course_code = request.args.get('course_code')
+
+    if not template_id:
+        return jsonify({"message": "Missing template_id parameter."}), 400
+
+    details = await student_controller.get_completed_evaluation_details(student_id, template_id, course_code)
+    if not details:
+        return jsonify({"message": "Completed evaluation details not found."}), 404
+
+    return jsonify(details), 200
+
+
+@app.route('/api/student/complaints/submit', methods=['POST'])
+@require_student
+async def submit_complaint_api():
+    """
+    Submits a new complaint from the logged-in student.
+    """
+    student_id = g.student.student_id
+
+    data = await request.get_json()
+    course_code = data.get('course_code')
+    issue_type = data.get('issue_type')
+    details = data.get('details')
+
+    if not all([issue_type, details]):
+        return jsonify({"message": "Issue type and details are required for a complaint."}), 400
+
+    success, message = await student_controller.submit_complaint(student_id, course_code, issue_type, details)
+    if success:
+        return jsonify({"message": message}), 200
+    else:
+        return jsonify({"message": message}), 500
+
+@app.route('/api/student/complaints/list', methods=['GET'])
+@require_student
+async def get_student_complaints_list():
+    """
+    Returns all complaints submitted by the logged-in student.
+    """
+    student_id = g.student.student_id
+
+    complaints = await student_controller.get_complaints_for_student(student_id)
+    return jsonify(complaints), 200
+
+@app.route('/api/student/requests/faculty_request', methods=['POST'])
+@require_student
+async def submit_faculty_request_api():
+    """
+    Allows a student to submit a request for a new faculty for a course.
+    """
+    student_id = g.student.student_id
+
+    data = await request.get_json()
+    course_name = data.get('course_name')
+    requested_faculty_name = data.get('requested_faculty_name')
+    details = data.get('details')
+
+    if not all([course_name, details]):
+        return jsonify({"message": "Course name and request details are required."}), 400
+
+    success, message = await student_controller.submit_faculty_request(
+        student_id, course_name, requested_faculty_name, details
+    )
+
+    if success:
+        return jsonify({"message": message}), 200
+    else:
+        return jsonify({"message": message}), 500
+
+@app.route('/api/student/courses/upcoming', methods=['GET'])
+@require_student
+async def get_upcoming_courses_api():
+    """
+    Retrieves a list of courses with 'upcoming' status.
+    """
+    upcoming_courses = await student_controller.get_courses_by_status(status='upcoming')
+
+    formatted_courses = [{
+        'course_code': c.course_code,
+        'course_name': c.name
+    } for c in upcoming_courses]
+
+    return jsonify(formatted_courses), 200
+
+# --- Operational Endpoints ---
+
+@app.route('/api/metrics', methods=['GET'])
+async def get_db_metrics():
+    """
+    Exposes per-query-shape database timings, the slow-query log and async pool usage.
+    Returns JSON by default, or the Prometheus text format with ?format=prometheus.
+    Only reachable from the addresses listed in config.METRICS_ALLOWED_ADDRESSES.
+    """
+    if request.remote_addr not in METRICS_ALLOWED_ADDRESSES:
+        return jsonify({"message": "Forbidden."}), 403
+
+    pool_stats = db.stats()
+    if request.args.get('format') == 'prometheus':
+        return Response(db.query_stats.to_prometheus(pool_stats), mimetype='text/plain; version=0.0.4')
+
+    metrics = db.query_stats.snapshot()
+    metrics["pool"] = pool_stats
+    return jsonify(metrics), 200
+
+
+if __name__ == '__main__':
+    # Development server only; in production run under an ASGI server (hypercorn/uvicorn, see above)
+    app.run(port=5000)
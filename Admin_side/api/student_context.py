@@ -0,0 +1,82 @@
+# Admin_side/api/student_context.py
+import threading
+import time
+from collections import OrderedDict
+
+
+class StudentContext:
+    """
+    Identity of the student making a request, resolved once by the @require_student decorator
+    of the student APIs and available to the handler as flask.g.student / quart.g.student.
+    Holds only what handlers need to scope their queries, never the password or records.
+    """
+    def __init__(self, student_id, batch=None, session=None):
+        self.student_id = student_id
+        self.batch = batch
+        self.session = session
+
+    @staticmethod
+    def from_claims(claims):
+        """Builds a context from SessionStore.claims() (signed tokens), or returns None without claims."""
+        if not claims:
+            return None
+        return StudentContext(claims['student_id'], claims.get('batch'), claims.get('session'))
+
+    @staticmethod
+    def from_db_row(row):
+        """Converts an identity row (student_id, batch, session) to a StudentContext."""
+        if not row:
+            return None
+        return StudentContext(row['student_id'], row['batch'], row['session'])
+
+
+class IdentityCache:
+    """
+    Per-process LRU of StudentContext by session token, so a student's identity is queried at most
+    once per ttl_seconds instead of on every request. The token itself is still validated by the
+    session store on each request; the cache only saves the identity query.
+    Students whose record changed after login (invalidate_student()) are re-read from the database,
+    and the batch and session in their signed tokens are no longer trusted.
+    """
+    def __init__(self, max_entries=4096, ttl_seconds=30):
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict() # token -> (StudentContext, expires_at)
+        self._changed_students = set() # Students whose token claims may be out of date
+        self._lock = threading.Lock()
+
+    def get(self, token, student_id):
+        """Returns the cached context of token if it is live and belongs to student_id, None otherwise."""
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            context, expires_at = entry
+            if expires_at <= time.monotonic() or context.student_id != student_id:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return context
+
+    def put(self, token, context):
+        with self._lock:
+            self._entries[token] = (context, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, token):
+        """Forgets a token, e.g. on logout."""
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def invalidate_student(self, student_id):
+        """Forgets every cached context of a student, e.g. after their batch or session changed."""
+        with self._lock:
+            self._changed_students.add(student_id)
+            for token in [token for token, (context, _) in self._entries.items() if context.student_id == student_id]:
+                del self._entries[token]
+
+    def trusts_claims(self, student_id):
+        """False once the student's record changed, so the identity carried by a signed token may be stale."""
+        return student_id not in self._changed_students
@@ -1,3 +1,9 @@
+import os
+
+# Database engine used by DBManager: 'mysql' (DATABASE_CONFIG) or 'sqlite' (SQLITE_CONFIG).
+# The CES_DB_BACKEND environment variable overrides it, e.g. for benchmarks on machines without MySQL.
+DATABASE_BACKEND = os.environ.get('CES_DB_BACKEND', 'mysql')
+
 DATABASE_CONFIG = {
     'host': 'localhost',
     'user': 'root',
@@ -5,6 +11,111 @@ DATABASE_CONFIG = {
     'database': 'CourseEvaluationSystem'
 }
 
+# Optional MySQL read replica, with the same keys as DATABASE_CONFIG. When set, DBManager.fetch_data and
+# fetch_iter read from it, except inside transactions and shortly after the same user's own writes.
+READ_REPLICA_CONFIG = None
+READ_YOUR_WRITES_SECONDS = 5  # Reads go to the primary for this long after a write (covers replica lag)
+
+# SQLite backend (see database/sqlite_backend.py)
+SQLITE_CONFIG = {
+    'path': 'ces_local.db',  # Relative to the project root; ':memory:' for a throwaway single-threaded database
+    'timeout': 5,            # Seconds to wait for a lock held by another connection
+    'schema_files': ['DatabaseSkeleon.txt', 'update_database.sql', 'evaluation_stats.sql', 'student_sessions.sql', 'pending_evaluations.sql']  # Loaded (with seed data) into a new database
+}
+
 APP_NAME = "Course Evaluation System"
 # In Admin_side/config.py
-SECRET_KEY = "a-very-long-and-random-secret-key-that-no-one-can-guess"
\ No newline at end of file
+SECRET_KEY = "a-very-long-and-random-secret-key-that-no-one-can-guess"
+
+# Connection pool used by DBManager (see database/connection_pool.py)
+DB_POOL_CONFIG = {
+    'max_size': 10,       # Maximum number of open connections shared by all threads
+    'min_size': 1,        # Idle connections that are never closed by idle eviction
+    'wait_timeout': 5,    # Seconds to wait for a free connection before failing the query
+    'idle_timeout': 300,  # Seconds an unused connection may stay open
+    'ping_interval': 30   # Idle seconds after which a connection is pinged before reuse
+}
+
+# Pool used by AsyncDBManager (database/async_db_manager.py) in the ASGI student API
+ASYNC_DB_POOL_CONFIG = {
+    'min_size': 1,
+    'max_size': 20,        # Concurrent queries; any number of requests can wait on the pool without a thread each
+    'pool_recycle': 300,   # Seconds after which an idle connection is replaced
+    'wait_timeout': 5      # Seconds a request waits for a free connection before failing
+}
+
+# Per-query instrumentation recorded by DBManager (see database/query_stats.py)
+QUERY_STATS_CONFIG = {
+    'enabled': True,
+    'slow_query_threshold_ms': 200,  # Statements at least this slow go to the slow-query log
+    'slow_query_log_size': 100,      # Number of most recent slow queries kept in memory
+    'caller_sample_every': 10        # Per-method totals are estimated from 1 in N statements (1 = attribute every statement)
+}
+
+# Result cache for reference-data reads made with DBManager.fetch_data(..., cache=True) (see database/query_cache.py)
+QUERY_CACHE_CONFIG = {
+    'enabled': True,
+    'max_entries': 256,   # Least recently used results are evicted beyond this
+    'ttl_seconds': 60     # Upper bound on staleness for writes made by other processes
+}
+
+# N+1 query detection (see database/query_profiler.py). Development/profiling only:
+# groups queries per API request or UI action and reports shapes repeated within it.
+QUERY_PROFILER_CONFIG = {
+    'enabled': False,
+    'repeat_threshold': 5,   # Executions of the same query shape within one operation reported as N+1
+    'stack_depth': 4,        # Application frames kept as the origin of a repeated query
+    'report_log_size': 50    # Number of most recent N+1 reports kept in memory
+}
+
+# Evaluation reports (see controllers/report_controller.py)
+REPORT_CONFIG = {
+    # 'stats': read counts from the evaluation_question_stats tables maintained on each submission (requires
+    # evaluation_stats.sql and a backfill, see that file; falls back to 'python' while they are missing or out of step),
+    # 'sql': count/sum/average rating and multiple-choice answers in MySQL with JSON_TABLE (MySQL 8.0+),
+    # 'python': decode every submission in Python. 'sql' falls back to 'python' on non-MySQL backends.
+    # 'pandas': keep all responses in an in-memory columnar frame (reloaded after changes) and compute reports,
+    # including rating std-dev/percentiles and answer cross-filters, with vectorized operations.
+    'aggregation': 'python',
+    # Report charts are rendered by a pool of worker processes (None: one per CPU) and the
+    # rendered images of the last 'chart_cache_size' distinct charts are kept in memory.
+    'chart_workers': None,
+    'chart_cache_size': 128,
+    # Rows per write (and per Parquet row group) when exporting raw responses
+    'export_chunk_size': 5000
+}
+
+# Client addresses allowed to read /api/metrics from the student API
+METRICS_ALLOWED_ADDRESSES = ['127.0.0.1', '::1']
+
+# Student API session tokens (see api/session_store.py)
+SESSION_STORE_CONFIG = {
+    # 'memory': per-process LRU (sessions are lost on restart; single worker process only),
+    # 'database': student_sessions table (student_sessions.sql), shared by all API processes,
+    # 'redis': any Redis-protocol server at 'redis_url' (requires `pip install redis`),
+    # 'signed': stateless tokens signed with SECRET_KEY and verified without any lookup.
+    'backend': 'memory',
+    'ttl_seconds': 8 * 3600,   # Sessions expire this long after login
+    'max_sessions': 10000,     # 'memory' backend: least recently used sessions are evicted beyond this
+    'cache_size': 1024,        # 'database'/'redis': tokens cached per process in front of the shared store
+    'cache_seconds': 5,        # ... for at most this long, so a logout in another process applies within it
+    'redis_url': 'redis://localhost:6379/0',
+    'redis_prefix': 'ces:session:',
+    # 'signed' backend: logged-out tokens are kept in a revocation list until they expire, in
+    # revoked_student_tokens ('database', student_sessions.sql), re-read every revocation_sync_seconds, or
+    # per process ('memory'). With 'memory' a logout only applies to the worker that handled it: use it
+    # with a single API process only.
+    'revocations': 'database',
+    'revocation_sync_seconds': 5,
+    # Student identity (batch, session) cached per token by @require_student, so at most one
+    # identity query is made per token every identity_cache_seconds (none at all with signed tokens)
+    'identity_cache_size': 4096,
+    'identity_cache_seconds': 30
+}
+
+# Student API cache of each student's pending evaluations (api/pending_cache.py), answered with
+# 304 Not Modified while unchanged. Admin changes reach every API process within sync_seconds.
+PENDING_CACHE_CONFIG = {
+    'max_students': 10000,  # Students whose pending lists are kept per API process
+    'sync_seconds': 5       # Seconds between reads of the cache_versions table
+}
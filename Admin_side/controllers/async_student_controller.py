@@ -0,0 +1,264 @@
+# controllers/async_student_controller.py
+import json
+from pymysql import Error
+from database.async_db_manager import AsyncDBManager
+from models.student_model import Student
+from models.course_model import Course
+from models.evaluation_template_model import EvaluationTemplate
+from controllers.student_controller import PENDING_EVALUATIONS_QUERY
+from controllers.cache_version_controller import BUMP_CACHE_VERSION, CACHE_VERSIONS_QUERY
+from controllers.evaluation_stats_controller import (
+    TEMPLATE_QUESTIONS_QUERY, UPSERT_QUESTION_STATS, UPSERT_SUBMISSION_STATS, STATS_TABLES_PROBE,
+    parse_questions, question_stat_rows
+)
+
+class AsyncStudentController:
+    """
+    Awaitable versions of the StudentController, EvaluationTemplateController and
+    FacultyRequestController methods used by the student API, running on AsyncDBManager.
+    Queries and return values match the synchronous controllers so that the Flask and
+    ASGI student APIs return identical payloads.
+    """
+    stats_tables_installed = None # Per process, see EvaluationStatsController.tables_available()
+
+    def __init__(self):
+        self.db = AsyncDBManager()
+
+    async def authenticate_student(self, student_id, password):
+        """
+        Authenticates a student user by student ID and password.
+        :return: A Student object if authentication is successful, None otherwise.
+        """
+        query = "SELECT * FROM students WHERE student_id = %s AND password = %s;"
+        student_data = await self.db.fetch_data(query, (student_id, password), fetch_one=True)
+        if student_data:
+            print(f"Authentication successful for student ID: {student_id}")
+            return Student.from_db_row(student_data)
+        print(f"Authentication failed for student ID: {student_id}")
+        return None
+
+    async def get_student_by_id(self, student_id):
+        """Fetches a single student record by ID."""
+        query = "SELECT * FROM students WHERE student_id = %s;"
+        student_data = await self.db.fetch_data(query, (student_id,), fetch_one=True)
+        if student_data:
+            return Student.from_db_row(student_data)
+        return None
+
+    async def get_student_identity(self, student_id):
+        """Fetches only student_id, batch and session of a student; see StudentController.get_student_identity()."""
+        query = "SELECT student_id, batch, session FROM students WHERE student_id = %s;"
+        return await self.db.fetch_data(query, (student_id,), fetch_one=True)
+
+    async def get_courses_for_student(self, student_id):
+        """
+        Retrieves all courses a student is assigned to, either individually or via batch.
+        Returns a list of dictionaries with course_code and course_name.
+        """
+        query = """
+        SELECT DISTINCT c.course_code, c.name
+        FROM courses c
+        JOIN course_student cs ON c.course_code = cs.course_code
+        LEFT JOIN students s ON cs.student_id = s.student_id
+        WHERE (cs.student_id = %s) OR (s.student_id = %s AND cs.student_id IS NULL AND s.batch = cs.batch);
+        """
+        data = await self.db.fetch_data(query, (student_id, student_id), fetch_all=True)
+        return data if data else []
+
+    async def get_pending_evaluations(self, student_id, batch=None, session=None):
+        """Retrieves the ongoing evaluations assigned to a student that they have not completed yet."""
+        data = await self.db.fetch_data(
+            PENDING_EVALUATIONS_QUERY, (student_id, batch, batch, session, student_id), fetch_all=True
+        )
+        return data if data else []
+
+    async def bump_cache_version(self, name):
+        """Increments a cache version; see CacheVersionController.bump(). :return: True on success."""
+        return bool(await self.db.execute_query(BUMP_CACHE_VERSION, (name,)))
+
+    async def get_cache_versions(self, since):
+        """Fetches the cache versions changed since a time; see CacheVersionController.get_versions()."""
+        return await self.db.fetch_data(CACHE_VERSIONS_QUERY, (since,), fetch_all=True)
+
+    async def get_template_by_id(self, template_id):
+        """Fetches a single evaluation template by its ID."""
+        query = "SELECT * FROM evaluation_templates WHERE id = %s;"
+        template_data = await self.db.fetch_data(query, (template_id,), fetch_one=True)
+        if template_data:
+            return EvaluationTemplate.from_db_row(template_data)
+        return None
+
+    async def get_faculty_for_course(self, course_code):
+        """Retrieves all faculty members assigned to a specific course."""
+        query = """
+        SELECT f.faculty_id, f.name, f.email
+        FROM faculty f
+        JOIN course_faculty cf ON f.faculty_id = cf.faculty_id
+        WHERE cf.course_code = %s;
+        """
+        data = await self.db.fetch_data(query, (course_code,), fetch_all=True)
+        return data if data else []
+
+    async def get_student_profile_data(self, student_id):
+        """Fetches profile data for a specific student, without the password."""
+        student = await self.get_student_by_id(student_id)
+        if student:
+            profile_data = student.to_dict()
+            profile_data.pop('password', None)
+            return profile_data
+        return None
+
+    async def update_student_profile(self, student_id, update_data):
+        """
+        Updates editable profile data for a student.
+        Expected update_data keys: name, contact_no, profile_picture (optional)
+        :return: A tuple (success_boolean, message_string).
+        """
+        student = await self.get_student_by_id(student_id)
+        if not student:
+            return False, "Student not found."
+
+        if 'name' in update_data:
+            student.name = update_data['name']
+        if 'contact_no' in update_data:
+            student.contact_no = update_data['contact_no']
+        if 'profile_picture' in update_data:
+            student.profile_picture = update_data['profile_picture']
+
+        query = """
+        UPDATE students SET
+            name = %s, email = %s, password = %s, contact_no = %s, dob = %s, gender = %s,
+            session = %s, batch = %s, enrollment_date = %s, department = %s, cgpa = %s,
+            behavioral_records = %s, profile_picture = %s
+        WHERE student_id = %s;
+        """
+        params = (
+            student.name, student.email, student.password, student.contact_no,
+            student.dob, student.gender, student.session, student.batch, student.enrollment_date,
+            student.department, student.cgpa, student.behavioral_records, student.profile_picture,
+            student.student_id
+        )
+        if await self.db.execute_query(query, params):
+            return True, "Profile updated successfully."
+        return False, "Failed to update profile. Database error."
+
+    async def get_completed_evaluations_for_student(self, student_id):
+        """Fetches a list of evaluations completed by a specific student."""
+        query = """
+        SELECT ec.completion_date, et.title, et.course_code, et.id AS template_id, c.name AS course_name
+        FROM evaluation_completion ec
+        JOIN evaluation_templates et ON ec.template_id = et.id
+        LEFT JOIN courses c ON et.course_code = c.course_code
+        WHERE ec.student_id = %s AND ec.is_completed = TRUE
+        ORDER BY ec.completion_date DESC;
+        """
+        completed_evals_data = await self.db.fetch_data(query, (student_id,), fetch_all=True)
+        return [{
+            "title": row['title'],
+            "course_code": row['course_code'] if row['course_code'] else "N/A",
+            "course_name": row['course_name'] if row['course_name'] else "N/A",
+            "completion_date": row['completion_date'].strftime("%Y-%m-%d %H:%M") if row['completion_date'] else "N/A",
+            "template_id": row['template_id']
+        } for row in completed_evals_data or []]
+
+    async def get_completed_evaluation_details(self, student_id, template_id, course_code):
+        """Fetches the feedback and general comment for a specific completed evaluation."""
+        if course_code == "N/A" or not course_code:
+            query = """
+            SELECT feedback, comment
+            FROM evaluations
+            WHERE template_id = %s
+            ORDER BY date DESC
+            LIMIT 1;
+            """
+            eval_data = await self.db.fetch_data(query, (template_id,), fetch_one=True)
+        else:
+            query = """
+            SELECT feedback, comment
+            FROM evaluations
+            WHERE template_id = %s AND course_code = %s
+            ORDER BY date DESC
+            LIMIT 1;
+            """
+            eval_data = await self.db.fetch_data(query, (template_id, course_code), fetch_one=True)
+
+        if eval_data:
+            feedback = eval_data['feedback']
+            if isinstance(feedback, str):
+                try:
+                    feedback = json.loads(feedback)
+                except json.JSONDecodeError:
+                    feedback = {}
+            return {
+                "feedback": feedback,
+                "comment": eval_data['comment']
+            }
+        return None
+
+    async def submit_complaint(self, student_id, course_code, issue_type, details):
+        """
+        Submits a new complaint from a student.
+        :return: A tuple (success_boolean, message_string).
+        """
+        query = """
+        INSERT INTO complaints (student_id, course_code, issue_type, details, status)
+        VALUES (%s, %s, %s, %s, %s);
+        """
+        params = (student_id, course_code if course_code else None, issue_type, details, 'pending')
+        if await self.db.execute_query(query, params):
+            return True, "Complaint submitted successfully."
+        return False, "Failed to submit complaint. Database error."
+
+    async def get_complaints_for_student(self, student_id):
+        """Fetches all complaints submitted by a specific student."""
+        query = """
+            SELECT issue_type, details, course_code, status
+            FROM complaints
+            WHERE student_id = %s
+            ORDER BY created_at DESC
+        """
+        data = await self.db.fetch_data(query, (student_id,), fetch_all=True)
+        return data if data else []
+
+    async def submit_faculty_request(self, student_id, course_name, requested_faculty_name, details):
+        """
+        Submits a new faculty request from a student.
+        :return: A tuple (success_boolean, message_string).
+        """
+        query = """
+        INSERT INTO faculty_requests (student_id, course_name, requested_faculty_name, details, status)
+        VALUES (%s, %s, %s, %s, %s);
+        """
+        params = (student_id, course_name, requested_faculty_name, details, 'pending')
+        if await self.db.execute_query(query, params):
+            return True, "Faculty request submitted successfully."
+        return False, "Failed to submit faculty request. Database error."
+
+    async def get_courses_by_status(self, status):
+        """Fetches courses with the given status as Course objects."""
+        query = "SELECT * FROM courses WHERE status = %s ORDER BY name;"
+        courses_data = await self.db.fetch_data(query, (status,), fetch_all=True)
+        if courses_data:
+            return [Course.from_db_row(row) for row in courses_data]
+        return []
+
+    async def record_evaluation_stats(self, template_id, course_code, feedback):
+        """
+        Adds one submission to the report stats tables; see EvaluationStatsController.record_submission().
+        Call it inside the transaction that inserts the evaluation.
+        :return: True on success (or if the stats tables are not installed), False on failure.
+        """
+        if AsyncStudentController.stats_tables_installed is None:
+            try:
+                AsyncStudentController.stats_tables_installed = await self.db.fetch_data(STATS_TABLES_PROBE, fetch_one=True) is not None
+            except Error:
+                AsyncStudentController.stats_tables_installed = False
+        if not AsyncStudentController.stats_tables_installed:
+            return True
+        template = await self.db.fetch_data(TEMPLATE_QUESTIONS_QUERY, (template_id,), fetch_one=True)
+        if not template:
+            return False
+        rows = question_stat_rows(template_id, course_code, parse_questions(template['questions_set']), feedback)
+        if rows and await self.db.execute_many(UPSERT_QUESTION_STATS, rows) is False:
+            return False
+        return bool(await self.db.execute_query(UPSERT_SUBMISSION_STATS, (template_id, course_code or '', 1)))
@@ -0,0 +1,60 @@
+# controllers/cache_version_controller.py
+from database.db_manager import DBManager
+
+# Version bumped by the admin app whenever the pending evaluations of any student may have changed
+# (template assignments, deadlines, course/batch assignments). See api/pending_cache.py.
+PENDING_EVALUATIONS_VERSION = "pending_evaluations"
+# Prefix of the version bumped when a student's record (batch, session) changes or is deleted,
+# so the student API re-reads their identity (see api/student_context.py)
+STUDENT_IDENTITY_VERSION = "student"
+
+# Shared with the async student API (controllers/async_student_controller.py)
+BUMP_CACHE_VERSION = """
+INSERT INTO cache_versions (name, version, updated_at) VALUES (%s, 1, NOW())
+ON DUPLICATE KEY UPDATE version = version + 1, updated_at = NOW();
+"""
+CACHE_VERSIONS_QUERY = "SELECT name, version, updated_at FROM cache_versions WHERE updated_at >= %s;"
+
+
+def student_pending_version(student_id):
+    """Name of the version bumped when one student's pending evaluations change (their own submissions)."""
+    return f"{PENDING_EVALUATIONS_VERSION}:{student_id}"
+
+
+def student_identity_version(student_id):
+    """Name of the version bumped when a student's record is updated or deleted."""
+    return f"{STUDENT_IDENTITY_VERSION}:{student_id}"
+
+
+def identity_version_student_id(name):
+    """Returns the student_id of a student_identity_version() name, or None for other versions."""
+    prefix, _, student_id = name.partition(':')
+    if prefix != STUDENT_IDENTITY_VERSION or not student_id:
+        return None
+    return int(student_id) if student_id.isdigit() else student_id
+
+
+class CacheVersionController:
+    """
+    Version counters in the cache_versions table (pending_evaluations.sql), through which the admin
+    app and the student API processes tell each other that cached data is out of date.
+    """
+    def __init__(self):
+        self.db = DBManager()
+
+    def bump(self, name=PENDING_EVALUATIONS_VERSION):
+        """
+        Increments a version, creating it on first use. Call it after the change has been committed
+        (not inside its transaction): a failed bump must not undo the change, and other processes must
+        not rebuild their caches from the old data under the new version. A failed bump only leaves
+        other processes' cached copies in place until the next bump of the same version.
+        :return: True on success, False on failure.
+        """
+        return self.db.execute_query(BUMP_CACHE_VERSION, (name,))
+
+    def get_versions(self, since):
+        """
+        Fetches the versions changed since a time (of the database clock).
+        :return: A list of dictionaries with name, version and updated_at, or None on failure.
+        """
+        return self.db.fetch_data(CACHE_VERSIONS_QUERY, (since,), fetch_all=True, primary=True)
@@ -0,0 +1,117 @@
+# Admin_side/controllers/chart_renderer.py
+import hashlib
+import io
+import json
+import textwrap
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+CHART_SIZE = (6, 4) # Inches, at CHART_DPI
+CHART_DPI = 100
+
+
+def chart_spec(question_text, question_data, size=CHART_SIZE):
+    """
+    Returns the (question_text, question_type, labels, values, size) tuple a question's chart is
+    rendered from, or None if the question gets no chart (text questions, empty data, ratings with
+    a single answer option).
+    """
+    question_type = question_data.get("type")
+    data = question_data.get("data", {})
+    if question_type not in ("rating", "multiple_choice") or not data:
+        return None
+    if question_type == "rating" and len(data) <= 1:
+        return None
+    return (question_text, question_type, tuple(str(label) for label in data.keys()), tuple(data.values()), tuple(size))
+
+
+def chart_key(spec):
+    """Hash of a chart spec: equal histograms give equal keys, so unchanged charts are not re-rendered."""
+    return hashlib.sha1(json.dumps(spec, default=str).encode("utf-8")).hexdigest()
+
+
+def render_chart(spec):
+    """
+    Renders one chart spec (see chart_spec) to PNG bytes with the Agg canvas and the object-oriented
+    Figure API, so it runs in worker processes without any pyplot state.
+    """
+    question_text, question_type, labels, values, size = spec
+    figure = Figure(figsize=size, dpi=CHART_DPI)
+    FigureCanvasAgg(figure)
+    axes = figure.add_subplot()
+    title_width = int(size[0] * 10) # Characters per title line that fit the figure width
+    if question_type == "rating":
+        axes.bar(labels, values, color="#1976d2")
+        axes.set_title(textwrap.fill(f"{question_text} (Ratings)", title_width))
+        axes.set_xlabel("Rating")
+        axes.set_ylabel("Count")
+    else:
+        axes.pie(values, labels=[textwrap.fill(label, title_width // 3) for label in labels], autopct='%1.1f%%', startangle=140)
+        axes.set_title(textwrap.fill(f"{question_text} (MCQ)", title_width))
+    figure.tight_layout()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+class ChartRenderer:
+    """
+    Renders report charts in a process pool and keeps the PNG bytes in an LRU cache keyed by
+    chart_key(), so re-running an unchanged report renders nothing.
+    """
+    def __init__(self, max_workers=None, cache_size=128):
+        """
+        :param max_workers: Size of the rendering process pool (None: one per CPU, 0: render in this process).
+        :param cache_size: Number of rendered charts kept in memory.
+        """
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.cache = OrderedDict() # chart_key -> PNG bytes, least recently used first
+        self.pool = None
+
+    def render(self, report_data, size=CHART_SIZE):
+        """
+        Returns {question_text: PNG bytes} for every question of report_data that gets a chart,
+        in report order. Cached charts are reused; the others are rendered in parallel.
+        """
+        keys = {}
+        missing = {}
+        for question_text, question_data in report_data.items():
+            spec = chart_spec(question_text, question_data, size)
+            if spec is None:
+                continue
+            key = chart_key(spec)
+            keys[question_text] = key
+            if key in self.cache:
+                self.cache.move_to_end(key)
+            else:
+                missing[key] = spec
+
+        for key, image in zip(missing, self._render_all(list(missing.values()))):
+            self.cache[key] = image
+        charts = {question_text: self.cache[key] for question_text, key in keys.items()}
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return charts
+
+    def _render_all(self, specs):
+        """Renders specs in the process pool; falls back to rendering in this process if the pool is unavailable."""
+        if len(specs) <= 1 or self.max_workers == 0:
+            return [render_chart(spec) for spec in specs]
+        try:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            return list(self.pool.map(render_chart, specs))
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Chart process pool unavailable, rendering in-process: {e}")
+            self.shutdown()
+            return [render_chart(spec) for spec in specs]
+
+    def shutdown(self):
+        """Stops the worker processes."""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
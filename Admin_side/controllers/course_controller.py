@@ -5,16 +5,21 @@ from models.faculty_model import Faculty
 from models.student_model import Student
 from models.course_faculty_model import CourseFaculty
 from models.course_student_model import CourseStudent
+from controllers.cache_version_controller import CacheVersionController
+from controllers.evaluation_stats_controller import EvaluationStatsController
+from pymysql import Error
 
 class CourseController:
     def __init__(self):
         self.db = DBManager()
+        self.cache_version_controller = CacheVersionController() # Student API caches of pending evaluations
+        self.evaluation_stats_controller = EvaluationStatsController()
 
     # --- Course Management ---
     def get_all_courses(self):
         """Fetches all course records."""
         query = "SELECT * FROM courses ORDER BY name;"
-        courses_data = self.db.fetch_data(query, fetch_all=True)
+        courses_data = self.db.fetch_data(query, fetch_all=True, cache=True)
         if courses_data:
             return [Course.from_db_row(row) for row in courses_data]
         return []
@@ -40,9 +45,20 @@ class CourseController:
         return self.db.execute_query(query, params)
 
     def delete_course(self, course_code):
-        """Deletes a course record by code."""
+        """
+        Deletes a course record by code. Its evaluations are deleted by cascade, and their
+        report counts in the same transaction.
+        """
         query = "DELETE FROM courses WHERE course_code = %s;"
-        return self.db.execute_query(query, (course_code,))
+        try:
+            with self.db.transaction():
+                self.db.execute_query(query, (course_code,))
+                if not self.evaluation_stats_controller.delete_course(course_code):
+                    raise Error("Failed to delete the course's evaluation stats.")
+        except Error as e:
+            print(f"Error deleting course: {e}")
+            return False
+        return self._student_assignments_changed(True)
 
     # --- Course-Faculty Assignments ---
     def get_assigned_faculty_for_course(self, course_code):
@@ -82,6 +98,23 @@ class CourseController:
         query = "DELETE FROM course_faculty WHERE course_code = %s AND faculty_id = %s;"
         return self.db.execute_query(query, (course_code, faculty_id))
 
+    def assign_faculty_members_to_course(self, course_code, faculty_ids):
+        """
+        Assigns several faculty members to a course with one multi-row INSERT per chunk.
+        Faculty already assigned are skipped.
+        :return: Number of newly assigned faculty, or False on failure.
+        """
+        query = "INSERT IGNORE INTO course_faculty (course_code, faculty_id) VALUES (%s, %s);"
+        return self.db.execute_many(query, [(course_code, faculty_id) for faculty_id in faculty_ids])
+
+    def unassign_faculty_members_from_course(self, course_code, faculty_ids):
+        """
+        Removes several faculty assignments from a course with one DELETE ... IN per chunk.
+        :return: Number of removed assignments, or False on failure.
+        """
+        query = "DELETE FROM course_faculty WHERE course_code = %s AND faculty_id IN ({placeholders});"
+        return self._delete_in_chunks(query, (course_code,), faculty_ids)
+
     # --- Course-Student/Batch Assignments ---
     def get_assigned_students_batches_for_course(self, course_code):
         """Fetches students and batches assigned to a specific course."""
@@ -102,7 +135,7 @@ class CourseController:
             return False
 
         query = "INSERT INTO course_student (course_code, student_id) VALUES (%s, %s);"
-        return self.db.execute_query(query, (course_code, student_id))
+        return self._student_assignments_changed(self.db.execute_query(query, (course_code, student_id)))
 
     def assign_batch_to_course(self, course_code, batch):
         """Assigns an entire batch to a course."""
@@ -112,18 +145,83 @@ class CourseController:
             return False
 
         query = "INSERT INTO course_student (course_code, batch) VALUES (%s, %s);"
-        return self.db.execute_query(query, (course_code, batch))
+        return self._student_assignments_changed(self.db.execute_query(query, (course_code, batch)))
 
     def unassign_student_from_course(self, course_code, student_id):
         """Removes an individual student assignment from a course."""
         query = "DELETE FROM course_student WHERE course_code = %s AND student_id = %s;"
-        return self.db.execute_query(query, (course_code, student_id))
+        return self._student_assignments_changed(self.db.execute_query(query, (course_code, student_id)))
 
     def unassign_batch_from_course(self, course_code, batch):
         """Removes a batch assignment from a course."""
         query = "DELETE FROM course_student WHERE course_code = %s AND batch = %s AND student_id IS NULL;"
-        return self.db.execute_query(query, (course_code, batch))
+        return self._student_assignments_changed(self.db.execute_query(query, (course_code, batch)))
         
+    def assign_students_to_course(self, course_code, student_ids):
+        """
+        Assigns several individual students to a course with one multi-row INSERT per chunk.
+        Students already assigned are skipped.
+        :return: Number of newly assigned students, or False on failure.
+        """
+        query = "INSERT IGNORE INTO course_student (course_code, student_id) VALUES (%s, %s);"
+        return self._student_assignments_changed(self.db.execute_many(query, [(course_code, student_id) for student_id in student_ids]))
+
+    def assign_batches_to_course(self, course_code, batches):
+        """
+        Assigns several batches to a course with one multi-row INSERT per chunk.
+        Batches already assigned are skipped.
+        :return: Number of newly assigned batches, or False on failure.
+        """
+        query = "INSERT IGNORE INTO course_student (course_code, batch) VALUES (%s, %s);"
+        return self._student_assignments_changed(self.db.execute_many(query, [(course_code, batch) for batch in batches]))
+
+    def unassign_students_from_course(self, course_code, student_ids):
+        """
+        Removes several individual student assignments from a course with one DELETE ... IN per chunk.
+        :return: Number of removed assignments, or False on failure.
+        """
+        query = "DELETE FROM course_student WHERE course_code = %s AND student_id IN ({placeholders});"
+        return self._student_assignments_changed(self._delete_in_chunks(query, (course_code,), student_ids))
+
+    def unassign_batches_from_course(self, course_code, batches):
+        """
+        Removes several batch assignments from a course with one DELETE ... IN per chunk.
+        :return: Number of removed assignments, or False on failure.
+        """
+        query = "DELETE FROM course_student WHERE course_code = %s AND batch IN ({placeholders}) AND student_id IS NULL;"
+        return self._student_assignments_changed(self._delete_in_chunks(query, (course_code,), batches))
+
+    def _student_assignments_changed(self, result):
+        """
+        Tells the student API that pending evaluations may have changed when a course-student
+        assignment write went through (result is truthy), then returns result unchanged.
+        """
+        if result:
+            self.cache_version_controller.bump()
+        return result
+
+    def _delete_in_chunks(self, query, leading_params, values):
+        """
+        Runs a DELETE whose `{placeholders}` IN-list is filled with `values`, one statement
+        per BULK_CHUNK_SIZE values, all committed together.
+        :return: Number of deleted rows, or False on failure.
+        """
+        values = list(values)
+        if not values:
+            return 0
+        chunk_size = self.db.BULK_CHUNK_SIZE
+        deleted = 0
+        try:
+            with self.db.transaction():
+                for start in range(0, len(values), chunk_size):
+                    chunk = values[start:start + chunk_size]
+                    chunk_query = query.format(placeholders=', '.join(['%s'] * len(chunk)))
+                    deleted += self.db.execute_many(chunk_query, [tuple(leading_params) + tuple(chunk)])
+        except Error as e:
+            print(f"Error deleting assignments in bulk: {e}")
+            return False
+        return deleted
+
     def get_course_assignments_overview(self, status=None, faculty_id=None, batch=None, department=None):
         """
         Fetches a combined overview of courses, their assigned faculty, and assigned students/batches.
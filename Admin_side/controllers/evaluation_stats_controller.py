@@ -0,0 +1,203 @@
+# Admin_side/controllers/evaluation_stats_controller.py
+import json
+from pymysql import Error
+from database.db_manager import DBManager
+
+# Statements shared with the ASGI student API (controllers/async_student_controller.py)
+TEMPLATE_QUESTIONS_QUERY = "SELECT questions_set FROM evaluation_templates WHERE id = %s LOCK IN SHARE MODE;"
+
+UPSERT_QUESTION_STATS = """
+INSERT INTO evaluation_question_stats
+    (template_id, course_code, question_no, question_text, question_type, answer_option, responses, rating_sum)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    question_text = VALUES(question_text), question_type = VALUES(question_type),
+    responses = responses + VALUES(responses), rating_sum = rating_sum + VALUES(rating_sum)
+"""
+
+# Fails until evaluation_stats.sql has been run; the stats are optional (see EvaluationStatsController.tables_available)
+STATS_TABLES_PROBE = "SELECT COUNT(*) AS table_rows FROM evaluation_submission_stats WHERE 1 = 0;"
+
+UPSERT_SUBMISSION_STATS = """
+INSERT INTO evaluation_submission_stats (template_id, course_code, submissions)
+VALUES (%s, %s, %s)
+ON DUPLICATE KEY UPDATE submissions = submissions + VALUES(submissions)
+"""
+
+MAX_OPTION_LENGTH = 255 # Size of evaluation_question_stats.answer_option
+
+
+def parse_questions(questions_set):
+    """Returns the question list of a template's questions_set (JSON string or dict); [] if it cannot be decoded."""
+    if not isinstance(questions_set, dict):
+        try:
+            questions_set = json.loads(questions_set)
+        except (json.JSONDecodeError, TypeError):
+            return []
+    return questions_set.get('questions', [])
+
+
+def answer_options(question_type, answer):
+    """
+    Yields (option, rating_value) for each counted option of one answer, with the same rules as
+    ReportController's row-by-row aggregation: a rating counts if it starts with an integer,
+    a multiple-choice answer counts once per selected option, text answers are not counted.
+    """
+    if not answer:
+        return
+    if question_type == 'rating':
+        try:
+            yield str(answer), int(str(answer).split(' ')[0])
+        except (ValueError, IndexError):
+            pass
+    elif question_type == 'multiple_choice':
+        for option in (answer if isinstance(answer, list) else [answer]):
+            yield str(option), 0
+
+
+def question_stat_rows(template_id, course_code, questions, feedback):
+    """
+    Builds the UPSERT_QUESTION_STATS parameter tuples for one submission, sorted by
+    (question_no, answer_option) so concurrent submissions lock the same stat rows in the same
+    order instead of deadlocking on each other (answers arrive in any order).
+    :param questions: The template's question list (see parse_questions).
+    :param feedback: The submitted answers, keyed by question text.
+    """
+    rows = []
+    if not isinstance(feedback, dict):
+        return rows
+    for question_no, question in enumerate(questions):
+        for option, rating_value in answer_options(question['type'], feedback.get(question['text'])):
+            rows.append((
+                template_id, course_code or '', question_no, question['text'], question['type'],
+                option[:MAX_OPTION_LENGTH], 1, rating_value
+            ))
+    rows.sort(key=lambda row: (row[2], row[5]))
+    return rows
+
+
+class EvaluationStatsController:
+    """
+    Maintains evaluation_question_stats / evaluation_submission_stats (evaluation_stats.sql):
+    per-option answer counts that ReportController reads instead of re-aggregating every submission.
+    """
+    tables_installed = None # Per process, see tables_available()
+
+    def __init__(self):
+        self.db = DBManager()
+
+    def tables_available(self):
+        """
+        True if evaluation_stats.sql has been run on this database. The stats are optional: without the
+        tables submissions and template updates skip them, and ReportController only reads the stats while
+        their totals match the evaluations table. Checked once per process, so restart the student API
+        after creating the tables (and before the backfill).
+        """
+        if EvaluationStatsController.tables_installed is None:
+            try:
+                EvaluationStatsController.tables_installed = self.db.fetch_data(STATS_TABLES_PROBE, fetch_one=True) is not None
+            except Error: # Raised inside a transaction; a missing table does not abort it
+                EvaluationStatsController.tables_installed = False
+        return EvaluationStatsController.tables_installed
+
+    def record_submission(self, template_id, course_code, feedback):
+        """
+        Adds one submission to the stats tables. Call it inside the transaction that inserts the
+        evaluation, so the counts are committed (or rolled back) together with it.
+        :return: True on success (or if the stats tables are not installed), False on failure.
+        """
+        if not self.tables_available():
+            return True
+        # The shared lock makes a concurrent rebuild() of this template wait for the submission, and vice versa
+        template = self.db.fetch_data(TEMPLATE_QUESTIONS_QUERY, (template_id,), fetch_one=True)
+        if not template:
+            return False
+        rows = question_stat_rows(template_id, course_code, parse_questions(template['questions_set']), feedback)
+        if rows and self.db.execute_many(UPSERT_QUESTION_STATS, rows) is False:
+            return False
+        return bool(self.db.execute_query(UPSERT_SUBMISSION_STATS, (template_id, course_code or '', 1)))
+
+    def delete_course(self, course_code):
+        """
+        Removes a course's counts. Call it inside the transaction that deletes the course, whose
+        evaluations are deleted with it (ON DELETE CASCADE) while the stats tables have no foreign
+        key to courses (batch/session-only evaluations are counted under course_code '').
+        :return: True on success (or if the stats tables are not installed), False on failure.
+        """
+        if not self.tables_available():
+            return True
+        if not self.db.execute_query("DELETE FROM evaluation_question_stats WHERE course_code = %s", (course_code,)):
+            return False
+        return bool(self.db.execute_query("DELETE FROM evaluation_submission_stats WHERE course_code = %s", (course_code,)))
+
+    def rebuild(self, template_id=None):
+        """
+        Recomputes the stats of one template (or of all templates) from the evaluations table.
+        Use it to backfill the tables and after a template's questions have changed.
+        :return: A tuple (success_boolean, message_string).
+        """
+        if template_id is None:
+            template_ids = [row['id'] for row in self.db.fetch_data("SELECT id FROM evaluation_templates ORDER BY id", primary=True) or []]
+        else:
+            template_ids = [template_id]
+
+        submissions = 0
+        try:
+            for current_id in template_ids:
+                submissions += self._rebuild_template(current_id)
+        except Error as e:
+            print(f"Error rebuilding evaluation stats: {e}")
+            return False, f"Failed to rebuild evaluation stats: {e}"
+        return True, f"Rebuilt evaluation stats for {len(template_ids)} template(s) from {submissions} submission(s)."
+
+    def _rebuild_template(self, template_id):
+        """Replaces one template's stats in a single transaction. Returns the number of submissions counted."""
+        with self.db.transaction():
+            # Exclusive lock: submissions of this template wait until the rebuilt counts are committed
+            template = self.db.fetch_data(
+                "SELECT questions_set FROM evaluation_templates WHERE id = %s FOR UPDATE;", (template_id,), fetch_one=True
+            )
+            if not template:
+                return 0
+            questions = parse_questions(template['questions_set'])
+            self.db.execute_query("DELETE FROM evaluation_question_stats WHERE template_id = %s", (template_id,))
+            self.db.execute_query("DELETE FROM evaluation_submission_stats WHERE template_id = %s", (template_id,))
+
+            option_counts = {} # (course_code, question_no, option) -> [question_text, question_type, responses, rating_sum]
+            submission_counts = {} # course_code -> submissions
+            evaluations = self.db.fetch_data(
+                "SELECT course_code, feedback FROM evaluations WHERE template_id = %s", (template_id,), fetch_all=True
+            ) or []
+            for evaluation in evaluations:
+                course_code = evaluation['course_code'] or ''
+                submission_counts[course_code] = submission_counts.get(course_code, 0) + 1
+                try:
+                    feedback = json.loads(evaluation['feedback'])
+                except (json.JSONDecodeError, TypeError):
+                    continue
+                for row in question_stat_rows(template_id, course_code, questions, feedback):
+                    counts = option_counts.setdefault((course_code, row[2], row[5]), [row[3], row[4], 0, 0])
+                    counts[2] += 1
+                    counts[3] += row[7]
+
+            self.db.execute_many(UPSERT_QUESTION_STATS, [
+                (template_id, course_code, question_no, text, question_type, option, responses, rating_sum)
+                for (course_code, question_no, option), (text, question_type, responses, rating_sum) in sorted(option_counts.items())
+            ])
+            self.db.execute_many(UPSERT_SUBMISSION_STATS, [
+                (template_id, course_code, count) for course_code, count in submission_counts.items()
+            ])
+            return sum(submission_counts.values())
+
+
+if __name__ == "__main__":
+    # Backfills the stats tables. From the Admin_side directory:
+    #   python -m controllers.evaluation_stats_controller [template_id]
+    import sys
+    db_manager = DBManager()
+    if not db_manager.connect():
+        sys.exit(1)
+    success, message = EvaluationStatsController().rebuild(int(sys.argv[1]) if len(sys.argv) > 1 else None)
+    print(message)
+    db_manager.disconnect()
+    sys.exit(0 if success else 1)
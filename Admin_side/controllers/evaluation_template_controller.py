@@ -6,8 +6,11 @@ from models.student_model import Student # Used for completion tracking logic
 from models.course_model import Course # Used for course information
 from models.admin_calendar_event_model import AdminCalendarEvent # NEW: Import for calendar event creation
 from controllers.admin_calendar_event_controller import AdminCalendarEventController # NEW: Import for calendar controller
+from controllers.evaluation_stats_controller import EvaluationStatsController
+from controllers.cache_version_controller import CacheVersionController
 from datetime import date # For date comparisons
 from datetime import datetime, timedelta # For date operations
+from pymysql import Error
 
 class EvaluationTemplateController:
     """
@@ -17,6 +20,8 @@ class EvaluationTemplateController:
     def __init__(self):
         self.db = DBManager()
         self.admin_calendar_event_controller = AdminCalendarEventController() # Initialize calendar controller
+        self.evaluation_stats_controller = EvaluationStatsController()
+        self.cache_version_controller = CacheVersionController() # Student API caches of pending evaluations
 
     # --- Template Management ---
     def get_all_templates(self):
@@ -25,7 +30,7 @@ class EvaluationTemplateController:
         :return: A list of EvaluationTemplate objects.
         """
         query = "SELECT * FROM evaluation_templates ORDER BY title;"
-        templates_data = self.db.fetch_data(query, fetch_all=True)
+        templates_data = self.db.fetch_data(query, fetch_all=True, cache=True)
         if templates_data:
             return [EvaluationTemplate.from_db_row(row) for row in templates_data]
         return []
@@ -60,32 +65,37 @@ class EvaluationTemplateController:
             template.title, template.to_dict()['questions_set'],
             template.batch, template.course_code, template.session, template.last_date, template.admin_id
         )
-        success = self.db.execute_query(query, params)
-        if success:
-            # NEW: Add an event to the admin calendar for evaluation deadlines
-            if template.last_date and (template.course_code or template.batch or template.session):
-                event_title = f"Evaluation Deadline: {template.title}"
-                event_description_parts = []
-                if template.course_code:
-                    event_description_parts.append(f"Course: {template.course_code}")
-                if template.batch:
-                    event_description_parts.append(f"Batch: {template.batch}")
-                if template.session:
-                    event_description_parts.append(f"Session: {template.session}")
-                # Combine parts for a comprehensive description
-                event_description = "Deadline for " + ", ".join(event_description_parts) + "." if event_description_parts else "General Evaluation Deadline."
-
-                new_event = AdminCalendarEvent(
-                    event_id=None, # Let DB auto-increment
-                    title=event_title,
-                    description=event_description,
-                    event_date=template.last_date,
-                    admin_id=template.admin_id # Associate with admin who created it
-                )
-                # Use the AdminCalendarEventController to add the event
-                self.admin_calendar_event_controller.add_event(new_event)
-            return True
-        return False
+        try:
+            # The template row and its calendar event are written in one transaction (single commit)
+            with self.db.transaction():
+                self.db.execute_query(query, params)
+                # NEW: Add an event to the admin calendar for evaluation deadlines
+                if template.last_date and (template.course_code or template.batch or template.session):
+                    event_title = f"Evaluation Deadline: {template.title}"
+                    event_description_parts = []
+                    if template.course_code:
+                        event_description_parts.append(f"Course: {template.course_code}")
+                    if template.batch:
+                        event_description_parts.append(f"Batch: {template.batch}")
+                    if template.session:
+                        event_description_parts.append(f"Session: {template.session}")
+                    # Combine parts for a comprehensive description
+                    event_description = "Deadline for " + ", ".join(event_description_parts) + "." if event_description_parts else "General Evaluation Deadline."
+
+                    new_event = AdminCalendarEvent(
+                        event_id=None, # Let DB auto-increment
+                        title=event_title,
+                        description=event_description,
+                        event_date=template.last_date,
+                        admin_id=template.admin_id # Associate with admin who created it
+                    )
+                    # Use the AdminCalendarEventController to add the event
+                    self.admin_calendar_event_controller.add_event(new_event)
+        except Error as e:
+            print(f"Error adding evaluation template: {e}")
+            return False
+        self.cache_version_controller.bump() # After the commit; see CacheVersionController.bump()
+        return True
 
     def update_template(self, template: EvaluationTemplate):
         """
@@ -110,10 +120,21 @@ class EvaluationTemplateController:
             template.batch, template.course_code, template.session, template.last_date, template.admin_id,
             template.id
         )
-        success = self.db.execute_query(query, params)
-        if success:
-            return True
-        return False
+        try:
+            # The template and its report counts are updated in one transaction, so the counts never
+            # stay built for the previous questions
+            with self.db.transaction():
+                self.db.execute_query(query, params)
+                # Report counts are keyed by question position, so recount them for the edited questions
+                if self.evaluation_stats_controller.tables_available():
+                    success, message = self.evaluation_stats_controller.rebuild(template.id)
+                    if not success:
+                        raise Error(message)
+        except Error as e:
+            print(f"Error updating evaluation template: {e}")
+            return False
+        self.cache_version_controller.bump()
+        return True
 
     def delete_template(self, template_id):
         """
@@ -127,6 +148,7 @@ class EvaluationTemplateController:
         query = "DELETE FROM evaluation_templates WHERE id = %s;"
         success = self.db.execute_query(query, (template_id,))
         if success:
+            self.cache_version_controller.bump()
             return True
         return False
 
@@ -323,7 +345,10 @@ class EvaluationTemplateController:
         :return: True on success, False on failure.
         """
         query = "UPDATE evaluation_templates SET last_date = %s, updated_at = CURRENT_TIMESTAMP WHERE id = %s;"
-        return self.db.execute_query(query, (new_date, template_id))
+        success = self.db.execute_query(query, (new_date, template_id))
+        if success:
+            self.cache_version_controller.bump()
+        return success
 
     # --- New methods for Ongoing/Past Evaluations sections ---
     def get_ongoing_evaluations(self):
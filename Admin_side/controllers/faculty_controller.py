@@ -9,7 +9,7 @@ class FacultyController:
     def get_all_faculty(self):
         """Fetches all faculty records from the database."""
         query = "SELECT * FROM faculty ORDER BY name;"
-        faculty_data = self.db.fetch_data(query, fetch_all=True)
+        faculty_data = self.db.fetch_data(query, fetch_all=True, cache=True)
         if faculty_data:
             return [Faculty.from_db_row(row) for row in faculty_data]
         return []
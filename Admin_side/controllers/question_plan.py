@@ -0,0 +1,35 @@
+# Admin_side/controllers/question_plan.py
+import json
+from functools import lru_cache
+
+@lru_cache(maxsize=1024)
+def parse_rating(answer):
+    """Returns the integer rating an answer such as "4 (Agree)" starts with, or None."""
+    try:
+        return int(answer.split(' ')[0])
+    except (ValueError, IndexError):
+        return None
+
+def compile_questions(questions_set):
+    """
+    Compiles a template's questions_set (JSON string or dict) into the plan its submissions are
+    aggregated with: a list of (question_text, question_type, options, rating_values) tuples, where
+    rating_values maps each option of a rating question to its numeric value.
+    :return: The plan, or None if questions_set cannot be decoded.
+    """
+    if not isinstance(questions_set, dict):
+        try:
+            questions_set = json.loads(questions_set)
+        except (json.JSONDecodeError, TypeError):
+            return None
+    plan = []
+    for question in questions_set.get('questions', []):
+        rating_values = None
+        if question['type'] == 'rating':
+            rating_values = {}
+            for option in question.get('options') or []:
+                value = parse_rating(str(option))
+                if value is not None:
+                    rating_values[str(option)] = value
+        plan.append((question['text'], question['type'], question.get('options'), rating_values))
+    return plan
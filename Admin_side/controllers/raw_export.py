@@ -0,0 +1,71 @@
+# Admin_side/controllers/raw_export.py
+import csv
+from itertools import islice
+
+
+def chunked(rows, chunk_size):
+    """Yields lists of up to chunk_size rows from the rows iterator."""
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_csv(file_path, header, rows, chunk_size):
+    """Writes rows to a UTF-8 CSV file chunk by chunk. Returns the number of rows written."""
+    count = 0
+    with open(file_path, 'w', newline='', encoding='utf-8') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(header)
+        for chunk in chunked(rows, chunk_size):
+            writer.writerows(chunk)
+            count += len(chunk)
+    return count
+
+
+def write_xlsx(file_path, header, rows, chunk_size):
+    """
+    Writes rows to an Excel sheet with openpyxl's write-only workbook, which streams rows to disk
+    instead of keeping every cell in memory. Returns the number of rows written.
+    """
+    from openpyxl import Workbook # Requires `pip install openpyxl`
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Responses")
+    sheet.append(header)
+    count = 0
+    for chunk in chunked(rows, chunk_size):
+        for row in chunk:
+            sheet.append(row)
+        count += len(chunk)
+    workbook.save(file_path)
+    return count
+
+
+def write_parquet(file_path, header, rows, chunk_size):
+    """
+    Writes rows to a Parquet file with one row group per chunk. The first two columns
+    (response number, template id) are integers, all other columns strings.
+    Returns the number of rows written.
+    """
+    import pyarrow as pa # Requires `pip install pyarrow`
+    import pyarrow.parquet as pq
+    schema = pa.schema([(name, pa.int64() if position < 2 else pa.string()) for position, name in enumerate(header)])
+    count = 0
+    with pq.ParquetWriter(file_path, schema) as writer:
+        for chunk in chunked(rows, chunk_size):
+            columns = [
+                pa.array([row[position] for row in chunk], type=field.type)
+                for position, field in enumerate(schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            count += len(chunk)
+    return count
+
+
+EXPORT_WRITERS = {
+    'csv': write_csv,
+    'xlsx': write_xlsx,
+    'parquet': write_parquet
+}
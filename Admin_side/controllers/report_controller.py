@@ -1,5 +1,6 @@
 # controllers/report_controller.py
 from database.db_manager import DBManager
+from config import REPORT_CONFIG
 from models.evaluation_model import Evaluation
 from models.evaluation_template_model import EvaluationTemplate
 from models.course_model import Course # Import Course model for dropdowns
@@ -7,213 +8,655 @@ from models.faculty_model import Faculty # Import Faculty model for dropdowns
 import json
 import pandas as pd # For CSV/Excel export (requires `pip install pandas openpyxl`)
 import os
-from tkinter import filedialog, messagebox
-import matplotlib.pyplot as plt # For graph generation
+import io
+import hashlib
+from PIL import Image
+from controllers.chart_renderer import ChartRenderer, CHART_DPI
+from controllers.raw_export import EXPORT_WRITERS
+from controllers.question_plan import compile_questions, parse_rating
+from controllers.report_frame import ReportFrame
+from pymysql import Error
 
 class ReportController:
     def __init__(self):
         self.db = DBManager()
+        self.report_frame = ReportFrame(self.db) # Columnar cache for the 'pandas' engine, loaded on first use
+        self.chart_renderer = ChartRenderer(REPORT_CONFIG.get('chart_workers'), REPORT_CONFIG.get('chart_cache_size', 128))
+        self.course_scores = None # (signature, per-course scores) cached by get_faculty_scorecard()
 
-    def get_aggregated_evaluation_report(self, course_code=None, batch=None, faculty_id=None, template_id=None):
+    def get_aggregated_evaluation_report(self, course_code=None, batch=None, faculty_id=None, template_id=None, aggregation=None, answer_filters=None, session=None):
         """
         Generates an aggregated report of evaluation responses.
         Admin can see question answers but CANNOT see who submitted.
-        Can filter by course, batch, faculty, template.
+        Can filter by course, batch, faculty, template and template session (term).
+        :param aggregation: 'stats', 'sql', 'python' or 'pandas'; defaults to REPORT_CONFIG['aggregation'].
+        :param answer_filters: Optional cross-filter {question_text: option or list of options}, restricting the
+                               report to submissions that gave one of those answers. Only the 'pandas' engine
+                               supports it, so it is used whenever answer_filters is given.
         """
-        # Base query to get evaluations and their templates
-        query = """
-        SELECT
-            e.feedback,
-            e.comment AS general_comment,
-            et.title AS template_title,
-            et.questions_set,
-            et.batch AS template_batch,
-            e.course_code AS evaluated_course_code,
-            c.name AS evaluated_course_name,
-            GROUP_CONCAT(DISTINCT f.faculty_id) AS faculty_ids,
-            GROUP_CONCAT(DISTINCT f.name) AS faculty_names
-        FROM evaluations e
-        JOIN evaluation_templates et ON e.template_id = et.id
-        LEFT JOIN courses c ON e.course_code = c.course_code
-        LEFT JOIN course_faculty cf ON e.course_code = cf.course_code
-        LEFT JOIN faculty f ON cf.faculty_id = f.faculty_id
-        WHERE 1=1
+        aggregation = aggregation or REPORT_CONFIG.get('aggregation', 'python')
+        # A faculty filter becomes the set of courses that faculty teaches, so no engine joins course_faculty
+        faculty_courses = self.get_faculty_courses(faculty_id) if faculty_id else None
+        if faculty_courses == []:
+            return self._report_result(0, {})
+        try:
+            if aggregation == 'pandas' or answer_filters:
+                return self._aggregate_with_pandas(course_code, batch, faculty_courses, template_id, answer_filters, session)
+            if aggregation == 'stats':
+                return self._aggregate_from_stats(course_code, batch, faculty_courses, template_id, session)
+            if aggregation == 'sql' and self.db.backend.name == 'mysql':
+                return self._aggregate_in_sql(course_code, batch, faculty_courses, template_id, session)
+            return self._aggregate_in_python(course_code, batch, faculty_courses, template_id, session)
+        except Error as e:
+            # Streamed rows (fetch_iter) stopped partway: report the failure instead of partial counts
+            print(f"Error generating evaluation report: {e}")
+            return {
+                "summary": f"Failed to generate report: {e}",
+                "total_submissions": 0,
+                "report_data": {},
+                "error": str(e)
+            }
+
+    def get_course_faculty_map(self):
         """
-        params = []
+        Maps each course code to the faculty teaching it, as a list of (faculty_id, name).
+        Read through the query cache, which is invalidated by any write to course_faculty or faculty,
+        so reports attach faculty names without joining them into the evaluation rows.
+        """
+        rows = self.db.fetch_data("""
+        SELECT cf.course_code, f.faculty_id, f.name
+        FROM course_faculty cf
+        JOIN faculty f ON cf.faculty_id = f.faculty_id
+        ORDER BY f.name
+        """, fetch_all=True, cache=True) or []
+        course_faculty = {}
+        for row in rows:
+            course_faculty.setdefault(row['course_code'], []).append((row['faculty_id'], row['name']))
+        return course_faculty
+
+    def get_faculty_courses(self, faculty_id):
+        """Returns the sorted codes of the courses a faculty member teaches (from get_course_faculty_map)."""
+        return sorted(
+            course_code for course_code, faculty in self.get_course_faculty_map().items()
+            if any(member_id == faculty_id for member_id, _ in faculty)
+        )
 
-        # Add filters
+    def _report_result(self, total_submissions, aggregated_results, course_codes=()):
+        """
+        Wraps aggregated question data in the dictionary returned by get_aggregated_evaluation_report().
+        :param course_codes: Courses of the reported evaluations; their faculty names are attached as
+                             "course_faculty" ({course_code: [name, ...]}).
+        """
+        if total_submissions == 0:
+            return {
+                "summary": "No evaluations found for the given criteria.",
+                "total_submissions": 0,
+                "report_data": {}
+            }
+
+        course_faculty = self.get_course_faculty_map()
+        return {
+            "summary": "Report generated successfully.",
+            "total_submissions": total_submissions,
+            "report_data": aggregated_results,
+            "course_faculty": {
+                course_code: [name for _, name in course_faculty.get(course_code, [])]
+                for course_code in sorted(code for code in set(course_codes) if code)
+            }
+        }
+
+    def _evaluation_filters(self, course_code=None, batch=None, faculty_courses=None, template_id=None, alias='e', session=None):
+        """
+        Builds the WHERE conditions shared by the SQL aggregation queries, for a table `alias` with
+        template_id and course_code columns (evaluations or a stats table) joined with `evaluation_templates et`.
+        :return: A tuple (sql_fragment, params).
+        """
+        conditions = []
+        params = []
         if course_code:
-            query += " AND e.course_code = %s"
+            conditions.append(f"{alias}.course_code = %s")
             params.append(course_code)
         if batch:
-            query += " AND et.batch = %s" # Assuming template's batch is the target
+            conditions.append("et.batch = %s")
             params.append(batch)
-        if faculty_id:
-            # Filter by faculty assigned to the course where evaluation was made
-            query += " AND cf.faculty_id = %s"
-            params.append(faculty_id)
+        if faculty_courses is not None:
+            # The faculty's courses are resolved beforehand (get_faculty_courses), so each evaluation
+            # row is matched once however many faculty co-teach its course
+            if faculty_courses:
+                conditions.append(f"{alias}.course_code IN ({', '.join(['%s'] * len(faculty_courses))})")
+                params.extend(faculty_courses)
+            else:
+                conditions.append("1=0")
         if template_id:
-            query += " AND e.template_id = %s"
+            conditions.append(f"{alias}.template_id = %s")
             params.append(template_id)
+        if session:
+            conditions.append("et.session = %s")
+            params.append(session)
+        return "".join(f" AND {condition}" for condition in conditions), params
+
+    def _report_questions(self, templates):
+        """
+        Compiles each of `templates` (rows with template_id and questions_set, possibly repeated) once and creates the
+        report entry of every question, in template order.
+        :return: A tuple (aggregated_results, plans) where plans maps each template id to its compiled plan.
+        """
+        aggregated_results = {}
+        plans = {}
+        for template in templates:
+            if template['template_id'] in plans:
+                continue # Same template, another course
+            plan = compile_questions(template['questions_set'])
+            if plan is None:
+                print(f"Warning: Could not decode questions_set of evaluation template {template['template_id']}")
+                continue
+            plans[template['template_id']] = plan
+            for question_text, question_type, options, _ in plan:
+                if question_text not in aggregated_results:
+                    aggregated_results[question_text] = {
+                        "type": question_type,
+                        "options": options,
+                        "data": {}
+                    }
+        return aggregated_results, plans
 
-        query += " GROUP BY e.id" # Group by evaluation to avoid duplicate rows from GROUP_CONCAT
+    def _add_answer_counts(self, aggregated_results, rows):
+        """
+        Merges (question_text, question_type, answer_option, responses, rating_sum) rows into the
+        report entries and sets the average of each rating question.
+        """
+        rating_sums = {}
+        rating_counts = {}
+        for row in rows:
+            question_data = aggregated_results.setdefault(row['question_text'], {"type": row['question_type'], "options": None, "data": {}})
+            question_data['data'][row['answer_option']] = question_data['data'].get(row['answer_option'], 0) + int(row['responses'])
+            if row['question_type'] == 'rating':
+                rating_sums[row['question_text']] = rating_sums.get(row['question_text'], 0) + int(row['rating_sum'])
+                rating_counts[row['question_text']] = rating_counts.get(row['question_text'], 0) + int(row['responses'])
 
-        all_evaluations_data = self.db.fetch_data(query, tuple(params), fetch_all=True)
+        for question_text in rating_sums:
+            aggregated_results[question_text]['average'] = round(rating_sums[question_text] / rating_counts[question_text], 2)
 
-        if not all_evaluations_data:
-            return {
-                "summary": "No evaluations found for the given criteria.",
-                "total_submissions": 0,
-                "report_data": {}
+    @staticmethod
+    def _plan_question_text(plans, template_id, question_no):
+        """
+        Text of the question at position question_no (1-based, as numbered by JSON_TABLE's FOR ORDINALITY)
+        in a template's plan, or None if the template could not be decoded.
+        """
+        plan = plans.get(template_id)
+        if plan is None or not 1 <= question_no <= len(plan):
+            return None
+        return plan[question_no - 1][0]
+
+    def _add_comments(self, aggregated_results, plans, filters, params):
+        """
+        Appends free-text answers and general comments, in submission order. The only per-submission
+        data a 'stats' or 'sql' report reads: MySQL extracts the text answers with JSON_TABLE, other
+        backends stream the feedback of templates that have text questions.
+        """
+        if self.db.backend.name == 'mysql':
+            comments_query = f"""
+            SELECT e.template_id, q.question_no, JSON_UNQUOTE(JSON_EXTRACT(e.feedback, CONCAT('$."', REPLACE(REPLACE(q.question_text, '\\\\', '\\\\\\\\'), '"', '\\\\"'), '"'))) AS answer
+            FROM evaluations e
+            JOIN evaluation_templates et ON e.template_id = et.id
+            JOIN JSON_TABLE(et.questions_set, '$.questions[*]' COLUMNS (
+                question_no FOR ORDINALITY,
+                question_text TEXT PATH '$.text',
+                question_type VARCHAR(32) PATH '$.type'
+            )) AS q
+            WHERE q.question_type = 'text'{filters}
+            ORDER BY e.id
+            """
+            for row in self.db.fetch_iter(comments_query, tuple(params)):
+                # Questions are matched by position, so texts of any length map back to their report entry
+                question_data = aggregated_results.get(self._plan_question_text(plans, row['template_id'], row['question_no']))
+                if question_data is not None and row['answer'] and row['answer'] != 'null':
+                    question_data['data'].setdefault('comments', []).append(row['answer'])
+            general_comments_query = f"""
+            SELECT e.comment
+            FROM evaluations e
+            JOIN evaluation_templates et ON e.template_id = et.id
+            WHERE e.comment IS NOT NULL AND e.comment <> ''{filters}
+            ORDER BY e.id
+            """
+            general_comments = [row['comment'] for row in self.db.fetch_iter(general_comments_query, tuple(params))]
+        else:
+            general_comments = []
+            feedback_query = f"""
+            SELECT e.template_id, e.feedback, e.comment
+            FROM evaluations e
+            JOIN evaluation_templates et ON e.template_id = et.id
+            WHERE 1=1{filters}
+            ORDER BY e.id
+            """
+            text_questions = {
+                template_id: [question[0] for question in plan if question[1] == 'text'] for template_id, plan in plans.items()
             }
+            for row in self.db.fetch_iter(feedback_query, tuple(params)):
+                question_texts = text_questions.get(row['template_id'])
+                if question_texts:
+                    try:
+                        feedback = json.loads(row['feedback'])
+                    except (json.JSONDecodeError, TypeError):
+                        feedback = {}
+                    for question_text in question_texts:
+                        answer = feedback.get(question_text) if isinstance(feedback, dict) else None
+                        if answer:
+                            aggregated_results[question_text]['data'].setdefault('comments', []).append(answer)
+                if row['comment']:
+                    general_comments.append(row['comment'])
+
+        if general_comments:
+            aggregated_results['General Comments'] = {"type": "text", "data": {"comments": general_comments}}
+
+    def _aggregate_from_stats(self, course_code=None, batch=None, faculty_courses=None, template_id=None, session=None):
+        """
+        Aggregation mode 'stats': reads the per-option counts kept in evaluation_question_stats and
+        evaluation_submission_stats (see EvaluationStatsController), so the cost of the counts grows
+        with the number of questions and options, not submissions. Works on every backend.
+        Falls back to 'python' when the stats tables are missing, or when their submission count
+        differs from the evaluations table (tables not backfilled yet).
+        """
+        stats_filters, stats_params = self._evaluation_filters(course_code, batch, faculty_courses, template_id, alias='s', session=session)
+        filters, params = self._evaluation_filters(course_code, batch, faculty_courses, template_id, session=session)
+
+        templates = self.db.fetch_data(f"""
+        SELECT s.template_id, s.course_code, s.submissions, et.questions_set
+        FROM evaluation_submission_stats s
+        JOIN evaluation_templates et ON s.template_id = et.id
+        WHERE 1=1{stats_filters}
+        ORDER BY s.template_id, s.course_code
+        """, tuple(stats_params), fetch_all=True)
+        if templates is None:
+            print("Evaluation stats tables are not available (see evaluation_stats.sql); aggregating in Python instead.")
+            return self._aggregate_in_python(course_code, batch, faculty_courses, template_id, session)
+
+        total_submissions = sum(int(template['submissions']) for template in templates)
+        evaluation_count = self.db.fetch_data(f"""
+        SELECT COUNT(*) AS submissions
+        FROM evaluations e
+        JOIN evaluation_templates et ON e.template_id = et.id
+        WHERE 1=1{filters}
+        """, tuple(params), fetch_one=True)
+        if evaluation_count is None or int(evaluation_count['submissions']) != total_submissions:
+            print("Evaluation stats do not match the evaluations table (backfill them with "
+                  "EvaluationStatsController.rebuild()); aggregating in Python instead.")
+            return self._aggregate_in_python(course_code, batch, faculty_courses, template_id, session)
+        if total_submissions == 0:
+            return self._report_result(0, {})
+        aggregated_results, plans = self._report_questions(templates)
+
+        self._add_answer_counts(aggregated_results, self.db.fetch_data(f"""
+        SELECT s.question_text, s.question_type, s.answer_option, SUM(s.responses) AS responses, SUM(s.rating_sum) AS rating_sum
+        FROM evaluation_question_stats s
+        JOIN evaluation_templates et ON s.template_id = et.id
+        WHERE 1=1{stats_filters}
+        GROUP BY s.question_text, s.question_type, s.answer_option
+        ORDER BY s.question_text, s.answer_option
+        """, tuple(stats_params), fetch_all=True) or [])
+
+        self._add_comments(aggregated_results, plans, filters, params)
+        return self._report_result(total_submissions, aggregated_results, [template['course_code'] for template in templates])
+
+    def _aggregate_in_sql(self, course_code=None, batch=None, faculty_courses=None, template_id=None, session=None):
+        """
+        Aggregation mode 'sql': MySQL expands each template's questions and each submission's answers
+        with JSON_TABLE and returns one row per (question, answer) with its count and rating sum, so
+        only these small histograms cross the wire. Templates are decoded once each, and only the
+        free-text answers and general comments are streamed to Python.
+        """
+        filters, params = self._evaluation_filters(course_code, batch, faculty_courses, template_id, session=session)
+
+        # Templates used by the matching submissions, in order of their first submission
+        templates = self._matching_templates(filters, params)
+
+        total_submissions = sum(int(template['submissions']) for template in templates)
+        if total_submissions == 0:
+            return self._report_result(0, {})
+        aggregated_results, plans = self._report_questions(templates)
+
+        # Each answer is looked up in feedback by its question text; a single answer is wrapped in an
+        # array so single- and multi-select answers are unnested by the same JSON_TABLE.
+        histogram_query = f"""
+        SELECT
+            a.template_id,
+            a.question_no,
+            a.question_type,
+            o.answer_option,
+            COUNT(*) AS responses,
+            SUM(CASE WHEN a.question_type = 'rating' THEN CAST(SUBSTRING_INDEX(o.answer_option, ' ', 1) AS SIGNED) ELSE 0 END) AS rating_sum
+        FROM (
+            SELECT
+                e.template_id,
+                q.question_no,
+                q.question_type,
+                JSON_EXTRACT(e.feedback, CONCAT('$."', REPLACE(REPLACE(q.question_text, '\\\\', '\\\\\\\\'), '"', '\\\\"'), '"')) AS answer
+            FROM evaluations e
+            JOIN evaluation_templates et ON e.template_id = et.id
+            JOIN JSON_TABLE(et.questions_set, '$.questions[*]' COLUMNS (
+                question_no FOR ORDINALITY,
+                question_text TEXT PATH '$.text',
+                question_type VARCHAR(32) PATH '$.type'
+            )) AS q
+            WHERE q.question_type IN ('rating', 'multiple_choice'){filters}
+        ) AS a
+        JOIN JSON_TABLE(
+            IF(JSON_TYPE(a.answer) = 'ARRAY', a.answer, JSON_ARRAY(a.answer)),
+            '$[*]' COLUMNS (answer_option VARCHAR(1000) PATH '$')
+        ) AS o
+        WHERE o.answer_option IS NOT NULL AND o.answer_option <> ''
+          AND (a.question_type = 'multiple_choice' OR SUBSTRING_INDEX(o.answer_option, ' ', 1) REGEXP '^[+-]?[0-9]+$')
+        GROUP BY a.template_id, a.question_no, a.question_type, o.answer_option
+        ORDER BY a.template_id, a.question_no, o.answer_option
+        """
+        histogram = []
+        for row in self.db.fetch_data(histogram_query, tuple(params), fetch_all=True) or []:
+            row['question_text'] = self._plan_question_text(plans, row['template_id'], row['question_no'])
+            if row['question_text'] is not None:
+                histogram.append(row)
+        self._add_answer_counts(aggregated_results, histogram)
+
+        self._add_comments(aggregated_results, plans, filters, params)
+        return self._report_result(total_submissions, aggregated_results, [template['course_code'] for template in templates])
+
+    def _matching_templates(self, filters, params):
+        """
+        Returns one row (template_id, course_code, submissions, questions_set) per template and course
+        of the evaluations matching `filters`, in order of first submission.
+        """
+        return self.db.fetch_data(f"""
+        SELECT s.template_id, s.course_code, s.submissions, et.questions_set
+        FROM (
+            SELECT e.template_id, e.course_code, COUNT(*) AS submissions, MIN(e.id) AS first_evaluation_id
+            FROM evaluations e
+            JOIN evaluation_templates et ON e.template_id = et.id
+            WHERE 1=1{filters}
+            GROUP BY e.template_id, e.course_code
+        ) AS s
+        JOIN evaluation_templates et ON et.id = s.template_id
+        ORDER BY s.first_evaluation_id
+        """, tuple(params), fetch_all=True) or []
+
+    def _aggregate_in_python(self, course_code=None, batch=None, faculty_courses=None, template_id=None, session=None):
+        """
+        Aggregation mode 'python': decodes the distinct templates once, compiles them with
+        compile_questions(), then streams only the submissions' feedback and comment through the
+        compiled plans. Works on every backend.
+        """
+        filters, params = self._evaluation_filters(course_code, batch, faculty_courses, template_id, session=session)
+        templates = self._matching_templates(filters, params)
+        aggregated_results, plans = self._report_questions(templates)
 
-        aggregated_results = {}
         total_submissions = 0
         rating_sums = {}  # For average calculation
         rating_counts = {}
+        general_comments = []
 
-        # Aggregate feedback
-        for eval_row in all_evaluations_data:
+        # Stream rows so memory does not grow with the number of submissions
+        feedback_query = f"""
+        SELECT e.id, e.template_id, e.feedback, e.comment
+        FROM evaluations e
+        JOIN evaluation_templates et ON e.template_id = et.id
+        WHERE 1=1{filters}
+        ORDER BY e.id
+        """
+        for eval_row in self.db.fetch_iter(feedback_query, tuple(params)):
             total_submissions += 1
-            feedback_json = eval_row['feedback']
-            questions_set_json = eval_row['questions_set']
-
+            plan = plans.get(eval_row['template_id'])
+            if plan is None:
+                continue
             try:
-                feedback = json.loads(feedback_json)
-                questions_set = json.loads(questions_set_json)
-            except json.JSONDecodeError:
-                print(f"Warning: Could not decode JSON for feedback or questions_set in evaluation ID {eval_row.get('id', 'N/A')}")
+                feedback = json.loads(eval_row['feedback'])
+            except (json.JSONDecodeError, TypeError):
+                print(f"Warning: Could not decode JSON for feedback in evaluation ID {eval_row['id']}")
                 continue
 
-            questions_list = questions_set.get('questions', [])
-
-            for question in questions_list:
-                question_text = question['text']
-                question_type = question['type']
+            for question_text, question_type, _, rating_values in plan:
                 answer = feedback.get(question_text) # Get answer by question text
-
-                if question_text not in aggregated_results:
-                    aggregated_results[question_text] = {
-                        "type": question_type,
-                        "options": question.get('options'), # Store options for rating/MCQ
-                        "data": {} # Will store counts or lists of text answers
-                    }
+                if not answer:
+                    continue
+                data = aggregated_results[question_text]['data']
 
                 # Aggregate data based on question type
                 if question_type == 'rating':
-                    if answer:
-                        try:
-                            rating_value = int(str(answer).split(' ')[0])
-                            rating_sums[question_text] = rating_sums.get(question_text, 0) + rating_value
-                            rating_counts[question_text] = rating_counts.get(question_text, 0) + 1
-                            aggregated_results[question_text]['data'][str(answer)] = aggregated_results[question_text]['data'].get(str(answer), 0) + 1
-                        except (ValueError, IndexError):
-                            pass
+                    answer_key = str(answer)
+                    rating_value = rating_values.get(answer_key)
+                    if rating_value is None:
+                        rating_value = parse_rating(answer_key) # Answer that is not one of the template's options
+                        if rating_value is None:
+                            continue
+                    rating_sums[question_text] = rating_sums.get(question_text, 0) + rating_value
+                    rating_counts[question_text] = rating_counts.get(question_text, 0) + 1
+                    data[answer_key] = data.get(answer_key, 0) + 1
                 elif question_type == 'multiple_choice':
-                    if answer:
-                        if isinstance(answer, list):
-                            for opt in answer:
-                                aggregated_results[question_text]['data'][str(opt)] = aggregated_results[question_text]['data'].get(str(opt), 0) + 1
-                        else:
-                            aggregated_results[question_text]['data'][str(answer)] = aggregated_results[question_text]['data'].get(str(answer), 0) + 1
+                    for opt in (answer if isinstance(answer, list) else [answer]):
+                        data[str(opt)] = data.get(str(opt), 0) + 1
                 elif question_type == 'text':
-                    if answer:
-                        if 'comments' not in aggregated_results[question_text]['data']:
-                            aggregated_results[question_text]['data']['comments'] = []
-                        aggregated_results[question_text]['data']['comments'].append(answer)
-
-            # Aggregate general comments
-            general_comment = eval_row.get('general_comment') # Use the alias from query
-            if general_comment:
-                if 'General Comments' not in aggregated_results:
-                    aggregated_results['General Comments'] = {"type": "text", "data": {"comments": []}}
-                aggregated_results['General Comments']['data']['comments'].append(general_comment)
+                    data.setdefault('comments', []).append(answer)
+
+            if eval_row['comment']:
+                general_comments.append(eval_row['comment'])
+
+        if general_comments:
+            aggregated_results['General Comments'] = {"type": "text", "data": {"comments": general_comments}}
 
         # Add average score for rating questions
         for question_text in rating_sums:
-            avg = rating_sums[question_text] / rating_counts[question_text] if rating_counts[question_text] > 0 else 0
-            aggregated_results[question_text]['average'] = round(avg, 2)
+            aggregated_results[question_text]['average'] = round(rating_sums[question_text] / rating_counts[question_text], 2)
 
-        return {
-            "summary": "Report generated successfully.",
-            "total_submissions": total_submissions,
-            "report_data": aggregated_results
-        }
+        return self._report_result(total_submissions, aggregated_results, [template['course_code'] for template in templates])
+
+    def _aggregate_with_pandas(self, course_code=None, batch=None, faculty_courses=None, template_id=None, answer_filters=None, session=None):
+        """
+        Aggregation mode 'pandas': computes the report from the ReportFrame held by this controller,
+        which is loaded once and reloaded only after evaluations or templates change, so exploring
+        many filter combinations costs vectorized operations rather than database scans.
+        Rating questions additionally get 'std_dev' and 'percentiles'.
+        """
+        if not self.report_frame.refresh():
+            return self._report_result(0, {})
+        total_submissions, aggregated_results, course_codes = self.report_frame.report(
+            course_code, batch, faculty_courses, template_id, answer_filters, session
+        )
+        return self._report_result(total_submissions, aggregated_results, course_codes)
 
     def get_faculty_evaluation_scores(self, faculty_id):
         """
         Retrieves aggregated rating scores for a specific faculty member across courses for comparison.
+        The faculty's courses are resolved first (get_faculty_courses) and the evaluations filtered
+        on them directly; the templates involved are fetched and compiled once, and only feedback is
+        read per evaluation.
         """
-        query = """
+        faculty_courses = self.get_faculty_courses(faculty_id)
+        if not faculty_courses:
+            return []
+        course_filter = f"e.course_code IN ({', '.join(['%s'] * len(faculty_courses))})"
+        templates = self.db.fetch_data(f"""
+        SELECT et.id AS template_id, et.questions_set
+        FROM evaluation_templates et
+        WHERE et.id IN (SELECT e.template_id FROM evaluations e WHERE {course_filter});
+        """, tuple(faculty_courses), fetch_all=True) or []
+        rating_plans = self._rating_plans(templates)
+
+        query = f"""
         SELECT
+            e.template_id,
             e.feedback,
-            et.questions_set,
             e.date AS evaluation_date,
             e.course_code,
             c.name AS course_name
         FROM evaluations e
-        JOIN evaluation_templates et ON e.template_id = et.id
         JOIN courses c ON e.course_code = c.course_code
-        JOIN course_faculty cf ON e.course_code = cf.course_code
-        WHERE cf.faculty_id = %s;
+        WHERE {course_filter};
         """
-        evaluations_for_faculty = self.db.fetch_data(query, (faculty_id,), fetch_all=True)
+        faculty_evaluations_summary = []
 
-        if not evaluations_for_faculty:
+        try:
+            for eval_row in self.db.fetch_iter(query, tuple(faculty_courses)):
+                rating_questions = rating_plans.get(eval_row['template_id'])
+                if rating_questions is None:
+                    continue
+                try:
+                    feedback = json.loads(eval_row['feedback'])
+                except (json.JSONDecodeError, TypeError):
+                    continue
+
+                total_rating_sum, rating_question_count = self._rating_totals(rating_questions, feedback)
+                average_rating = total_rating_sum / rating_question_count if rating_question_count > 0 else 0
+
+                faculty_evaluations_summary.append({
+                    "course_code": eval_row['course_code'],
+                    "course_name": eval_row['course_name'],
+                    "evaluation_date": eval_row['evaluation_date'].strftime("%Y-%m-%d"), # Format date for display
+                    "average_rating": f"{average_rating:.2f}",
+                    "num_rating_questions": rating_question_count
+                })
+        except Error as e:
+            print(f"Error fetching faculty evaluation scores: {e}")
             return []
+        return faculty_evaluations_summary
 
-        faculty_evaluations_summary = []
+    def _rating_plans(self, templates):
+        """Maps each template_id of `templates` to its rating questions as (question_text, rating_values)."""
+        rating_plans = {}
+        for template in templates:
+            plan = compile_questions(template['questions_set'])
+            if plan is not None:
+                rating_plans[template['template_id']] = [
+                    (question_text, rating_values) for question_text, question_type, _, rating_values in plan if question_type == 'rating'
+                ]
+        return rating_plans
+
+    def _rating_totals(self, rating_questions, feedback):
+        """Returns (sum, count) of the numeric ratings in one submission's feedback."""
+        total_rating_sum = 0
+        rating_question_count = 0
+        for question_text, rating_values in rating_questions:
+            answer = feedback.get(question_text)
+            if answer:
+                # Numerical rating of "X (Text)", looked up from the template's options when possible
+                rating_value = rating_values.get(str(answer))
+                if rating_value is None:
+                    rating_value = parse_rating(str(answer))
+                if rating_value is not None:
+                    total_rating_sum += rating_value
+                    rating_question_count += 1
+        return total_rating_sum, rating_question_count
+
+    def get_faculty_scorecard(self, faculty_ids=None):
+        """
+        Department-wide comparison: rating scores of every faculty member (or of `faculty_ids`),
+        per course and overall, with a monthly trend.
+        All course evaluations are read in a single scan and scored per course; the course scores
+        are cached until the next submission or template change, and attributed to faculty through
+        get_course_faculty_map(), so co-taught courses are scored once.
+        :return: A list of dictionaries sorted by faculty name:
+                 {faculty_id, name, submissions, average_rating, trend, courses: [{course_code,
+                 course_name, submissions, average_rating, trend}]}. average_rating is the mean of the
+                 submissions' average ratings (None without rated submissions); trend is a list of
+                 {month, submissions, average_rating} in month order.
+        """
+        try:
+            course_scores = self._course_scores()
+        except Error as e:
+            print(f"Error building faculty scorecard: {e}")
+            return []
+        scorecard = []
+        faculty_courses = {}
+        for course_code, faculty in self.get_course_faculty_map().items():
+            for faculty_id, name in faculty:
+                faculty_courses.setdefault((faculty_id, name), []).append(course_code)
+
+        for (faculty_id, name), course_codes in sorted(faculty_courses.items(), key=lambda item: (item[0][1], item[0][0])):
+            if faculty_ids is not None and faculty_id not in faculty_ids:
+                continue
+            courses = [course_scores[course_code] for course_code in sorted(course_codes) if course_code in course_scores]
+            months = {}
+            for course in courses:
+                for month, scores in course['months'].items():
+                    totals = months.setdefault(month, [0, 0, 0.0])
+                    for position in range(3):
+                        totals[position] += scores[position]
+            scorecard.append({
+                "faculty_id": faculty_id,
+                "name": name,
+                **self._score_summary(
+                    sum(course['submissions'] for course in courses),
+                    sum(course['rated'] for course in courses),
+                    sum(course['rating_sum'] for course in courses),
+                    months
+                ),
+                "courses": [{
+                    "course_code": course['course_code'],
+                    "course_name": course['course_name'],
+                    **self._score_summary(course['submissions'], course['rated'], course['rating_sum'], course['months'])
+                } for course in courses]
+            })
+        return scorecard
 
-        for eval_row in evaluations_for_faculty:
-            feedback_json = eval_row['feedback']
-            questions_set_json = eval_row['questions_set']
+    def _score_summary(self, submissions, rated, rating_sum, months):
+        """Formats accumulated scores (see _course_scores) as submissions, average_rating and trend."""
+        return {
+            "submissions": submissions,
+            "average_rating": round(rating_sum / rated, 2) if rated else None,
+            "trend": [{
+                "month": month,
+                "submissions": month_submissions,
+                "average_rating": round(month_rating_sum / month_rated, 2) if month_rated else None
+            } for month, (month_submissions, month_rated, month_rating_sum) in sorted(months.items())]
+        }
 
+    def _course_scores(self):
+        """
+        Scores every course's evaluations in one pass over the evaluations table, reusing the previous
+        result while no evaluation or template has changed (ReportFrame.current_signature()).
+        :return: {course_code: {course_code, course_name, submissions, rated, rating_sum,
+                 months: {"YYYY-MM": [submissions, rated, rating_sum]}}}, where rated counts the
+                 submissions with at least one rating and rating_sum adds up their average ratings.
+        """
+        signature = self.report_frame.current_signature()
+        if self.course_scores is not None and signature is not None and self.course_scores[0] == signature:
+            return self.course_scores[1]
+
+        rating_plans = self._rating_plans(self.db.fetch_data(
+            "SELECT id AS template_id, questions_set FROM evaluation_templates", fetch_all=True, primary=True
+        ) or [])
+        course_scores = {}
+        query = """
+        SELECT e.template_id, e.feedback, e.date AS evaluation_date, e.course_code, c.name AS course_name
+        FROM evaluations e
+        JOIN courses c ON e.course_code = c.course_code;
+        """
+        for eval_row in self.db.fetch_iter(query, primary=True):
+            rating_questions = rating_plans.get(eval_row['template_id'])
+            if rating_questions is None:
+                continue
             try:
-                feedback = json.loads(feedback_json)
-                questions_set = json.loads(questions_set_json)
-            except json.JSONDecodeError:
+                feedback = json.loads(eval_row['feedback'])
+            except (json.JSONDecodeError, TypeError):
                 continue
+            total_rating_sum, rating_question_count = self._rating_totals(rating_questions, feedback)
 
-            questions_list = questions_set.get('questions', [])
-            total_rating_sum = 0
-            rating_question_count = 0
-            course_name = eval_row['course_name']
-            evaluation_date = eval_row['evaluation_date']
-
-            for question in questions_list:
-                question_text = question['text']
-                question_type = question['type']
-                answer = feedback.get(question_text)
-
-                if question_type == 'rating' and answer:
-                    try:
-                        # Extract the numerical rating from "X (Text)"
-                        rating_value = int(str(answer).split(' ')[0])
-                        total_rating_sum += rating_value
-                        rating_question_count += 1
-                    except (ValueError, IndexError):
-                        pass
-
-            average_rating = total_rating_sum / rating_question_count if rating_question_count > 0 else 0
-
-            faculty_evaluations_summary.append({
+            course = course_scores.setdefault(eval_row['course_code'], {
                 "course_code": eval_row['course_code'],
-                "course_name": course_name,
-                "evaluation_date": evaluation_date.strftime("%Y-%m-%d"), # Format date for display
-                "average_rating": f"{average_rating:.2f}",
-                "num_rating_questions": rating_question_count
+                "course_name": eval_row['course_name'],
+                "submissions": 0, "rated": 0, "rating_sum": 0.0, "months": {}
             })
-        return faculty_evaluations_summary
-
-    def export_report_data(self, report_data, file_type):
-        """
-        Exports aggregated report data to CSV, Excel, or PDF.
-        """
-        if not report_data:
-            messagebox.showwarning("Export Warning", "No data to export.")
-            return
-
-        # Prepare data for DataFrame
+            month = course['months'].setdefault(eval_row['evaluation_date'].strftime("%Y-%m"), [0, 0, 0.0])
+            course['submissions'] += 1
+            month[0] += 1
+            if rating_question_count:
+                average_rating = total_rating_sum / rating_question_count
+                course['rated'] += 1
+                course['rating_sum'] += average_rating
+                month[1] += 1
+                month[2] += average_rating
+
+        self.course_scores = (signature, course_scores)
+        return course_scores
+
+    def report_summary_frame(self, report_data):
+        """Flattens aggregated report data into a DataFrame with one row per question, as exported to CSV/Excel."""
         data_for_df = []
         for question_text, q_data in report_data.items():
             row = {"Question": question_text, "Type": q_data['type']}
@@ -223,8 +666,20 @@ class ReportController:
             elif q_data['type'] == 'text':
                 row["Comments"] = "\n".join(q_data['data'].get('comments', []))
             data_for_df.append(row)
+        return pd.DataFrame(data_for_df)
 
-        df = pd.DataFrame(data_for_df)
+    def export_report_data(self, report_data, file_type):
+        """
+        Exports aggregated report data to CSV, Excel, or PDF.
+        Asks for the file with a Tk dialog; tkinter is imported here only, so the controller
+        also works headless (see reports.py).
+        """
+        from tkinter import filedialog, messagebox
+        if not report_data:
+            messagebox.showwarning("Export Warning", "No data to export.")
+            return
+
+        df = self.report_summary_frame(report_data)
 
         file_path = filedialog.asksaveasfilename(
             defaultextension=f".{file_type}",
@@ -252,34 +707,94 @@ class ReportController:
             messagebox.showerror("Export Error", f"Failed to export report: {e}")
             return f"Error during export: {e}"
 
+    def export_raw_responses(self, file_path, file_type, course_code=None, batch=None, faculty_id=None, template_id=None, session=None):
+        """
+        Exports the submissions matching the report filters with one row per submission and one
+        column per question (anonymized: no evaluation ids, dates without time). Rows are streamed
+        from a server-side cursor into the file in chunks of REPORT_CONFIG['export_chunk_size'],
+        so memory stays bounded however many submissions are exported.
+        :param file_type: 'csv', 'xlsx' or 'parquet' (requires pyarrow).
+        :return: A tuple (success_boolean, message_string).
+        """
+        writer = EXPORT_WRITERS.get(file_type)
+        if writer is None:
+            return False, f"Unsupported file type: {file_type}"
+        faculty_courses = self.get_faculty_courses(faculty_id) if faculty_id else None
+        filters, params = self._evaluation_filters(course_code, batch, faculty_courses, template_id, session=session)
+
+        # Question columns: every question of the matching templates, in order of first submission
+        plans = {}
+        columns = {} # question_text -> column position among the questions
+        for template in self._matching_templates(filters, params):
+            if template['template_id'] in plans:
+                continue
+            plan = compile_questions(template['questions_set'])
+            if plan is None:
+                continue
+            plans[template['template_id']] = plan
+            for question in plan:
+                columns.setdefault(question[0], len(columns))
+        header = ["Response", "Template ID", "Course Code", "Batch", "Date"] + list(columns) + ["General Comment"]
+
+        query = f"""
+        SELECT e.template_id, e.course_code, et.batch, e.date, e.feedback, e.comment
+        FROM evaluations e
+        JOIN evaluation_templates et ON e.template_id = et.id
+        WHERE 1=1{filters}
+        ORDER BY e.id
+        """
+
+        def rows():
+            for response_no, eval_row in enumerate(self.db.fetch_iter(query, tuple(params)), start=1):
+                answers = [None] * len(columns)
+                try:
+                    feedback = json.loads(eval_row['feedback'])
+                except (json.JSONDecodeError, TypeError):
+                    feedback = {}
+                for question_text, _, _, _ in plans.get(eval_row['template_id'], []):
+                    answer = feedback.get(question_text)
+                    if answer is not None and answer != '':
+                        answers[columns[question_text]] = "; ".join(map(str, answer)) if isinstance(answer, list) else str(answer)
+                yield [
+                    response_no, eval_row['template_id'], eval_row['course_code'], eval_row['batch'],
+                    eval_row['date'].strftime("%Y-%m-%d") if eval_row['date'] else None
+                ] + answers + [eval_row['comment'] or None]
+
+        try:
+            count = writer(file_path, header, rows(), REPORT_CONFIG.get('export_chunk_size', 5000))
+        except ImportError as e:
+            return False, f"{file_type.upper()} export requires an additional library: {e}"
+        except (OSError, ValueError, Error) as e:
+            print(f"Error exporting raw responses: {e}")
+            if isinstance(e, Error) and os.path.exists(file_path):
+                os.remove(file_path) # Do not leave a truncated export behind
+            return False, f"Failed to export raw responses: {e}"
+        return True, f"Exported {count} response(s) to {os.path.basename(file_path)}"
+
+    def get_question_charts(self, report_data, width=400, height=300):
+        """
+        Renders the chart of each question in report_data in memory, directly at the display size,
+        without touching the filesystem.
+        :return: A dict mapping question_text to a PIL Image of width x height pixels.
+        """
+        charts = self.chart_renderer.render(report_data, size=(width / CHART_DPI, height / CHART_DPI))
+        return {question_text: Image.open(io.BytesIO(image)) for question_text, image in charts.items()}
+
     def generate_question_graphs(self, report_data, output_dir="report_graphs"):
         """
-        Generates bar or pie charts for each question in the report_data and saves them as images.
+        Exports bar or pie charts for each question in the report_data as PNG files.
+        Charts are rendered by self.chart_renderer (process pool, cached by histogram). File names
+        end with a hash of the full question text, so questions sharing a prefix do not overwrite
+        each other.
         Returns a dict mapping question_text to image file paths.
         """
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
         image_paths = {}
-        for question_text, qdata in report_data.items():
-            qtype = qdata.get("type")
-            data = qdata.get("data", {})
-            if qtype in ["rating", "multiple_choice"] and data:
-                labels = list(data.keys())
-                values = list(data.values())
-                plt.figure(figsize=(6, 4))
-                if qtype == "rating" and len(labels) > 1:
-                    plt.bar(labels, values, color="#1976d2")
-                    plt.title(f"{question_text} (Ratings)")
-                    plt.xlabel("Rating")
-                    plt.ylabel("Count")
-                elif qtype == "multiple_choice":
-                    plt.pie(values, labels=labels, autopct='%1.1f%%', startangle=140)
-                    plt.title(f"{question_text} (MCQ)")
-                else:
-                    continue
-                img_path = os.path.join(output_dir, f"{question_text[:30].replace(' ', '_')}.png")
-                plt.tight_layout()
-                plt.savefig(img_path)
-                plt.close()
-                image_paths[question_text] = img_path
-        return image_paths
\ No newline at end of file
+        for question_text, image in self.chart_renderer.render(report_data).items():
+            question_hash = hashlib.sha1(question_text.encode('utf-8')).hexdigest()[:8]
+            img_path = os.path.join(output_dir, f"{question_text[:30].replace(' ', '_')}_{question_hash}.png")
+            with open(img_path, 'wb') as image_file:
+                image_file.write(image)
+            image_paths[question_text] = img_path
+        return image_paths
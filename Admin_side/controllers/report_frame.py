@@ -0,0 +1,215 @@
+# Admin_side/controllers/report_frame.py
+import json
+import numpy as np
+import pandas as pd
+from controllers.question_plan import compile_questions, parse_rating
+
+
+class ReportFrame:
+    """
+    Columnar, in-memory copy of all evaluation responses for the 'pandas' report engine
+    (ReportController.get_aggregated_evaluation_report(aggregation='pandas')).
+
+    `frame` has one row per evaluation (id, template_id, course_code, batch, session, comment) and one
+    column per question text: categorical answer labels for rating and multiple-choice questions,
+    raw answers for text questions. `ratings` holds the numeric value of every rating answer as
+    nullable int8 columns. Filters and answer cross-filters are boolean masks over these arrays,
+    so each report after the first load is computed with vectorized operations only.
+
+    The frame is loaded once and reloaded when evaluations or templates change (see refresh()).
+    """
+    def __init__(self, db):
+        """
+        :param db: DBManager used to load the evaluations.
+        """
+        self.db = db
+        self.signature = None
+        self.frame = None
+        self.ratings = None
+        self.questions = {} # question_text -> (question_type, options), from the first template that has it
+        self.template_questions = {} # template_id -> question texts in template order
+
+    def current_signature(self):
+        """Cheap fingerprint of the evaluations and templates; changes after every submission, deletion or template edit."""
+        row = self.db.fetch_data("""
+        SELECT
+            (SELECT COUNT(*) FROM evaluations) AS submissions,
+            (SELECT MAX(id) FROM evaluations) AS last_evaluation_id,
+            (SELECT COUNT(*) FROM evaluation_templates) AS templates,
+            (SELECT MAX(updated_at) FROM evaluation_templates) AS templates_updated_at
+        """, fetch_one=True, primary=True)
+        return tuple(row.values()) if row else None
+
+    def refresh(self):
+        """Loads the frame if it is missing or out of date. Returns True if the frame is usable."""
+        signature = self.current_signature()
+        if signature is None:
+            return self.frame is not None
+        if self.frame is None or signature != self.signature:
+            self.load()
+            self.signature = signature
+        return True
+
+    def load(self):
+        """Reads every evaluation once and builds the columnar frame."""
+        templates = self.db.fetch_data(
+            "SELECT id AS template_id, batch, session, questions_set FROM evaluation_templates ORDER BY id", fetch_all=True, primary=True
+        ) or []
+        plans = {}
+        batches = {}
+        sessions = {}
+        self.questions = {}
+        self.template_questions = {}
+        for template in templates:
+            plan = compile_questions(template['questions_set'])
+            if plan is None:
+                continue
+            plans[template['template_id']] = plan
+            batches[template['template_id']] = template['batch']
+            sessions[template['template_id']] = template['session']
+            self.template_questions[template['template_id']] = [question[0] for question in plan]
+            for question_text, question_type, options, _ in plan:
+                self.questions.setdefault(question_text, (question_type, options))
+
+        ids, template_ids, course_codes, comments = [], [], [], []
+        answers = {} # question_text -> (row positions, answers)
+        for row in self.db.fetch_iter("SELECT id, template_id, course_code, feedback, comment FROM evaluations ORDER BY id", primary=True):
+            position = len(ids)
+            ids.append(row['id'])
+            template_ids.append(row['template_id'])
+            course_codes.append(row['course_code'])
+            comments.append(row['comment'] or None)
+            plan = plans.get(row['template_id'])
+            if plan is None:
+                continue
+            try:
+                feedback = json.loads(row['feedback'])
+            except (json.JSONDecodeError, TypeError):
+                continue
+            for question_text, question_type, _, rating_values in plan:
+                answer = feedback.get(question_text)
+                if not answer:
+                    continue
+                if question_type == 'rating':
+                    answer = str(answer)
+                    if answer not in rating_values and parse_rating(answer) is None:
+                        continue
+                column = answers.setdefault(question_text, ([], []))
+                column[0].append(position)
+                column[1].append(answer)
+
+        row_count = len(ids)
+        columns = {
+            'id': np.array(ids, dtype=np.int64),
+            'template_id': pd.Categorical(template_ids),
+            'course_code': pd.Categorical(course_codes),
+            'batch': pd.Categorical([batches.get(template_id) for template_id in template_ids]),
+            'session': pd.Categorical([sessions.get(template_id) for template_id in template_ids]),
+            'comment': pd.Series(comments, dtype=object)
+        }
+        rating_columns = {}
+        for question_text, (question_type, options) in self.questions.items():
+            positions, values = answers.get(question_text, ([], []))
+            if question_type == 'text':
+                column = np.full(row_count, None, dtype=object)
+                column[positions] = values
+                columns[question_text] = column
+            elif question_type == 'multiple_choice' and any(isinstance(value, list) for value in values):
+                # Multi-select answers stay lists; counted with explode()
+                column = np.full(row_count, None, dtype=object)
+                for position, value in zip(positions, values):
+                    column[position] = [str(option) for option in value] if isinstance(value, list) else [str(value)]
+                columns[question_text] = column
+            elif question_type in ('rating', 'multiple_choice'):
+                labels = [str(value) for value in values]
+                categories = [str(option) for option in options or []]
+                categories += sorted(set(labels) - set(categories))
+                codes = np.full(row_count, -1, dtype=np.int16)
+                category_codes = {label: code for code, label in enumerate(categories)}
+                codes[positions] = [category_codes[label] for label in labels]
+                columns[question_text] = pd.Categorical.from_codes(codes, categories=categories)
+                if question_type == 'rating':
+                    category_values = [parse_rating(label) for label in categories]
+                    dtype = 'Int8' if all(-128 <= value <= 127 for value in category_values if value is not None) else 'Int32'
+                    rating_values = pd.array([None] * row_count, dtype=dtype)
+                    if positions:
+                        rating_values[np.array(positions)] = [category_values[category_codes[label]] for label in labels]
+                    rating_columns[question_text] = rating_values
+
+        self.frame = pd.DataFrame(columns)
+        self.ratings = pd.DataFrame(rating_columns, index=self.frame.index)
+
+    def _mask(self, course_code=None, batch=None, faculty_courses=None, template_id=None, answer_filters=None, session=None):
+        """Boolean row mask for the report filters and the answer cross-filters."""
+        frame = self.frame
+        mask = np.ones(len(frame), dtype=bool)
+        if course_code:
+            mask &= (frame['course_code'] == course_code).to_numpy()
+        if batch:
+            mask &= (frame['batch'] == batch).to_numpy()
+        if faculty_courses is not None:
+            mask &= frame['course_code'].isin(faculty_courses).to_numpy()
+        if template_id:
+            mask &= (frame['template_id'] == template_id).to_numpy()
+        if session:
+            mask &= (frame['session'] == session).to_numpy()
+        for question_text, wanted in (answer_filters or {}).items():
+            if question_text not in frame:
+                return np.zeros(len(frame), dtype=bool)
+            wanted = {str(value) for value in (wanted if isinstance(wanted, (list, tuple, set)) else [wanted])}
+            column = frame[question_text]
+            if column.dtype == object and self.questions[question_text][0] == 'multiple_choice':
+                mask &= column.map(lambda answer: answer is not None and not wanted.isdisjoint(answer)).to_numpy(dtype=bool)
+            else:
+                mask &= column.isin(wanted).to_numpy()
+        return mask
+
+    def report(self, course_code=None, batch=None, faculty_courses=None, template_id=None, answer_filters=None, session=None):
+        """
+        Computes report_data for the rows matching the filters, in the shape returned by
+        ReportController.get_aggregated_evaluation_report. Rating questions also get
+        'std_dev' and 'percentiles' (p25/p50/p75).
+        :param faculty_courses: Course codes taught by the faculty to filter on, or None.
+        :param answer_filters: {question_text: option or list of options}: only submissions that
+                               gave one of these answers to that question (cross-filter).
+        :param session: Template session (term) to filter on, or None.
+        :return: A tuple (total_submissions, report_data, course_codes of the matching submissions).
+        """
+        mask = self._mask(course_code, batch, faculty_courses, template_id, answer_filters, session)
+        selected = self.frame[mask]
+        if selected.empty:
+            return 0, {}, []
+        selected_ratings = self.ratings[mask]
+
+        aggregated_results = {}
+        template_order = selected.groupby('template_id', observed=True)['id'].min().sort_values().index
+        for current_template in template_order:
+            for question_text in self.template_questions.get(current_template, []):
+                if question_text in aggregated_results:
+                    continue
+                question_type, options = self.questions[question_text]
+                question_data = {"type": question_type, "options": options, "data": {}}
+                column = selected[question_text]
+                if question_type == 'text':
+                    comments = column.dropna().tolist()
+                    if comments:
+                        question_data['data']['comments'] = comments
+                else:
+                    if column.dtype == object:
+                        counts = column.dropna().explode().value_counts(sort=False)
+                    else:
+                        counts = column.value_counts(sort=False)
+                    question_data['data'] = {str(label): int(count) for label, count in counts.items() if count > 0}
+                    if question_type == 'rating' and question_text in selected_ratings:
+                        values = selected_ratings[question_text].dropna().astype('float64')
+                        if len(values):
+                            p25, p50, p75 = values.quantile([0.25, 0.5, 0.75]).tolist()
+                            question_data['average'] = round(float(values.mean()), 2)
+                            question_data['std_dev'] = round(float(values.std()), 2) if len(values) > 1 else 0.0
+                            question_data['percentiles'] = {"p25": round(p25, 2), "p50": round(p50, 2), "p75": round(p75, 2)}
+                aggregated_results[question_text] = question_data
+
+        general_comments = selected['comment'].dropna().tolist()
+        if general_comments:
+            aggregated_results['General Comments'] = {"type": "text", "data": {"comments": general_comments}}
+        return len(selected), aggregated_results, selected['course_code'].dropna().unique().tolist()
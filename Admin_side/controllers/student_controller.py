@@ -5,10 +5,41 @@ from models.faculty_model import Faculty
 from models.complaint_model import Complaint # NEW: Import Complaint model
 from models.course_model import Course # Import Course model to use in get_courses_by_status
 import json # For handling JSON data for complaints etc.
+from controllers.cache_version_controller import CacheVersionController, student_identity_version
+
+# Ongoing evaluations assigned to one student and not yet completed by them, without questions_set.
+# A template is assigned through a course the student takes (individually or through their batch),
+# their batch or their session; each UNION branch is an index lookup (pending_evaluations.sql), so
+# the cost follows the student's assignments rather than the size of evaluation_templates.
+# Parameters: (student_id, batch, batch, session, student_id)
+PENDING_EVALUATIONS_QUERY = """
+SELECT et.id, et.title, et.course_code, et.batch, et.session, et.last_date
+FROM evaluation_templates et
+JOIN (
+    SELECT t.id FROM course_student cs
+    JOIN evaluation_templates t ON t.course_code = cs.course_code
+    WHERE cs.student_id = %s AND t.last_date >= CURDATE()
+    UNION
+    SELECT t.id FROM course_student cs
+    JOIN evaluation_templates t ON t.course_code = cs.course_code
+    WHERE cs.batch = %s AND cs.student_id IS NULL AND t.last_date >= CURDATE()
+    UNION
+    SELECT id FROM evaluation_templates WHERE batch = %s AND last_date >= CURDATE()
+    UNION
+    SELECT id FROM evaluation_templates WHERE session = %s AND last_date >= CURDATE()
+) assigned ON assigned.id = et.id
+WHERE NOT EXISTS (
+    SELECT 1 FROM evaluation_completion ec
+    WHERE ec.student_id = %s AND ec.template_id = et.id AND ec.is_completed = TRUE
+    AND (ec.course_code = et.course_code OR (ec.course_code IS NULL AND et.course_code IS NULL))
+)
+ORDER BY et.last_date ASC, et.title ASC;
+"""
 
 class StudentController:
     def __init__(self):
         self.db = DBManager()
+        self.cache_version_controller = CacheVersionController() # Student API identity caches
 
     def get_all_students(self):
         """Fetches all student records from the database."""
@@ -26,6 +57,27 @@ class StudentController:
             return Student.from_db_row(student_data)
         return None
 
+    def get_student_identity(self, student_id):
+        """
+        Fetches only the columns that scope a student's API requests (student_id, batch, session),
+        without the password or behavioral records.
+        :return: A dictionary, or None if the student does not exist.
+        """
+        query = "SELECT student_id, batch, session FROM students WHERE student_id = %s;"
+        return self.db.fetch_data(query, (student_id,), fetch_one=True)
+
+    def get_pending_evaluations(self, student_id, batch=None, session=None):
+        """
+        Retrieves the ongoing evaluations assigned to a student that they have not completed yet.
+        :param batch: The student's batch, for templates assigned to it or to its courses.
+        :param session: The student's session, for templates assigned to it.
+        :return: A list of dictionaries with id, title, course_code, batch, session and last_date.
+        """
+        data = self.db.fetch_data(
+            PENDING_EVALUATIONS_QUERY, (student_id, batch, batch, session, student_id), fetch_all=True
+        )
+        return data if data else []
+
     def add_student(self, student: Student):
         """Inserts a new student record into the database."""
         query = """
@@ -55,12 +107,19 @@ class StudentController:
             student.department, student.cgpa, student.behavioral_records, student.profile_picture,
             student.student_id
         )
-        return self.db.execute_query(query, params)
+        success = self.db.execute_query(query, params)
+        if success:
+            # Student API processes drop their cached identity (batch, session) of this student
+            self.cache_version_controller.bump(student_identity_version(student.student_id))
+        return success
 
     def delete_student(self, student_id):
         """Deletes a student record by ID."""
         query = "DELETE FROM students WHERE student_id = %s;"
-        return self.db.execute_query(query, (student_id,))
+        success = self.db.execute_query(query, (student_id,))
+        if success:
+            self.cache_version_controller.bump(student_identity_version(student_id))
+        return success
 
     def get_total_batches_count(self):
         """Counts the total number of unique batches in the system."""
@@ -71,13 +130,13 @@ class StudentController:
     def get_unique_sessions(self):
         """Fetches all unique sessions from the database, ordered descending."""
         query = "SELECT DISTINCT session FROM students WHERE session IS NOT NULL ORDER BY session DESC;"
-        sessions_data = self.db.fetch_data(query, fetch_all=True)
+        sessions_data = self.db.fetch_data(query, fetch_all=True, cache=True)
         return [row['session'] for row in sessions_data] if sessions_data else []
 
     def get_unique_departments(self):
         """Fetches all unique department names from the database, ordered alphabetically."""
         query = "SELECT DISTINCT department FROM students WHERE department IS NOT NULL ORDER BY department ASC;"
-        departments_data = self.db.fetch_data(query, fetch_all=True)
+        departments_data = self.db.fetch_data(query, fetch_all=True, cache=True)
         return [row['department'] for row in departments_data] if departments_data else []
 
     def get_unique_batches_with_departments(self):
@@ -86,7 +145,7 @@ class StudentController:
         Returns a list of dictionaries like [{'batch': 'BICE-22', 'department': 'ICT'}].
         """
         query = "SELECT DISTINCT batch, department FROM students WHERE batch IS NOT NULL ORDER BY batch ASC;"
-        batches_data = self.db.fetch_data(query, fetch_all=True)
+        batches_data = self.db.fetch_data(query, fetch_all=True, cache=True)
         return batches_data if batches_data else []
 
     # --- Student API related methods ---
@@ -298,5 +357,5 @@ class StudentController:
     def get_all_batches(self):
         """Fetches all unique batch names from the students table."""
         query = "SELECT DISTINCT batch FROM students WHERE batch IS NOT NULL AND batch != '' ORDER BY batch;"
-        result = self.db.fetch_data(query, fetch_all=True)
+        result = self.db.fetch_data(query, fetch_all=True, cache=True)
         return [row['batch'] for row in result if row['batch']]
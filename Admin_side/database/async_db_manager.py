@@ -0,0 +1,243 @@
+# Admin_side/database/async_db_manager.py
+import asyncio
+import re
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pymysql import Error
+from config import ASYNC_DB_POOL_CONFIG, QUERY_STATS_CONFIG
+from database.backends import get_backend
+from database.connection_pool import PoolTimeoutError
+from database.query_stats import QueryStats
+
+_READ_STATEMENT = re.compile(r"^\s*(?:SELECT|SHOW|DESCRIBE|EXPLAIN|WITH)\b", re.IGNORECASE)
+
+# Transaction state follows the asyncio task (like threading.local does for threads in DBManager)
+_transaction_connection = ContextVar('transaction_connection', default=None)
+_transaction_depth = ContextVar('transaction_depth', default=0)
+
+
+class AsyncDBManager:
+    """
+    asyncio counterpart of DBManager for the ASGI student API (api/student_asgi.py).
+
+    Same methods and return conventions as DBManager (execute_query, execute_many, fetch_data,
+    transaction), but awaitable: a request waiting on the database yields the event loop
+    instead of a thread, so one process can serve thousands of concurrent students with a
+    small connection pool (config.ASYNC_DB_POOL_CONFIG). Uses aiomysql on MySQL and runs
+    SQLite calls in worker threads on the SQLite backend.
+
+        db = AsyncDBManager()
+        await db.connect()
+        rows = await db.fetch_data("SELECT * FROM courses WHERE status = %s", ("upcoming",))
+        async with db.transaction():
+            await db.execute_query("INSERT ...", params)
+    """
+    _instance = None
+    BULK_CHUNK_SIZE = 500 # Rows per statement for execute_many
+
+    def __new__(cls):
+        if cls._instance is None:
+            instance = super(AsyncDBManager, cls).__new__(cls)
+            instance.backend = get_backend()
+            instance.pool = None
+            instance.wait_timeout = ASYNC_DB_POOL_CONFIG.get('wait_timeout')
+            instance.query_stats = QueryStats(**QUERY_STATS_CONFIG)
+            cls._instance = instance
+        return cls._instance
+
+    async def connect(self):
+        """
+        Creates the connection pool on the running event loop and verifies that a connection can be opened.
+        Returns the pool on success, None otherwise.
+        """
+        if self.pool is None:
+            pool_config = {k: v for k, v in ASYNC_DB_POOL_CONFIG.items() if k != 'wait_timeout'}
+            try:
+                self.pool = await self.backend.create_async_pool(**pool_config)
+                connection = await self._acquire()
+                self.pool.release(connection)
+            except Error as e:
+                print(f"Error connecting to the database with {self.backend.display_name} (async): {e}")
+                self.pool = None
+                return None
+            print(f"Successfully connected to the database using {self.backend.display_name} (async).")
+        return self.pool
+
+    async def disconnect(self):
+        """Closes all pooled connections."""
+        if self.pool is not None:
+            self.pool.close()
+            await self.pool.wait_closed()
+            self.pool = None
+            print("Async database connection closed.")
+
+    def stats(self):
+        """Returns a snapshot of the pool's current usage, in the same shape as ConnectionPool.stats()."""
+        if self.pool is None:
+            return None
+        return {
+            "max_size": self.pool.maxsize,
+            "open": self.pool.size,
+            "idle": self.pool.freesize,
+            "in_use": self.pool.size - self.pool.freesize
+        }
+
+    async def _acquire(self):
+        """Waits for a pooled connection for up to wait_timeout seconds."""
+        try:
+            return await asyncio.wait_for(self.pool.acquire(), self.wait_timeout)
+        except asyncio.TimeoutError:
+            raise PoolTimeoutError(f"No database connection available within {self.wait_timeout} seconds (pool size {self.pool.maxsize}).")
+
+    @asynccontextmanager
+    async def _connection(self):
+        """Yields the task's transaction connection, or a pooled connection released afterwards."""
+        connection = _transaction_connection.get()
+        if connection is not None:
+            yield connection
+            return
+        if self.pool is None and await self.connect() is None:
+            raise Error("Database is not connected.")
+        connection = await self._acquire()
+        try:
+            yield connection
+        finally:
+            self.pool.release(connection)
+
+    async def _run(self, cursor, query, params, many=False):
+        """Executes `query` on `cursor`, recording its duration and row count in query_stats."""
+        started = time.perf_counter()
+        try:
+            if many:
+                await cursor.executemany(query, params)
+            else:
+                await cursor.execute(query, params or ())
+        except Error:
+            self.query_stats.record(query, (time.perf_counter() - started) * 1000.0, error=True)
+            raise
+        self.query_stats.record(query, (time.perf_counter() - started) * 1000.0, max(cursor.rowcount, 0))
+        return cursor.rowcount
+
+    def in_transaction(self):
+        """Returns True if the current task is inside an `async with db.transaction():` block."""
+        return _transaction_depth.get() > 0
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Runs several statements on one connection with a single commit; see DBManager.transaction().
+        :raises pymysql.Error: If a statement fails or no connection is available.
+        """
+        if self.in_transaction():
+            token = _transaction_depth.set(_transaction_depth.get() + 1)
+            try:
+                yield _transaction_connection.get()
+            finally:
+                _transaction_depth.reset(token)
+            return
+
+        async with self._connection() as connection:
+            connection_token = _transaction_connection.set(connection)
+            depth_token = _transaction_depth.set(1)
+            try:
+                await connection.begin()
+                yield connection
+                await connection.commit()
+            except BaseException:
+                try:
+                    await connection.rollback()
+                except Error:
+                    pass
+                raise
+            finally:
+                _transaction_depth.reset(depth_token)
+                _transaction_connection.reset(connection_token)
+
+    async def execute_query(self, query, params=None, fetch_one=False, fetch_all=False):
+        """
+        Executes a SQL query and returns results if any.
+        Commits immediately unless called inside transaction().
+        """
+        in_transaction = self.in_transaction()
+        try:
+            async with self._connection() as connection:
+                cursor = await connection.cursor()
+                try:
+                    await self._run(cursor, query, params)
+                    if not in_transaction and not _READ_STATEMENT.match(query):
+                        await connection.commit()
+                    if fetch_one:
+                        return await cursor.fetchone()
+                    elif fetch_all:
+                        return await cursor.fetchall()
+                    return True
+                except Error:
+                    if not in_transaction:
+                        try:
+                            await connection.rollback()
+                        except Error:
+                            pass
+                    raise
+                finally:
+                    await cursor.close()
+        except Error as e:
+            print(f"Error executing query: {query}\nError: {e}")
+            if in_transaction:
+                raise # Let transaction() roll back the whole unit of work
+            return False
+
+    async def execute_many(self, query, params_seq, chunk_size=None):
+        """
+        Executes the same statement for many parameter tuples; see DBManager.execute_many().
+        :return: Total number of affected rows, or False on failure.
+        """
+        params_seq = list(params_seq)
+        if not params_seq:
+            return 0
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        in_transaction = self.in_transaction()
+        try:
+            async with self._connection() as connection:
+                cursor = await connection.cursor()
+                try:
+                    affected_rows = 0
+                    for start in range(0, len(params_seq), chunk_size):
+                        affected_rows += max(await self._run(cursor, query, params_seq[start:start + chunk_size], many=True), 0)
+                    if not in_transaction:
+                        await connection.commit()
+                    return affected_rows
+                except Error:
+                    if not in_transaction:
+                        try:
+                            await connection.rollback()
+                        except Error:
+                            pass
+                    raise
+                finally:
+                    await cursor.close()
+        except Error as e:
+            print(f"Error executing bulk query: {query}\nError: {e}")
+            if in_transaction:
+                raise
+            return False
+
+    async def fetch_data(self, query, params=None, fetch_one=False, fetch_all=True):
+        """Helper for SELECT queries that return dictionaries."""
+        try:
+            async with self._connection() as connection:
+                cursor = await connection.cursor()
+                try:
+                    await self._run(cursor, query, params)
+                    if fetch_one:
+                        return await cursor.fetchone()
+                    elif fetch_all:
+                        return await cursor.fetchall()
+                    return None
+                finally:
+                    await cursor.close()
+        except Error as e:
+            print(f"Error fetching data: {query}\nError: {e}")
+            if self.in_transaction():
+                raise
+            return None
@@ -0,0 +1,58 @@
+# Admin_side/database/backends.py
+from pymysql.cursors import SSDictCursor
+from config import DATABASE_BACKEND, DATABASE_CONFIG, READ_REPLICA_CONFIG, SQLITE_CONFIG
+from database.connection_pool import ConnectionPool
+
+
+class MySQLBackend:
+    """The production backend: pooled PyMySQL connections to the server in config.DATABASE_CONFIG."""
+    name = "mysql"
+    display_name = "PyMySQL"
+
+    def __init__(self, db_config, replica_config=None):
+        """
+        :param db_config: Keyword arguments for pymysql.connect for the primary server.
+        :param replica_config: Same for a read replica, or None if reads should use the primary.
+        """
+        self.db_config = db_config
+        self.replica_config = replica_config
+
+    def create_pool(self, **pool_config):
+        """Returns the ConnectionPool DBManager checks connections out of."""
+        return ConnectionPool(self.db_config, **pool_config)
+
+    def create_replica_pool(self, **pool_config):
+        """Returns a ConnectionPool for the read replica, or None if no replica is configured."""
+        if not self.replica_config:
+            return None
+        return ConnectionPool(self.replica_config, **pool_config)
+
+    async def create_async_pool(self, min_size=1, max_size=20, pool_recycle=300):
+        """Returns an aiomysql pool for AsyncDBManager (requires `pip install aiomysql`)."""
+        import aiomysql # Only needed by the ASGI student API
+        connect_config = dict(self.db_config)
+        connect_config['db'] = connect_config.pop('database', None) # aiomysql's name for the schema
+        connect_config.setdefault('autocommit', True)
+        return await aiomysql.create_pool(
+            minsize=min_size, maxsize=max_size, pool_recycle=pool_recycle,
+            cursorclass=aiomysql.DictCursor, **connect_config
+        )
+
+    def streaming_cursor(self, connection):
+        """Returns an unbuffered cursor that reads rows from the server as they are fetched."""
+        return connection.cursor(SSDictCursor)
+
+
+def get_backend(name=None):
+    """
+    Creates the database backend selected by `name` (default: config.DATABASE_BACKEND).
+    Supported backends are "mysql" (MySQLBackend) and "sqlite" (database.sqlite_backend.SQLiteBackend).
+    :raises ValueError: If the backend name is unknown.
+    """
+    name = (name or DATABASE_BACKEND).lower()
+    if name == "mysql":
+        return MySQLBackend(DATABASE_CONFIG, READ_REPLICA_CONFIG)
+    if name == "sqlite":
+        from database.sqlite_backend import SQLiteBackend # Only imported when selected
+        return SQLiteBackend(**SQLITE_CONFIG)
+    raise ValueError(f"Unknown database backend: {name!r} (expected 'mysql' or 'sqlite').")
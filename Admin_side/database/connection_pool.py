@@ -0,0 +1,194 @@
+# Admin_side/database/connection_pool.py
+import threading
+import time
+from contextlib import contextmanager
+import pymysql
+from pymysql.cursors import DictCursor
+from pymysql import Error
+
+
+class PoolTimeoutError(Error):
+    """Raised when no connection becomes available within the pool's wait time."""
+    pass
+
+
+class ConnectionPool:
+    """
+    A bounded, thread-safe pool of PyMySQL connections.
+
+    Connections are checked out for the duration of a single operation and returned
+    afterwards, so concurrent request threads (e.g. in the Flask student API) never
+    share a socket. A thread that already holds a connection gets the same one back
+    on nested checkouts, and idle connections are preferably handed back to the
+    thread that last used them. Connections idle for longer than `idle_timeout`
+    are closed, keeping at least `min_size` open.
+    """
+    def __init__(self, db_config, max_size=10, min_size=1, wait_timeout=5, idle_timeout=300, ping_interval=30):
+        """
+        :param db_config: Keyword arguments for pymysql.connect (see config.DATABASE_CONFIG).
+        :param max_size: Maximum number of connections open at the same time.
+        :param min_size: Number of idle connections that are never evicted.
+        :param wait_timeout: Seconds a checkout waits for a free connection before failing.
+        :param idle_timeout: Seconds a connection may stay idle before it is closed.
+        :param ping_interval: Idle seconds after which a connection is pinged before reuse.
+        """
+        self.db_config = db_config.copy()
+        self.db_config['cursorclass'] = DictCursor
+        # Pooled connections outlive a single request, so without autocommit a connection
+        # that only ever runs SELECTs would keep reading from the same stale snapshot.
+        self.db_config.setdefault('autocommit', True)
+        self.max_size = max(1, max_size)
+        self.min_size = min(max(0, min_size), self.max_size)
+        self.wait_timeout = wait_timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+
+        self._condition = threading.Condition(threading.Lock())
+        self._idle = [] # List of (connection, last_thread_id, returned_at) tuples
+        self._open_count = 0 # Idle + checked-out connections
+        self._local = threading.local() # Per-thread checked-out connection and nesting depth
+
+    def _create_connection(self):
+        """Opens a new PyMySQL connection using the pool's configuration."""
+        return pymysql.connect(**self.db_config)
+
+    def _close_quietly(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _evict_idle(self, now):
+        """Closes connections idle for longer than idle_timeout. Caller must hold the lock."""
+        if self.idle_timeout is None:
+            return []
+        evicted = []
+        kept = []
+        for entry in self._idle:
+            if now - entry[2] > self.idle_timeout and len(self._idle) - len(evicted) > self.min_size:
+                evicted.append(entry[0])
+            else:
+                kept.append(entry)
+        self._idle = kept
+        self._open_count -= len(evicted)
+        return evicted
+
+    def _take_idle(self, thread_id):
+        """Pops an idle connection, preferring the one this thread used last. Caller must hold the lock."""
+        for index in range(len(self._idle) - 1, -1, -1):
+            if self._idle[index][1] == thread_id:
+                return self._idle.pop(index)
+        return self._idle.pop()
+
+    def checkout(self, shared=True):
+        """
+        Returns a connection for exclusive use by the calling thread.
+        Blocks for up to wait_timeout seconds if the pool is exhausted.
+        :param shared: If False, always hands out a separate connection that nested checkouts
+                       on this thread will not reuse (needed while an unbuffered cursor is open).
+        :raises PoolTimeoutError: If no connection became available in time.
+        """
+        held = getattr(self._local, 'connection', None)
+        if shared and held is not None:
+            self._local.depth += 1
+            return held
+
+        thread_id = threading.get_ident()
+        deadline = time.monotonic() + self.wait_timeout if self.wait_timeout is not None else None
+        entry = None
+        create = False
+        with self._condition:
+            to_close = self._evict_idle(time.monotonic())
+            while True:
+                if self._idle:
+                    entry = self._take_idle(thread_id)
+                    break
+                if self._open_count < self.max_size:
+                    self._open_count += 1 # Reserve the slot before connecting outside the lock
+                    create = True
+                    break
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeoutError(f"No database connection available within {self.wait_timeout} seconds (pool size {self.max_size}).")
+                self._condition.wait(remaining)
+
+        for stale in to_close:
+            self._close_quietly(stale)
+
+        if create:
+            try:
+                connection = self._create_connection()
+            except Exception:
+                with self._condition:
+                    self._open_count -= 1
+                    self._condition.notify()
+                raise
+        else:
+            connection, _, returned_at = entry
+            if self.ping_interval is not None and time.monotonic() - returned_at > self.ping_interval:
+                try:
+                    connection.ping(reconnect=True)
+                except Exception:
+                    self._discard(connection)
+                    return self.checkout(shared)
+
+        if shared:
+            self._local.connection = connection
+            self._local.depth = 1
+        return connection
+
+    def checkin(self, connection):
+        """
+        Returns a connection previously obtained with checkout().
+        Nested checkouts by the same thread only release the connection on the outermost checkin.
+        """
+        if getattr(self._local, 'connection', None) is connection:
+            self._local.depth -= 1
+            if self._local.depth > 0:
+                return
+            self._local.connection = None
+
+        if not getattr(connection, 'open', True):
+            self._discard(connection)
+            return
+
+        with self._condition:
+            self._idle.append((connection, threading.get_ident(), time.monotonic()))
+            self._condition.notify()
+
+    def _discard(self, connection):
+        """Closes a broken connection and frees its slot."""
+        self._close_quietly(connection)
+        with self._condition:
+            self._open_count -= 1
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self):
+        """Context manager wrapping checkout()/checkin()."""
+        connection = self.checkout()
+        try:
+            yield connection
+        finally:
+            self.checkin(connection)
+
+    def close_all(self):
+        """Closes every idle connection and returns how many were closed."""
+        with self._condition:
+            idle = self._idle
+            self._idle = []
+            self._open_count -= len(idle)
+            self._condition.notify_all()
+        for connection, _, _ in idle:
+            self._close_quietly(connection)
+        return len(idle)
+
+    def stats(self):
+        """Returns a snapshot of the pool's current usage."""
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "open": self._open_count,
+                "idle": len(self._idle),
+                "in_use": self._open_count - len(self._idle)
+            }
@@ -1,49 +1,249 @@
-import pymysql
-from pymysql.cursors import DictCursor
+import re
+import threading
+import time
+from contextlib import contextmanager
 from pymysql import Error
-from config import DATABASE_CONFIG
+from config import DB_POOL_CONFIG, QUERY_STATS_CONFIG, QUERY_PROFILER_CONFIG, QUERY_CACHE_CONFIG, READ_YOUR_WRITES_SECONDS
+from database.backends import get_backend
+from database.query_stats import QueryStats
+from database.query_profiler import QueryProfiler
+from database.query_cache import QueryCache, tables_read, tables_written
+
+_READ_STATEMENT = re.compile(r"^\s*(?:SELECT|SHOW|DESCRIBE|EXPLAIN|WITH)\b", re.IGNORECASE)
 
 class DBManager:
     _instance = None
+    _instance_lock = threading.Lock()
+    BULK_CHUNK_SIZE = 500 # Rows per statement for execute_many / bulk deletes
+    RECENT_WRITES_PRUNE_SIZE = 1000 # Expired read-your-writes entries are dropped once this many keys are tracked
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(DBManager, cls).__new__(cls)
-            cls._instance.connection = None
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super(DBManager, cls).__new__(cls)
+                    instance.backend = get_backend() # MySQL or SQLite, per config.DATABASE_BACKEND
+                    instance.pool = None
+                    instance.replica_pool = None # Read replica, if config.READ_REPLICA_CONFIG is set
+                    instance._replica_checked = False
+                    instance._recent_writes = {} # Consistency key -> time of its last write (read-your-writes)
+                    instance._local = threading.local() # Per-thread transaction state
+                    instance.query_stats = QueryStats(**QUERY_STATS_CONFIG)
+                    instance.profiler = QueryProfiler(**QUERY_PROFILER_CONFIG) # N+1 detection, off unless enabled in config
+                    instance.query_cache = QueryCache(**QUERY_CACHE_CONFIG) # Results of fetch_data(..., cache=True)
+                    cls._instance = instance
         return cls._instance
 
+    def _get_pool(self):
+        """Lazily creates the shared connection pool."""
+        if self.pool is None:
+            with self._instance_lock:
+                if self.pool is None:
+                    self.pool = self.backend.create_pool(**DB_POOL_CONFIG)
+        return self.pool
+
+    def _get_replica_pool(self):
+        """Lazily creates the read replica pool. Returns None if no replica is configured."""
+        if not self._replica_checked:
+            with self._instance_lock:
+                if not self._replica_checked:
+                    self.replica_pool = self.backend.create_replica_pool(**DB_POOL_CONFIG)
+                    self._replica_checked = True
+        return self.replica_pool
+
     def connect(self):
-        """Establishes a database connection using PyMySQL."""
-        if self.connection is None:
+        """
+        Initialises the connection pool and verifies that a connection can be opened.
+        If a read replica is configured it is verified too; reads fall back to the primary if it is down.
+        Returns the pool on success, None otherwise.
+        """
+        pool = self._get_pool()
+        try:
+            with pool.connection():
+                pass
+            print(f"Successfully connected to the database using {self.backend.display_name}.")
+        except Error as e:
+            print(f"Error connecting to the database with {self.backend.display_name}: {e}")
+            return None
+
+        replica_pool = self._get_replica_pool()
+        if replica_pool:
             try:
-                # Add the cursorclass directly to the connection arguments
-                db_config_with_cursor = DATABASE_CONFIG.copy()
-                db_config_with_cursor['cursorclass'] = DictCursor
-                self.connection = pymysql.connect(**db_config_with_cursor)
-                print("Successfully connected to the database using PyMySQL.")
+                with replica_pool.connection():
+                    pass
+                print("Successfully connected to the read replica.")
             except Error as e:
-                print(f"Error connecting to MySQL database with PyMySQL: {e}")
-                self.connection = None
-        return self.connection
+                print(f"Warning: Could not connect to the read replica, reads will use the primary: {e}")
+        return pool
 
     def disconnect(self):
-        """Closes the database connection."""
-        if self.connection:
-            self.connection.close()
+        """Closes all pooled database connections."""
+        if self.pool:
+            self.pool.close_all()
             print("Database connection closed.")
-            self.connection = None
+        if self.replica_pool:
+            self.replica_pool.close_all()
+
+    def set_consistency_key(self, key):
+        """
+        Sets who the calling thread is acting for (e.g. "student:<id>" in the student API).
+        After a write, reads with the same key go to the primary for READ_YOUR_WRITES_SECONDS,
+        so replica lag never hides a user's own changes from them. None (the default) is shared
+        by every thread without a key, e.g. the single user of the admin application.
+        """
+        self._local.consistency_key = key
+
+    def _mark_write(self):
+        """Starts the read-your-writes window for the calling thread's consistency key."""
+        if self.replica_pool is None:
+            return
+        now = time.monotonic()
+        if len(self._recent_writes) >= self.RECENT_WRITES_PRUNE_SIZE:
+            for key, written_at in list(self._recent_writes.items()):
+                if now - written_at >= READ_YOUR_WRITES_SECONDS:
+                    self._recent_writes.pop(key, None)
+        self._recent_writes[getattr(self._local, 'consistency_key', None)] = now
+
+    def _invalidate_cache(self, query):
+        """
+        Drops cached results that read a table written by `query`. Must run after the commit so
+        a concurrent read cannot re-cache the old rows; inside a transaction the tables are
+        collected and invalidated when the transaction commits.
+        """
+        tables = tables_written(query)
+        if not tables:
+            return
+        if self.in_transaction():
+            self._local.written_tables.update(tables)
+        else:
+            self.query_cache.invalidate_tables(tables)
+
+    def _get_read_pool(self, primary=False):
+        """
+        Returns the pool a read should use: the replica, unless none is configured, the caller
+        asked for the primary, the thread is inside a transaction, or the thread's consistency
+        key wrote within the last READ_YOUR_WRITES_SECONDS.
+        """
+        replica_pool = self._get_replica_pool()
+        if replica_pool is None or primary or self.in_transaction():
+            return self._get_pool()
+        written_at = self._recent_writes.get(getattr(self._local, 'consistency_key', None))
+        if written_at is not None and time.monotonic() - written_at < READ_YOUR_WRITES_SECONDS:
+            return self._get_pool()
+        return replica_pool
+
+    def _checkout_for_read(self, primary=False, shared=True):
+        """
+        Checks out a connection for a read, falling back to the primary if the replica is unavailable.
+        :return: (pool, connection)
+        """
+        pool = self._get_read_pool(primary)
+        if pool is not self.pool:
+            try:
+                return pool, pool.checkout(shared=shared)
+            except Error as e:
+                print(f"Error acquiring read replica connection, using the primary: {e}")
+                pool = self._get_pool()
+        return pool, pool.checkout(shared=shared)
+
+    def _run(self, cursor, query, params, many=False):
+        """Executes `query` on `cursor`, recording its duration and row count in query_stats."""
+        self.profiler.record(query)
+        started = time.perf_counter()
+        try:
+            if many:
+                cursor.executemany(query, params)
+            else:
+                cursor.execute(query, params or ())
+        except Error:
+            self.query_stats.record(query, (time.perf_counter() - started) * 1000.0, error=True)
+            raise
+        self.query_stats.record(query, (time.perf_counter() - started) * 1000.0, max(cursor.rowcount, 0))
+        return cursor.rowcount
+
+    def operation(self, name):
+        """
+        Marks a block as one logical operation for N+1 detection (see QueryProfiler).
+        API requests and Tk callbacks are wrapped automatically when profiling is enabled;
+        use this for other entry points such as scripts or background jobs.
+
+            with db.operation("nightly report"):
+                ...
+        """
+        return self.profiler.operation(name)
+
+    def in_transaction(self):
+        """Returns True if the calling thread is inside a `with db.transaction():` block."""
+        return getattr(self._local, 'transaction_depth', 0) > 0
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs several statements on one pooled connection with a single commit.
+
+        Inside the block, execute_query does not commit after each statement and
+        database errors are raised instead of being swallowed, so the whole block
+        is rolled back and the error propagates to the caller. Nested
+        transaction() blocks join the outermost one.
+
+            with db.transaction():
+                db.execute_query("INSERT ...", params)
+                db.execute_query("UPDATE ...", params)
+
+        :raises pymysql.Error: If a statement fails or no connection is available.
+        """
+        if self.in_transaction():
+            self._local.transaction_depth += 1
+            try:
+                yield self._local.transaction_connection
+            finally:
+                self._local.transaction_depth -= 1
+            return
+
+        pool = self._get_pool()
+        connection = pool.checkout()
+        self._local.transaction_connection = connection
+        self._local.transaction_depth = 1
+        self._local.written_tables = set()
+        try:
+            connection.begin()
+            yield connection
+            connection.commit()
+            self._mark_write()
+            self.query_cache.invalidate_tables(self._local.written_tables)
+        except BaseException:
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            raise
+        finally:
+            self._local.transaction_depth = 0
+            self._local.transaction_connection = None
+            pool.checkin(connection)
 
     def execute_query(self, query, params=None, fetch_one=False, fetch_all=False):
-        """Executes a SQL query and returns results if any."""
-        self.connect()
-        if not self.connection:
+        """
+        Executes a SQL query and returns results if any.
+        Commits immediately unless called inside transaction().
+        """
+        in_transaction = self.in_transaction()
+        try:
+            connection = self._get_pool().checkout()
+        except Error as e:
+            print(f"Error acquiring database connection: {e}")
             return None
 
         cursor = None
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params or ())
-            self.connection.commit()
+            cursor = connection.cursor()
+            self._run(cursor, query, params)
+            if not in_transaction:
+                connection.commit()
+            if not _READ_STATEMENT.match(query):
+                if not in_transaction:
+                    self._mark_write()
+                self._invalidate_cache(query)
 
             if fetch_one:
                 return cursor.fetchone()
@@ -52,36 +252,176 @@ class DBManager:
             return True
         except Error as e:
             print(f"Error executing query: {query}\nError: {e}")
-            self.connection.rollback()
+            if in_transaction:
+                raise # Let transaction() roll back the whole unit of work
+            try:
+                connection.rollback()
+            except Error:
+                pass
             return False
         finally:
             if cursor:
                 cursor.close()
+            self.pool.checkin(connection)
 
-    def fetch_data(self, query, params=None, fetch_one=False, fetch_all=True):
-        """Helper for SELECT queries that return dictionaries."""
-        self.connect()
-        if not self.connection:
+    def execute_many(self, query, params_seq, chunk_size=None):
+        """
+        Executes the same statement for many parameter tuples.
+        For `INSERT ... VALUES (%s, ...)` statements PyMySQL sends each chunk as a single
+        multi-row INSERT, so N rows cost one round-trip per chunk instead of N.
+        All chunks are committed together (or left to the enclosing transaction()).
+        :param query: The SQL statement with %s placeholders.
+        :param params_seq: Iterable of parameter tuples.
+        :param chunk_size: Rows per statement; defaults to BULK_CHUNK_SIZE.
+        :return: Total number of affected rows, or False on failure (None if no connection).
+        """
+        params_seq = list(params_seq)
+        if not params_seq:
+            return 0
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        in_transaction = self.in_transaction()
+        try:
+            connection = self._get_pool().checkout()
+        except Error as e:
+            print(f"Error acquiring database connection: {e}")
             return None
 
         cursor = None
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params or ())
+            cursor = connection.cursor()
+            affected_rows = 0
+            for start in range(0, len(params_seq), chunk_size):
+                affected_rows += max(self._run(cursor, query, params_seq[start:start + chunk_size], many=True), 0)
+            if not in_transaction:
+                connection.commit()
+                self._mark_write()
+            self._invalidate_cache(query)
+            return affected_rows
+        except Error as e:
+            print(f"Error executing bulk query: {query}\nError: {e}")
+            if in_transaction:
+                raise
+            try:
+                connection.rollback()
+            except Error:
+                pass
+            return False
+        finally:
+            if cursor:
+                cursor.close()
+            self.pool.checkin(connection)
+
+    def fetch_data(self, query, params=None, fetch_one=False, fetch_all=True, primary=False, cache=False):
+        """
+        Helper for SELECT queries that return dictionaries.
+        Reads from the read replica when one is configured (see _get_read_pool);
+        pass primary=True for reads that must see the latest committed data.
+        With cache=True the result is served from query_cache while no write through this
+        DBManager has touched the tables it reads (see QueryCache); use it for reference data.
+        """
+        use_cache = cache and not self.in_transaction()
+        if use_cache:
+            if isinstance(params, dict):
+                cache_params = tuple(sorted(params.items()))
+            else:
+                cache_params = tuple(params) if params else ()
+            cache_key = (query, cache_params, fetch_one, fetch_all)
+            hit, cached = self.query_cache.get(cache_key)
+            if hit:
+                return self._copy_rows(cached)
+            tables = tables_read(query)
+            generations = self.query_cache.generations(tables)
+
+        try:
+            pool, connection = self._checkout_for_read(primary)
+        except Error as e:
+            print(f"Error acquiring database connection: {e}")
+            return None
+
+        cursor = None
+        try:
+            cursor = connection.cursor()
+            self._run(cursor, query, params)
             if fetch_one:
-                return cursor.fetchone()
+                result = cursor.fetchone()
             elif fetch_all:
-                return cursor.fetchall()
-            return None
+                result = cursor.fetchall()
+            else:
+                return None
         except Error as e:
             print(f"Error fetching data: {query}\nError: {e}")
+            if self.in_transaction():
+                raise
             return None
         finally:
             if cursor:
                 cursor.close()
+            pool.checkin(connection)
+
+        if use_cache and result is not None:
+            self.query_cache.put(cache_key, self._copy_rows(result), tables, generations)
+        return result
+
+    @staticmethod
+    def _copy_rows(result):
+        """Copies a fetchone()/fetchall() result so callers cannot modify a cached value."""
+        if isinstance(result, dict):
+            return dict(result)
+        return [dict(row) for row in result]
+
+    def fetch_iter(self, query, params=None, batch_size=1000, primary=False):
+        """
+        Streams the rows of a SELECT as dictionaries without materializing the result set.
+        Uses an unbuffered cursor (SSDictCursor on MySQL) on its own pooled connection,
+        fetching `batch_size` rows per network read, so memory stays constant however many
+        rows match. The connection stays checked out until the generator is exhausted or
+        closed; wrap early-exit loops in contextlib.closing(). Rows written by an enclosing
+        transaction() that has not committed yet are not visible to it.
+        Like fetch_data, reads from the read replica when one is configured.
+        Unlike fetch_data, a database error (also partway through the rows) is printed and raised,
+        so a truncated result is never mistaken for the end of the data.
+        :raises pymysql.Error: If no connection is available or the query fails.
+        """
+        try:
+            pool, connection = self._checkout_for_read(primary, shared=False)
+        except Error as e:
+            print(f"Error acquiring database connection: {e}")
+            raise
+
+        self.profiler.record(query)
+        cursor = None
+        db_time = 0.0 # Time spent in the database only, not in the consumer between batches
+        row_count = 0
+        error = False
+        try:
+            cursor = self.backend.streaming_cursor(connection)
+            started = time.perf_counter()
+            cursor.execute(query, params or ())
+            db_time += time.perf_counter() - started
+            while True:
+                started = time.perf_counter()
+                rows = cursor.fetchmany(batch_size)
+                db_time += time.perf_counter() - started
+                if not rows:
+                    break
+                row_count += len(rows)
+                for row in rows:
+                    yield row
+        except Error as e:
+            error = True
+            print(f"Error streaming data: {query}\nError: {e}")
+            raise
+        finally:
+            self.query_stats.record(query, db_time * 1000.0, row_count, error)
+            if cursor:
+                cursor.close() # Drains any unread rows so the connection can be reused
+            pool.checkin(connection)
 
 if __name__ == "__main__":
     db = DBManager()
     if db.connect():
         print("Test connection successful!")
-    db.disconnect()
\ No newline at end of file
+    print(f"Pool status: {db.pool.stats()}")
+    if db.replica_pool:
+        print(f"Replica pool status: {db.replica_pool.stats()}")
+    db.disconnect()
@@ -0,0 +1,138 @@
+# Admin_side/database/query_cache.py
+import re
+import threading
+import time
+from collections import OrderedDict
+
+_TABLES_READ = re.compile(r"\b(?:FROM|JOIN)\s+`?(\w+)`?", re.IGNORECASE)
+_TABLES_WRITTEN = re.compile(
+    r"\b(?:INSERT(?:\s+IGNORE)?(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?|"
+    r"ALTER\s+TABLE|DROP\s+TABLE(?:\s+IF\s+EXISTS)?|CREATE\s+TABLE(?:\s+IF\s+NOT\s+EXISTS)?)\s+`?(\w+)`?",
+    re.IGNORECASE
+)
+
+
+def tables_read(query):
+    """Returns the lower-cased names of the tables a SELECT reads (every FROM/JOIN target)."""
+    return frozenset(name.lower() for name in _TABLES_READ.findall(query))
+
+
+def tables_written(query):
+    """Returns the lower-cased names of the tables an INSERT/UPDATE/DELETE/DDL statement modifies."""
+    return frozenset(name.lower() for name in _TABLES_WRITTEN.findall(query))
+
+
+class QueryCache:
+    """
+    In-process LRU + TTL cache for SELECT results, used by DBManager.fetch_data(..., cache=True).
+
+    Entries are keyed on (SQL, params, fetch mode) and tagged with the tables they read.
+    DBManager calls invalidate_tables() after every committed write, dropping the entries
+    tagged with the written tables. A per-table generation counter stops a read that raced
+    with such a write from storing its (possibly stale) result.
+
+    Invalidation only sees writes made through this process; writes by other processes
+    (e.g. the admin app vs. the student API) become visible when the entry's TTL expires.
+    """
+    def __init__(self, enabled=True, max_entries=256, ttl_seconds=60):
+        """
+        :param enabled: If False, get() always misses and put() stores nothing.
+        :param max_entries: Maximum number of cached results; the least recently used is evicted first.
+        :param ttl_seconds: Seconds a cached result may be served before it is re-read.
+        """
+        self.enabled = enabled
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries = OrderedDict() # key -> (value, expires_at, tables)
+        self._keys_by_table = {} # table -> set of keys
+        self._generations = {} # table -> number of invalidations so far
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _remove(self, key):
+        """Drops one entry and its tag references. Caller must hold the lock."""
+        _, _, tables = self._entries.pop(key)
+        for table in tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+    def get(self, key):
+        """
+        Returns (True, value) for a live entry, (False, None) otherwise.
+        A hit moves the entry to the most recently used position.
+        """
+        if not self.enabled:
+            return False, None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            if entry[1] <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+
+    def generations(self, tables):
+        """Returns the current generation of each table, to be passed back to put()."""
+        with self._lock:
+            return tuple(self._generations.get(table, 0) for table in sorted(tables))
+
+    def put(self, key, value, tables, generations=None):
+        """
+        Stores a result tagged with `tables`.
+        :param generations: Value of generations(tables) taken before the query ran; if any of
+                            the tables was invalidated since, the result is not stored.
+        """
+        if not self.enabled:
+            return
+        tables = frozenset(tables)
+        with self._lock:
+            if generations is not None and generations != tuple(self._generations.get(table, 0) for table in sorted(tables)):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds, tables)
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_tables(self, tables):
+        """Drops every entry that read any of `tables`. Returns the number of entries dropped."""
+        dropped = 0
+        with self._lock:
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+                for key in list(self._keys_by_table.get(table, ())):
+                    self._remove(key)
+                    dropped += 1
+            self.invalidations += dropped
+        return dropped
+
+    def clear(self):
+        """Drops all entries."""
+        with self._lock:
+            for table in self._keys_by_table:
+                self._generations[table] = self._generations.get(table, 0) + 1
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def stats(self):
+        """Returns hit/miss counters and the current number of entries."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations
+            }
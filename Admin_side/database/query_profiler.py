@@ -0,0 +1,152 @@
+# Admin_side/database/query_profiler.py
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from database.query_stats import normalize_sql, find_call_stack
+
+
+class QueryProfiler:
+    """
+    Development/profiling aid that detects N+1 query patterns.
+
+    Queries executed by DBManager while a logical operation is active (an API request,
+    a UI action such as a button click, or an explicit `with db.operation(...)` block)
+    are grouped by normalized shape. When the operation ends, every shape executed at
+    least `repeat_threshold` times is reported together with its call count and the
+    stack it was first issued from, e.g.
+
+        N+1 suspected in CourseSetupPage.load_assignments_overview: 2 repeated query shape(s), 41 queries total
+          20x SELECT ... FROM course_faculty cf JOIN faculty f ... WHERE cf.course_code = ?
+              from views/course_setup_page.py:load_assignments_overview:<line>
+
+    Reports are printed and kept in a rolling in-memory log (see reports()).
+    Disabled by default; recording is a no-op outside an operation or when disabled.
+    """
+    def __init__(self, enabled=False, repeat_threshold=5, stack_depth=4, report_log_size=50):
+        """
+        :param enabled: Whether queries are collected at all.
+        :param repeat_threshold: Executions of one shape within one operation that count as N+1.
+        :param stack_depth: Number of application frames kept as the origin of a repeated shape.
+        :param report_log_size: Number of most recent reports kept in memory.
+        """
+        self.enabled = enabled
+        self.repeat_threshold = max(2, repeat_threshold)
+        self.stack_depth = stack_depth
+        self._local = threading.local() # Per-thread active operation
+        self._lock = threading.Lock()
+        self._reports = deque(maxlen=report_log_size)
+
+    def begin_operation(self, name):
+        """
+        Starts collecting queries for a logical operation on the calling thread.
+        Nested operations join the outermost one.
+        """
+        if not self.enabled:
+            return
+        current = getattr(self._local, 'operation', None)
+        if current is not None:
+            current["depth"] += 1
+            return
+        self._local.operation = {"name": name, "depth": 1, "total": 0, "shapes": {}}
+
+    def end_operation(self):
+        """
+        Ends the calling thread's operation and reports repeated query shapes.
+        :return: The report dict if an N+1 pattern was found, None otherwise.
+        """
+        current = getattr(self._local, 'operation', None)
+        if current is None:
+            return None
+        current["depth"] -= 1
+        if current["depth"] > 0:
+            return None
+        self._local.operation = None
+
+        repeated = [
+            {"query": shape, "calls": entry["calls"], "origin": entry["origin"]}
+            for shape, entry in current["shapes"].items()
+            if entry["calls"] >= self.repeat_threshold
+        ]
+        if not repeated:
+            return None
+        repeated.sort(key=lambda r: r["calls"], reverse=True)
+        report = {
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "operation": current["name"],
+            "total_queries": current["total"],
+            "repeated": repeated
+        }
+        with self._lock:
+            self._reports.append(report)
+        self._print_report(report)
+        return report
+
+    @contextmanager
+    def operation(self, name):
+        """Context manager wrapping begin_operation()/end_operation()."""
+        self.begin_operation(name)
+        try:
+            yield
+        finally:
+            self.end_operation()
+
+    def record(self, query):
+        """Counts one execution of `query` towards the calling thread's active operation, if any."""
+        current = getattr(self._local, 'operation', None) if self.enabled else None
+        if current is None:
+            return
+        current["total"] += 1
+        shape = normalize_sql(query)
+        entry = current["shapes"].get(shape)
+        if entry is None:
+            # Only the first execution pays for the stack walk; repeats come from the same place
+            current["shapes"][shape] = {"calls": 1, "origin": find_call_stack(self.stack_depth)}
+        else:
+            entry["calls"] += 1
+
+    def reports(self):
+        """Returns the most recent N+1 reports, oldest first."""
+        with self._lock:
+            return list(self._reports)
+
+    def reset(self):
+        """Clears the report log."""
+        with self._lock:
+            self._reports.clear()
+
+    @staticmethod
+    def _print_report(report):
+        print(f"N+1 suspected in {report['operation']}: {len(report['repeated'])} repeated query shape(s), "
+              f"{report['total_queries']} queries total")
+        for entry in report["repeated"]:
+            print(f"  {entry['calls']}x {entry['query']}")
+            for frame in entry["origin"]:
+                print(f"      from {frame}")
+
+
+def _callback_name(func):
+    """Returns a readable name for a Tk callback, looking through CustomTkinter's widget wrappers."""
+    widget_command = getattr(getattr(func, '__self__', None), '_command', None)
+    if callable(widget_command):
+        func = widget_command # CTkButton etc. bind an internal _clicked() that calls the user's command
+    return getattr(func, '__qualname__', None) or getattr(func, '__name__', None) or repr(func)
+
+
+def profile_tk_callbacks(profiler):
+    """
+    Treats every Tkinter callback (button commands, event bindings, after() jobs) as one
+    logical operation of `profiler`, so N+1 patterns in UI actions are reported per action.
+    Intended for development; only call it when the profiler is enabled.
+    """
+    import tkinter
+    if getattr(tkinter.CallWrapper, '_ces_profiled', False):
+        return
+    original_call = tkinter.CallWrapper.__call__
+
+    def profiled_call(self, *args):
+        with profiler.operation(_callback_name(self.func)):
+            return original_call(self, *args)
+
+    tkinter.CallWrapper.__call__ = profiled_call
+    tkinter.CallWrapper._ces_profiled = True
@@ -0,0 +1,227 @@
+# Admin_side/database/query_stats.py
+import itertools
+import os
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|%\([^)]+\)s")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"(\bVALUES\s*\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+_COMMENT = re.compile(r"--[^\n]*")
+
+_DATABASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_ADMIN_SIDE_DIR = os.path.dirname(_DATABASE_DIR)
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(query):
+    """
+    Reduces a SQL statement to its shape so that executions differing only in
+    literal values, placeholder counts or whitespace are grouped together.
+    e.g. "SELECT * FROM students WHERE student_id IN (%s, %s);" -> "SELECT * FROM students WHERE student_id IN (?)"
+    Memoized on the raw statement, since the same query strings are executed over and over.
+    """
+    shape = _COMMENT.sub(" ", query)
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _WHITESPACE.sub(" ", shape).strip().rstrip(";").strip()
+    shape = _IN_LIST.sub("IN (?)", shape)
+    shape = _VALUES_LIST.sub(r"\1", shape)
+    return shape
+
+
+def _application_frames(frame):
+    """
+    Yields (label, line) for each stack frame outside the database package, innermost first,
+    where label is "module.py:function" relative to Admin_side.
+    """
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if not filename.startswith(_DATABASE_DIR) and 'contextlib' not in filename:
+            if filename.startswith(_ADMIN_SIDE_DIR):
+                filename = os.path.relpath(filename, _ADMIN_SIDE_DIR)
+            else:
+                filename = os.path.basename(filename)
+            yield f"{filename.replace(os.sep, '/')}:{frame.f_code.co_name}", frame.f_lineno
+        frame = frame.f_back
+
+
+def find_caller():
+    """
+    Returns "module.py:function" for the innermost stack frame outside the database package,
+    i.e. the controller or view method that issued the query.
+    """
+    for label, _ in _application_frames(sys._getframe(1)):
+        return label
+    return "unknown"
+
+
+def find_call_stack(depth=4):
+    """
+    Returns up to `depth` "module.py:function:line" entries for the stack frames outside the
+    database package, innermost first (e.g. the controller method, then the view that called it).
+    """
+    stack = []
+    for label, line in _application_frames(sys._getframe(1)):
+        stack.append(f"{label}:{line}")
+        if len(stack) >= depth:
+            break
+    return stack
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+class QueryStats:
+    """
+    In-process registry of database timings used by DBManager.
+
+    Every executed statement is recorded under its normalized shape (see normalize_sql)
+    with call counts, row counts, error counts and total/max duration. Statements slower
+    than the configured threshold are additionally kept in a rolling slow-query log.
+
+    Per controller/view method totals are estimated from a sample, since finding the
+    caller walks the stack: one statement in caller_sample_every is attributed to its
+    caller and counted caller_sample_every times. Slow statements always carry their caller.
+    """
+    def __init__(self, enabled=True, slow_query_threshold_ms=200, slow_query_log_size=100, caller_sample_every=10):
+        self.enabled = enabled
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self.caller_sample_every = max(1, caller_sample_every)
+        self._sequence = itertools.count(1)
+        self._lock = threading.Lock()
+        self._by_shape = {}
+        self._by_caller = {}
+        self._slow_queries = deque(maxlen=slow_query_log_size)
+        self._started_at = time.time()
+
+    @staticmethod
+    def _new_entry():
+        return {"calls": 0, "errors": 0, "rows": 0, "total_ms": 0.0, "max_ms": 0.0}
+
+    @staticmethod
+    def _update_entry(entry, duration_ms, rows, error, weight=1):
+        entry["calls"] += weight
+        entry["rows"] += (rows or 0) * weight
+        entry["total_ms"] += duration_ms * weight
+        if duration_ms > entry["max_ms"]:
+            entry["max_ms"] = duration_ms
+        if error:
+            entry["errors"] += weight
+
+    def record(self, query, duration_ms, rows=0, error=False, caller=None):
+        """
+        Records one execution of `query`.
+        :param query: The SQL statement as passed to the cursor.
+        :param duration_ms: Wall time spent executing and fetching, in milliseconds.
+        :param rows: Rows returned or affected.
+        :param error: True if the statement raised a database error.
+        :param caller: "file:function" that issued the query; looked up from the stack if omitted,
+                       for sampled and slow statements only.
+        """
+        if not self.enabled:
+            return
+        shape = normalize_sql(query)
+        sampled = next(self._sequence) % self.caller_sample_every == 0
+        slow = self.slow_query_threshold_ms is not None and duration_ms >= self.slow_query_threshold_ms
+        if caller is None and (sampled or slow):
+            caller = find_caller()
+        with self._lock:
+            entry = self._by_shape.get(shape)
+            if entry is None:
+                entry = self._by_shape[shape] = self._new_entry()
+            self._update_entry(entry, duration_ms, rows, error)
+
+            if sampled:
+                caller_entry = self._by_caller.get(caller)
+                if caller_entry is None:
+                    caller_entry = self._by_caller[caller] = self._new_entry()
+                self._update_entry(caller_entry, duration_ms, rows, error, self.caller_sample_every)
+
+            if slow:
+                entry["slow"] = entry.get("slow", 0) + 1
+                self._slow_queries.append({
+                    "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "duration_ms": round(duration_ms, 2),
+                    "rows": rows or 0,
+                    "query": shape,
+                    "caller": caller
+                })
+
+    def reset(self):
+        """Clears all recorded statistics."""
+        with self._lock:
+            self._by_shape.clear()
+            self._by_caller.clear()
+            self._slow_queries.clear()
+            self._started_at = time.time()
+
+    @staticmethod
+    def _rows_sorted_by_time(entries, key_name):
+        rows = []
+        for key, entry in entries.items():
+            row = {key_name: key}
+            row.update(entry)
+            row["total_ms"] = round(entry["total_ms"], 2)
+            row["max_ms"] = round(entry["max_ms"], 2)
+            row["avg_ms"] = round(entry["total_ms"] / entry["calls"], 2) if entry["calls"] else 0.0
+            rows.append(row)
+        rows.sort(key=lambda r: r["total_ms"], reverse=True)
+        return rows
+
+    def snapshot(self):
+        """
+        Returns a JSON-serializable copy of the registry:
+        {"since", "slow_query_threshold_ms", "caller_sample_every", "queries": [...], "callers": [...], "slow_queries": [...]}
+        with queries and callers sorted by total time, most expensive first.
+        """
+        with self._lock:
+            return {
+                "since": datetime.fromtimestamp(self._started_at).strftime("%Y-%m-%d %H:%M:%S"),
+                "slow_query_threshold_ms": self.slow_query_threshold_ms,
+                "caller_sample_every": self.caller_sample_every,
+                "queries": self._rows_sorted_by_time(self._by_shape, "query"),
+                "callers": self._rows_sorted_by_time(self._by_caller, "caller"),
+                "slow_queries": list(self._slow_queries)
+            }
+
+    def to_prometheus(self, pool_stats=None):
+        """Renders the registry (and optional connection pool stats) in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, help_text, metric_type, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        queries = snapshot["queries"]
+        metric("ces_db_query_calls_total", "Executions per normalized query shape.", "counter",
+               [({"query": q["query"]}, q["calls"]) for q in queries])
+        metric("ces_db_query_seconds_total", "Total execution time per normalized query shape.", "counter",
+               [({"query": q["query"]}, round(q["total_ms"] / 1000.0, 6)) for q in queries])
+        metric("ces_db_query_rows_total", "Rows returned or affected per normalized query shape.", "counter",
+               [({"query": q["query"]}, q["rows"]) for q in queries])
+        metric("ces_db_query_errors_total", "Failed executions per normalized query shape.", "counter",
+               [({"query": q["query"]}, q["errors"]) for q in queries])
+        metric("ces_db_caller_seconds_total", "Estimated total database time per calling controller/view method (sampled).", "counter",
+               [({"caller": c["caller"]}, round(c["total_ms"] / 1000.0, 6)) for c in snapshot["callers"]])
+        metric("ces_db_slow_queries_total", "Executions slower than the slow-query threshold.", "counter",
+               [({"query": q["query"]}, q.get("slow", 0)) for q in queries if q.get("slow")])
+        if pool_stats:
+            metric("ces_db_pool_connections", "Connections in the database pool by state.", "gauge",
+                   [({"state": state}, pool_stats[state]) for state in ("open", "idle", "in_use")])
+            metric("ces_db_pool_max_size", "Configured maximum pool size.", "gauge", [({}, pool_stats["max_size"])])
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,484 @@
+# Admin_side/database/sqlite_backend.py
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from pymysql import err as mysql_errors
+from database.connection_pool import ConnectionPool
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# --- Type adaptation (PyMySQL returns date/datetime/Decimal objects, so SQLite should too) ---
+
+def _convert_date(value):
+    text = value.decode()
+    try:
+        return date.fromisoformat(text[:10])
+    except ValueError:
+        return text
+
+def _convert_datetime(value):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+def _convert_decimal(value):
+    try:
+        return Decimal(value.decode())
+    except ArithmeticError:
+        return None
+
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("DATETIME", _convert_datetime)
+sqlite3.register_converter("TIMESTAMP", _convert_datetime)
+sqlite3.register_converter("DECIMAL", _convert_decimal)
+
+# sqlite3 errors are re-raised as their PyMySQL counterparts so that the `except Error`
+# handlers in DBManager and the controllers work unchanged on either backend.
+_ERROR_MAP = (
+    (sqlite3.IntegrityError, mysql_errors.IntegrityError),
+    (sqlite3.OperationalError, mysql_errors.OperationalError),
+    (sqlite3.ProgrammingError, mysql_errors.ProgrammingError),
+    (sqlite3.DataError, mysql_errors.DataError),
+    (sqlite3.NotSupportedError, mysql_errors.NotSupportedError),
+    (sqlite3.Error, mysql_errors.DatabaseError),
+)
+
+def _translate_error(error):
+    for sqlite_class, mysql_class in _ERROR_MAP:
+        if isinstance(error, sqlite_class):
+            return mysql_class(str(error))
+    return mysql_errors.DatabaseError(str(error))
+
+# --- Query adaptation ---
+
+_QUERY_TOKEN = re.compile(r"'(?:[^']|'')*'|%\((\w+)\)s|%s|%%|#[^\n]*")
+_INSERT_IGNORE = re.compile(r"\bINSERT\s+IGNORE\b", re.IGNORECASE)
+_ON_DUPLICATE_KEY = re.compile(r"\bON\s+DUPLICATE\s+KEY\s+UPDATE\b(.*)$", re.IGNORECASE | re.DOTALL)
+_VALUES_FUNCTION = re.compile(r"\bVALUES\s*\(\s*(\w+)\s*\)", re.IGNORECASE)
+_LOCKING_READ = re.compile(r"\s+(?:FOR\s+UPDATE|FOR\s+SHARE|LOCK\s+IN\s+SHARE\s+MODE)\b", re.IGNORECASE)
+
+def _replace_query_token(match):
+    token = match.group(0)
+    if token == "%s":
+        return "?"
+    if token == "%%":
+        return "%"
+    if match.group(1):
+        return f":{match.group(1)}"
+    if token.startswith("#"):
+        return "" # MySQL end-of-line comment, not understood by SQLite
+    return token # String literal, left untouched
+
+@lru_cache(maxsize=512)
+def adapt_query(query):
+    """
+    Rewrites a MySQL/PyMySQL-style statement for sqlite3:
+    %s -> ?, %(name)s -> :name, %% -> %, INSERT IGNORE -> INSERT OR IGNORE, # comments dropped,
+    ON DUPLICATE KEY UPDATE c = VALUES(c) -> ON CONFLICT DO UPDATE SET c = excluded.c, and
+    row-locking clauses dropped (a SQLite write transaction already locks the whole database).
+    MySQL functions used by the controllers (CURDATE, NOW, CONCAT) are registered on each connection.
+    """
+    query = _QUERY_TOKEN.sub(_replace_query_token, query)
+    query = _ON_DUPLICATE_KEY.sub(
+        lambda match: "ON CONFLICT DO UPDATE SET" + _VALUES_FUNCTION.sub(r"excluded.\1", match.group(1)), query
+    )
+    query = _LOCKING_READ.sub("", query)
+    return _INSERT_IGNORE.sub("INSERT OR IGNORE", query)
+
+def _concat(*values):
+    return None if any(value is None for value in values) else "".join(str(value) for value in values)
+
+# --- Schema translation ---
+
+_STATEMENT_TOKEN = re.compile(r"'(?:[^'\\]|\\.|'')*'|--[^\n]*|;", re.DOTALL)
+_AUTO_INCREMENT_PK = re.compile(r"\b(?:BIG|SMALL|TINY|MEDIUM)?INT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.IGNORECASE)
+_ENUM_COLUMN = re.compile(r"^(\s*)(\w+)\s+ENUM\s*\(([^)]*)\)", re.IGNORECASE | re.MULTILINE)
+_ON_UPDATE = re.compile(r"\s+ON\s+UPDATE\s+CURRENT_TIMESTAMP\b", re.IGNORECASE)
+_JSON_TYPE = re.compile(r"\bJSON\b")
+_CREATE_TABLE = re.compile(r"^\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", re.IGNORECASE)
+_SKIPPED_STATEMENT = re.compile(
+    r"^\s*(?:CREATE\s+DATABASE|USE|DESCRIBE|SHOW|ALTER\s+TABLE\s+\w+\s+MODIFY|PREPARE|EXECUTE|DEALLOCATE)\b", re.IGNORECASE
+)
+# SET @ddl = IF(<index missing>, 'CREATE INDEX ...', 'DO 0'), the re-runnable index guard of the MySQL scripts
+_GUARDED_CREATE_INDEX = re.compile(r"^\s*SET\s+@\w+\s*=.*'CREATE\s+(UNIQUE\s+)?INDEX\s+([^']*)'", re.IGNORECASE | re.DOTALL)
+
+# Columns the application writes that are missing from DatabaseSkeleon.txt, applied after each schema file
+# that leaves the table without them (so later files, e.g. pending_evaluations.sql, can index them).
+SCHEMA_PATCHES = [
+    ("evaluation_templates", "session", "ALTER TABLE evaluation_templates ADD COLUMN session VARCHAR(20) DEFAULT NULL"),
+]
+
+def split_sql_script(script):
+    """Splits a SQL script into statements, ignoring `--` comments and semicolons inside string literals."""
+    statements = []
+    current = []
+    position = 0
+    for match in _STATEMENT_TOKEN.finditer(script):
+        current.append(script[position:match.start()])
+        token = match.group(0)
+        if token == ";":
+            statement = "".join(current).strip()
+            if statement:
+                statements.append(statement)
+            current = []
+        elif not token.startswith("--"):
+            current.append(token)
+        position = match.end()
+    current.append(script[position:])
+    statement = "".join(current).strip()
+    if statement:
+        statements.append(statement)
+    return statements
+
+def translate_mysql_schema(script):
+    """
+    Translates a MySQL DDL/seed script (such as DatabaseSkeleon.txt) into SQLite statements.
+    AUTO_INCREMENT keys become INTEGER PRIMARY KEY AUTOINCREMENT, ENUM columns become TEXT with a
+    CHECK constraint, JSON becomes TEXT and `ON UPDATE CURRENT_TIMESTAMP` is emulated with a trigger.
+    Index guards (SET @ddl = IF(..., 'CREATE INDEX ...', 'DO 0') run with PREPARE/EXECUTE) become
+    CREATE INDEX IF NOT EXISTS. Statements without a SQLite equivalent (CREATE DATABASE, USE, DESCRIBE,
+    ALTER ... MODIFY) are dropped.
+    :return: List of SQLite statements.
+    """
+    statements = []
+    for statement in split_sql_script(script):
+        if _SKIPPED_STATEMENT.match(statement):
+            continue
+        guarded_index = _GUARDED_CREATE_INDEX.match(statement)
+        if guarded_index:
+            statements.append(f"CREATE {guarded_index.group(1) or ''}INDEX IF NOT EXISTS {guarded_index.group(2)}")
+            continue
+        table = _CREATE_TABLE.match(statement)
+        if table is None:
+            statements.append(adapt_query(statement))
+            continue
+        table_name = table.group(1)
+        statement = _CREATE_TABLE.sub(f"CREATE TABLE IF NOT EXISTS {table_name}", statement, count=1)
+        statement = _AUTO_INCREMENT_PK.sub("INTEGER PRIMARY KEY AUTOINCREMENT", statement)
+        statement = _ENUM_COLUMN.sub(r"\1\2 TEXT CHECK (\2 IN (\3))", statement)
+        statement = _JSON_TYPE.sub("TEXT", statement)
+        has_on_update = _ON_UPDATE.search(statement) is not None
+        statement = _ON_UPDATE.sub("", statement)
+        statements.append(statement)
+        if has_on_update:
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS {table_name}_updated_at AFTER UPDATE ON {table_name} "
+                f"FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at "
+                f"BEGIN UPDATE {table_name} SET updated_at = CURRENT_TIMESTAMP WHERE rowid = NEW.rowid; END"
+            )
+    return statements
+
+# --- DB-API wrappers mirroring the parts of PyMySQL that DBManager uses ---
+
+class SQLiteCursor:
+    """Wraps a sqlite3 cursor: adapts MySQL-style queries and raises PyMySQL exceptions."""
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        try:
+            self._cursor.execute(adapt_query(query), params if params is not None else ())
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        return self.rowcount
+
+    def executemany(self, query, params_seq):
+        try:
+            self._cursor.executemany(adapt_query(query), params_seq)
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+        return self.rowcount
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def fetchone(self):
+        try:
+            return self._cursor.fetchone()
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def fetchmany(self, size=None):
+        try:
+            return self._cursor.fetchmany(size or self._cursor.arraysize)
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def fetchall(self):
+        try:
+            return self._cursor.fetchall()
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def close(self):
+        self._cursor.close()
+
+
+def _dict_row_factory(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteConnection:
+    """
+    A sqlite3 connection in autocommit mode exposing PyMySQL's connection API
+    (cursor, begin, commit, rollback, ping, open, close), returning rows as dictionaries.
+    """
+    def __init__(self, database, timeout=5, uri=False):
+        self._connection = sqlite3.connect(
+            database, timeout=timeout, uri=uri, isolation_level=None,
+            detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False # The pool guarantees one thread at a time
+        )
+        self._connection.row_factory = _dict_row_factory
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.create_function("CURDATE", 0, lambda: date.today().isoformat())
+        self._connection.create_function("NOW", 0, lambda: datetime.now().isoformat(" ", "seconds"))
+        self._connection.create_function("CONCAT", -1, _concat)
+        self.open = True
+
+    def cursor(self, cursorclass=None):
+        # sqlite3 cursors already step through results lazily, so no separate unbuffered cursor is needed
+        return SQLiteCursor(self._connection.cursor())
+
+    def begin(self):
+        try:
+            self._connection.execute("BEGIN")
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def commit(self):
+        try:
+            self._connection.commit()
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def rollback(self):
+        try:
+            self._connection.rollback()
+        except sqlite3.Error as e:
+            raise _translate_error(e) from e
+
+    def ping(self, reconnect=True):
+        if not self.open:
+            raise mysql_errors.InterfaceError("Connection is closed.")
+
+    def close(self):
+        self.open = False
+        self._connection.close()
+
+
+class SQLiteConnectionPool(ConnectionPool):
+    """ConnectionPool handing out SQLiteConnection objects instead of PyMySQL connections."""
+    def __init__(self, backend, **pool_config):
+        super().__init__({}, **pool_config)
+        self.backend = backend
+
+    def _create_connection(self):
+        return self.backend.open_connection()
+
+
+class AsyncSQLiteCursor:
+    """aiomysql-style awaitable cursor running a SQLiteCursor's calls in a worker thread."""
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    async def execute(self, query, params=()):
+        return await asyncio.to_thread(self._cursor.execute, query, params)
+
+    async def executemany(self, query, params_seq):
+        return await asyncio.to_thread(self._cursor.executemany, query, params_seq)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    async def fetchone(self):
+        return await asyncio.to_thread(self._cursor.fetchone)
+
+    async def fetchmany(self, size=None):
+        return await asyncio.to_thread(self._cursor.fetchmany, size)
+
+    async def fetchall(self):
+        return await asyncio.to_thread(self._cursor.fetchall)
+
+    async def close(self):
+        self._cursor.close()
+
+
+class AsyncSQLiteConnection:
+    """aiomysql-style awaitable wrapper around a SQLiteConnection."""
+    def __init__(self, connection):
+        self.connection = connection
+
+    async def cursor(self):
+        return AsyncSQLiteCursor(self.connection.cursor())
+
+    async def begin(self):
+        await asyncio.to_thread(self.connection.begin)
+
+    async def commit(self):
+        await asyncio.to_thread(self.connection.commit)
+
+    async def rollback(self):
+        await asyncio.to_thread(self.connection.rollback)
+
+
+class AsyncSQLitePool:
+    """
+    aiomysql-style pool (acquire, release, close, wait_closed, size/freesize/maxsize) over a
+    SQLiteConnectionPool, for running AsyncDBManager on the SQLite backend.
+    """
+    def __init__(self, pool):
+        self._pool = pool
+        self._wrappers = {} # id(SQLiteConnection) -> AsyncSQLiteConnection
+        # Waiting for a free slot happens on the event loop; a worker thread blocked in
+        # checkout() would starve the threads the queries themselves need.
+        self._slots = asyncio.Semaphore(pool.max_size)
+
+    async def acquire(self):
+        await self._slots.acquire()
+        try:
+            # A slot is held, so this never waits; opening a SQLite connection is cheap enough to do inline
+            connection = self._pool.checkout(False)
+        except BaseException:
+            self._slots.release()
+            raise
+        wrapper = self._wrappers.get(id(connection))
+        if wrapper is None or wrapper.connection is not connection:
+            wrapper = self._wrappers[id(connection)] = AsyncSQLiteConnection(connection)
+        return wrapper
+
+    def release(self, wrapper):
+        self._pool.checkin(wrapper.connection)
+        self._slots.release()
+
+    def close(self):
+        self._pool.close_all()
+        self._wrappers.clear()
+
+    async def wait_closed(self):
+        pass
+
+    @property
+    def maxsize(self):
+        return self._pool.max_size
+
+    @property
+    def size(self):
+        return self._pool.stats()["open"]
+
+    @property
+    def freesize(self):
+        return self._pool.stats()["idle"]
+
+
+class SQLiteBackend:
+    """
+    Runs DBManager against a SQLite database file (see config.SQLITE_CONFIG), so the controllers and the
+    student API can be exercised and benchmarked without a MySQL server. A new database is created from
+    the MySQL schema files, translated with translate_mysql_schema(), including their seed data.
+    """
+    name = "sqlite"
+    display_name = "SQLite"
+
+    def __init__(self, path="ces_local.db", timeout=5, schema_files=None):
+        """
+        :param path: Database file, relative to the project root, or ":memory:" for a private in-memory database.
+        :param timeout: Seconds to wait for a lock held by another connection.
+        :param schema_files: MySQL scripts (relative to the project root) loaded into a new, empty database.
+        """
+        self.timeout = timeout
+        self.schema_files = schema_files or []
+        if path == ":memory:":
+            # Connections share one in-memory database, kept alive by a connection held by the backend.
+            # Shared-cache databases lock whole tables, so use a file for multi-threaded load tests.
+            self.database = f"file:ces_memory_{id(self)}?mode=memory&cache=shared"
+            self.uri = True
+        else:
+            self.database = path if os.path.isabs(path) else os.path.join(_PROJECT_ROOT, path)
+            self.uri = False
+        self._keeper = None
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def open_connection(self):
+        """Opens a connection, creating and seeding the schema on first use."""
+        connection = SQLiteConnection(self.database, self.timeout, self.uri)
+        if not self._initialized:
+            with self._init_lock:
+                if not self._initialized:
+                    if self.uri:
+                        self._keeper = SQLiteConnection(self.database, self.timeout, self.uri)
+                    else:
+                        connection.cursor().execute("PRAGMA journal_mode = WAL") # Readers do not block the writer
+                    self.initialize_schema(connection)
+                    self._initialized = True
+        return connection
+
+    def initialize_schema(self, connection):
+        """Loads the schema files into the database if it has no tables yet. Returns True if it did."""
+        cursor = connection.cursor()
+        cursor.execute("SELECT COUNT(*) AS table_count FROM sqlite_master WHERE type = 'table'")
+        if cursor.fetchone()["table_count"] > 0:
+            return False
+        connection.begin()
+        try:
+            for schema_file in self.schema_files:
+                schema_path = schema_file if os.path.isabs(schema_file) else os.path.join(_PROJECT_ROOT, schema_file)
+                with open(schema_path, encoding="utf-8") as f:
+                    for statement in translate_mysql_schema(f.read()):
+                        cursor.execute(statement)
+                for table, column, statement in SCHEMA_PATCHES:
+                    cursor.execute(f"PRAGMA table_info({table})")
+                    columns = [row["name"] for row in cursor.fetchall()]
+                    if columns and column not in columns:
+                        cursor.execute(statement)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+        print(f"Initialized SQLite database at {self.database} from {', '.join(self.schema_files)}")
+        return True
+
+    def create_pool(self, **pool_config):
+        return SQLiteConnectionPool(self, **pool_config)
+
+    def create_replica_pool(self, **pool_config):
+        return None # A single SQLite file has no replicas
+
+    async def create_async_pool(self, min_size=1, max_size=20, pool_recycle=300):
+        # Every async connection is a regular pooled SQLite connection driven from worker threads
+        pool = SQLiteConnectionPool(self, max_size=max_size, min_size=min_size, idle_timeout=pool_recycle)
+        return AsyncSQLitePool(pool)
+
+    def streaming_cursor(self, connection):
+        return connection.cursor()
+
+
+if __name__ == "__main__":
+    # Prints the SQLite translation of the configured schema files.
+    from config import SQLITE_CONFIG
+    for schema_file in SQLITE_CONFIG.get('schema_files', []):
+        with open(os.path.join(_PROJECT_ROOT, schema_file), encoding="utf-8") as f:
+            for statement in translate_mysql_schema(f.read()):
+                print(statement + ";\n")
@@ -5,7 +5,8 @@ from tkinter import messagebox
 from views.login_page import LoginPage
 from views.dashboard_page import DashboardPage
 from database.db_manager import DBManager
-from config import APP_NAME
+from database.query_profiler import profile_tk_callbacks
+from config import APP_NAME, QUERY_PROFILER_CONFIG
 from datetime import datetime, timedelta
 from controllers.app_settings_controller import AppSettingsController
 
@@ -47,6 +48,8 @@ class CourseEvaluationApp(ctk.CTk):
         self.container.grid_columnconfigure(0, weight=1)
 
         self.db_manager = DBManager()
+        if QUERY_PROFILER_CONFIG.get('enabled'):
+            profile_tk_callbacks(self.db_manager.profiler) # Report N+1 query patterns per UI action
         self.current_user = None
         self.app_settings_controller = AppSettingsController()
 
@@ -0,0 +1,171 @@
+# Admin_side/reports.py
+"""
+Headless batch report generation, e.g. for a nightly cron job on the server:
+
+    python -m Admin_side.reports build --out reports/ [--term 2024-25] [--workers 4]
+
+(or `python -m reports build ...` from the Admin_side directory). Writes the overall report and
+one report per course, faculty member and template into --out, each as report.json, summary.csv
+and charts/*.png, plus an index.json. Reports are built in parallel worker processes, and
+nothing here imports tkinter.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Get the path to the 'Admin_side' directory to set up module imports
+admin_side_dir = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, admin_side_dir)
+
+from database.db_manager import DBManager
+from controllers.chart_renderer import ChartRenderer
+from controllers.report_controller import ReportController
+
+REPORT_KINDS = ('all', 'course', 'faculty', 'template')
+
+report_controller = None # Per worker process, set by _init_worker()
+report_aggregation = None
+
+
+def _slug(value):
+    """File-system safe directory name for a course code, faculty or template."""
+    return re.sub(r'[^A-Za-z0-9._-]+', '_', str(value)).strip('_') or 'report'
+
+
+def list_report_jobs(controller, kinds, term=None):
+    """
+    Returns the reports to build as (kind, key, title, filters) tuples: the overall report and
+    one per course and template with evaluations (in `term`), and one per faculty member.
+    """
+    term_filter = " AND et.session = %s" if term else ""
+    params = (term,) if term else None
+    jobs = []
+    if 'all' in kinds:
+        jobs.append(('all', 'all', "All evaluations", {}))
+    if 'course' in kinds:
+        courses = controller.db.fetch_data(f"""
+        SELECT DISTINCT e.course_code
+        FROM evaluations e
+        JOIN evaluation_templates et ON e.template_id = et.id
+        WHERE e.course_code IS NOT NULL{term_filter}
+        ORDER BY e.course_code
+        """, params, fetch_all=True) or []
+        jobs.extend(('course', row['course_code'], f"Course {row['course_code']}", {'course_code': row['course_code']}) for row in courses)
+    if 'faculty' in kinds:
+        faculty = {}
+        for course_faculty in controller.get_course_faculty_map().values():
+            faculty.update(course_faculty)
+        jobs.extend(
+            ('faculty', faculty_id, f"Faculty {name}", {'faculty_id': faculty_id})
+            for faculty_id, name in sorted(faculty.items(), key=lambda item: (item[1], item[0]))
+        )
+    if 'template' in kinds:
+        templates = controller.db.fetch_data(f"""
+        SELECT DISTINCT et.id, et.title
+        FROM evaluation_templates et
+        JOIN evaluations e ON e.template_id = et.id
+        WHERE 1=1{term_filter}
+        ORDER BY et.id
+        """, params, fetch_all=True) or []
+        jobs.extend(('template', row['id'], f"Template {row['id']}: {row['title']}", {'template_id': row['id']}) for row in templates)
+    return jobs
+
+
+def _init_worker(aggregation):
+    """Connects the worker process to the database; charts are rendered in the worker itself."""
+    global report_controller, report_aggregation
+    if not DBManager().connect():
+        raise RuntimeError("Could not connect to the database.")
+    report_controller = ReportController()
+    report_controller.chart_renderer = ChartRenderer(max_workers=0)
+    report_aggregation = aggregation
+
+
+def build_report(job, out_dir, term=None):
+    """
+    Builds one report (in a worker process) and writes it under out_dir/<kind>/<key>/.
+    :return: An index entry {kind, key, title, total_submissions, path}; path is None for empty reports.
+    """
+    kind, key, title, filters = job
+    report_result = report_controller.get_aggregated_evaluation_report(
+        aggregation=report_aggregation, session=term, **filters
+    )
+    if report_result.get('error'):
+        raise RuntimeError(report_result['error'])
+    entry = {"kind": kind, "key": key, "title": title, "total_submissions": report_result['total_submissions'], "path": None}
+    if report_result['total_submissions'] == 0:
+        return entry
+
+    report_dir = os.path.join(out_dir, kind, _slug(key))
+    os.makedirs(report_dir, exist_ok=True)
+    with open(os.path.join(report_dir, "report.json"), 'w', encoding='utf-8') as report_file:
+        json.dump({"title": title, "term": term, "filters": filters, **report_result}, report_file, indent=2, default=str)
+    report_controller.report_summary_frame(report_result['report_data']).to_csv(
+        os.path.join(report_dir, "summary.csv"), index=False, encoding='utf-8'
+    )
+    report_controller.generate_question_graphs(report_result['report_data'], os.path.join(report_dir, "charts"))
+    entry['path'] = os.path.relpath(report_dir, out_dir)
+    return entry
+
+
+def build(out_dir, term=None, kinds=REPORT_KINDS, workers=None, aggregation=None):
+    """
+    Builds all reports into out_dir with a pool of worker processes.
+    :return: True if every report was built, False otherwise.
+    """
+    db_manager = DBManager()
+    if not db_manager.connect():
+        return False
+    jobs = list_report_jobs(ReportController(), kinds, term)
+    db_manager.disconnect() # Workers open their own connections
+    os.makedirs(out_dir, exist_ok=True)
+    print(f"Building {len(jobs)} report(s) into {out_dir}" + (f" for term {term}" if term else ""))
+
+    index = []
+    failures = 0
+    # 'spawn' so workers never share the parent's database connections
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(aggregation,)) as pool:
+        futures = {pool.submit(build_report, job, out_dir, term): job for job in jobs}
+        for future in as_completed(futures):
+            kind, key, title, _ = futures[future]
+            try:
+                entry = future.result()
+            except Exception as e:
+                print(f"Error building report '{title}': {e}")
+                failures += 1
+                continue
+            index.append(entry)
+            print(f"{title}: {entry['total_submissions']} submission(s)")
+
+    index.sort(key=lambda entry: (REPORT_KINDS.index(entry['kind']), str(entry['key'])))
+    with open(os.path.join(out_dir, "index.json"), 'w', encoding='utf-8') as index_file:
+        json.dump({"term": term, "reports": index}, index_file, indent=2, default=str)
+    print(f"Built {len(index)} report(s), {failures} failed.")
+    return failures == 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate evaluation reports without the admin GUI.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build_parser = subparsers.add_parser("build", help="Build every course, faculty and template report.")
+    build_parser.add_argument("--out", required=True, help="Output directory.")
+    build_parser.add_argument("--term", help="Only evaluations of templates in this session.")
+    build_parser.add_argument("--kind", action="append", choices=REPORT_KINDS, dest="kinds",
+                              help="Report kind to build (repeatable; default: all kinds).")
+    build_parser.add_argument("--workers", type=int, help="Number of worker processes (default: one per CPU).")
+    build_parser.add_argument("--aggregation", choices=('stats', 'sql', 'python', 'pandas'),
+                              help="Report engine (default: REPORT_CONFIG['aggregation']).")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        return 0 if build(args.out, args.term, tuple(args.kinds or REPORT_KINDS), args.workers, args.aggregation) else 1
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -325,10 +325,15 @@ class CourseSetupPage(ctk.CTkFrame):
         if not selected:
             messagebox.showwarning("No Selection", "Please select faculty to assign.")
             return
-        for item in selected:
-            values = self.available_faculty_tree.item(item)['values']
-            faculty_id = values[0]
-            self.course_controller.assign_faculty_to_course(selected_course_code, faculty_id)
+        try:
+            # One multi-row INSERT for the whole selection instead of a check + insert per faculty member
+            faculty_ids = [self.available_faculty_tree.item(item)['values'][0] for item in selected]
+            if self.course_controller.assign_faculty_members_to_course(selected_course_code, faculty_ids) is False:
+                raise Exception("Database error while assigning faculty.")
+        except Exception as e:
+            self._refresh_faculty_lists(selected_course_code)
+            messagebox.showerror("Error", f"Failed to assign faculty. No changes were saved.\n{e}")
+            return
         self._refresh_faculty_lists(selected_course_code)
         messagebox.showinfo("Success", "Faculty assigned successfully.")
 
@@ -341,10 +346,14 @@ class CourseSetupPage(ctk.CTkFrame):
         if not selected:
             messagebox.showwarning("No Selection", "Please select faculty to unassign.")
             return
-        for item in selected:
-            values = self.assigned_faculty_tree.item(item)['values']
-            faculty_id = values[0]
-            self.course_controller.unassign_faculty_from_course(selected_course_code, faculty_id)
+        try:
+            faculty_ids = [self.assigned_faculty_tree.item(item)['values'][0] for item in selected]
+            if self.course_controller.unassign_faculty_members_from_course(selected_course_code, faculty_ids) is False:
+                raise Exception("Database error while unassigning faculty.")
+        except Exception as e:
+            self._refresh_faculty_lists(selected_course_code)
+            messagebox.showerror("Error", f"Failed to unassign faculty. No changes were saved.\n{e}")
+            return
         self._refresh_faculty_lists(selected_course_code)
         messagebox.showinfo("Success", "Faculty unassigned successfully.")
 
@@ -539,12 +548,16 @@ class CourseSetupPage(ctk.CTkFrame):
         if not selected:
             messagebox.showwarning("No Selection", "Please select students or batches to assign.")
             return
-        for item in selected:
-            values = self.available_students_tree.item(item)['values']
-            if values[0] == "Student":
-                self.course_controller.assign_student_to_course(selected_course_code, values[1])
-            elif values[0] == "Batch":
-                self.course_controller.assign_batch_to_course(selected_course_code, values[1])
+        try:
+            student_ids, batches = self._split_student_batch_selection(self.available_students_tree, selected)
+            # Students and batches are inserted with one statement each and committed together
+            with self.course_controller.db.transaction():
+                self.course_controller.assign_students_to_course(selected_course_code, student_ids)
+                self.course_controller.assign_batches_to_course(selected_course_code, batches)
+        except Exception as e:
+            self._refresh_student_lists(selected_course_code)
+            messagebox.showerror("Error", f"Assignment failed. No changes were saved.\n{e}")
+            return
         self._refresh_student_lists(selected_course_code)
         messagebox.showinfo("Success", "Assignment successful.")
 
@@ -557,14 +570,31 @@ class CourseSetupPage(ctk.CTkFrame):
         if not selected:
             messagebox.showwarning("No Selection", "Please select students or batches to unassign.")
             return
+        try:
+            student_ids, batches = self._split_student_batch_selection(self.assigned_students_tree, selected)
+            with self.course_controller.db.transaction():
+                if self.course_controller.unassign_students_from_course(selected_course_code, student_ids) is False:
+                    raise Exception("Database error while unassigning students.")
+                if self.course_controller.unassign_batches_from_course(selected_course_code, batches) is False:
+                    raise Exception("Database error while unassigning batches.")
+        except Exception as e:
+            self._refresh_student_lists(selected_course_code)
+            messagebox.showerror("Error", f"Unassignment failed. No changes were saved.\n{e}")
+            return
+        self._refresh_student_lists(selected_course_code)
+        messagebox.showinfo("Success", "Unassignment successful.")
+
+    def _split_student_batch_selection(self, tree, selected):
+        """Splits selected rows of a students/batches tree into (student_ids, batches)."""
+        student_ids = []
+        batches = []
         for item in selected:
-            values = self.assigned_students_tree.item(item)['values']
+            values = tree.item(item)['values']
             if values[0] == "Student":
-                self.course_controller.unassign_student_from_course(selected_course_code, values[1])
+                student_ids.append(values[1])
             elif values[0] == "Batch":
-                self.course_controller.unassign_batch_from_course(selected_course_code, values[1])
-        self._refresh_student_lists(selected_course_code)
-        messagebox.showinfo("Success", "Unassignment successful.")
+                batches.append(values[1])
+        return student_ids, batches
 
     # --- Assignments Overview Tab ---
     def _create_assignments_overview_tab(self):
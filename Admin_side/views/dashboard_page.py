@@ -17,6 +17,7 @@ from views.reports_page import ReportsPage
 from views.complaints_page import ComplaintsPage
 from views.faculty_requests_page import FacultyRequestsPage
 from views.app_settings_page import AppSettingsPage
+from views.db_metrics_page import DbMetricsPage
 from datetime import datetime, date, timedelta
 import calendar
 from tkcalendar import Calendar # Required for the "Add Meeting" date picker (tkcalendar is not ctk)
@@ -97,6 +98,7 @@ class DashboardPage(ctk.CTkFrame):
             ("Complaints", self.show_complaints),
             ("Faculty Requests", self.show_faculty_requests),
             ("Application Settings", self.show_app_settings),
+            ("Database Metrics", self.show_db_metrics),
         ]
         
         self.nav_buttons = []
@@ -173,6 +175,7 @@ class DashboardPage(ctk.CTkFrame):
         self.sub_pages["ComplaintsPage"] = ComplaintsPage(parent=self.content_frame, controller=self.parent_controller)
         self.sub_pages["FacultyRequestsPage"] = FacultyRequestsPage(parent=self.content_frame, controller=self.parent_controller)
         self.sub_pages["AppSettingsPage"] = AppSettingsPage(parent=self.content_frame, controller=self.parent_controller)
+        self.sub_pages["DbMetricsPage"] = DbMetricsPage(parent=self.content_frame, controller=self.parent_controller)
         # Eagerly create home content
         self.sub_pages["HomeContent"] = self._create_home_content()
 
@@ -227,6 +230,8 @@ class DashboardPage(ctk.CTkFrame):
                 btn.configure(state="normal" if self.admin_user.can_view_reports else "disabled")
             elif "Complaints" in text or "Faculty Requests" in text:
                 btn.configure(state="normal" if self.admin_user.can_manage_complaints else "disabled")
+            elif "Database Metrics" in text:
+                btn.configure(state="normal" if self.admin_user.can_manage_users else "disabled")
             elif "Application settings" in text or "Home" in text:
                 btn.configure(state="normal")
         # No .pack_forget() or .pack() on tab frames here
@@ -650,6 +655,16 @@ class DashboardPage(ctk.CTkFrame):
         """
         self.show_sub_page(self.sub_pages["AppSettingsPage"])
 
+    def show_db_metrics(self):
+        """
+        Displays the Database Metrics page if the admin has permission.
+        """
+        if self.admin_user and self.admin_user.can_manage_users:
+            self.sub_pages["DbMetricsPage"].load_metrics()
+            self.show_sub_page(self.sub_pages["DbMetricsPage"])
+        else:
+            messagebox.showwarning("Permission Denied", "You do not have permission to view database metrics.")
+
     def handle_logout(self):
         """
         Handles the logout process from the dashboard.
@@ -0,0 +1,136 @@
+# views/db_metrics_page.py
+import customtkinter as ctk
+from tkinter import messagebox
+from tkinter import ttk
+from database.db_manager import DBManager
+
+BLUE = "#1976d2"
+DARK_BLUE = "#1565c0"
+LIGHT_BLUE = "#e3f2fd"
+GREY = "#f5f6fa"
+WHITE = "#ffffff"
+CARD_BORDER = "#b0bec5"
+RED = "#e74c3c"
+
+class DbMetricsPage(ctk.CTkFrame):
+    """
+    A Tkinter frame showing where the application spends its database time:
+    the most expensive query shapes, the controller/view methods issuing them,
+    the slow-query log, N+1 patterns found by the query profiler (when enabled
+    in config.QUERY_PROFILER_CONFIG) and the current connection pool usage.
+    """
+    def __init__(self, parent, controller):
+        super().__init__(parent)
+        self.parent_controller = controller # Reference to the main application controller
+        self.db = DBManager()
+        self.configure(fg_color=GREY)
+        self.create_widgets()
+        self.load_metrics()
+
+    def _create_table(self, parent, columns, widths, height):
+        """
+        Creates a Treeview with a vertical scrollbar inside `parent`.
+        :param columns: Column headings.
+        :param widths: Column widths, in the same order as `columns`.
+        :return: The Treeview widget.
+        """
+        table_frame = ctk.CTkFrame(parent, fg_color=WHITE, corner_radius=12, border_color=CARD_BORDER, border_width=1)
+        table_frame.pack(fill="both", expand=True, padx=20, pady=(0, 10))
+        tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=height)
+        for column, width in zip(columns, widths):
+            tree.heading(column, text=column)
+            tree.column(column, width=width, anchor="w" if column in ("Query", "Caller", "Operation", "Origin") else "center")
+        scrollbar = ctk.CTkScrollbar(table_frame, orientation="vertical", command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side="left", fill="both", expand=True, pady=10)
+        scrollbar.pack(side="right", fill="y", pady=10)
+        return tree
+
+    def create_widgets(self):
+        """
+        Creates and lays out the widgets for the database metrics page.
+        """
+        title_label = ctk.CTkLabel(self, text="Database Metrics", font=("Arial", 40, "bold"), text_color=DARK_BLUE)
+        title_label.pack(pady=(18, 8))
+        # Top action bar
+        top_bar = ctk.CTkFrame(self, fg_color=LIGHT_BLUE, corner_radius=10)
+        top_bar.pack(fill="x", padx=20, pady=(0, 10))
+        self.summary_label = ctk.CTkLabel(top_bar, text="", font=("Arial", 14), text_color=DARK_BLUE)
+        self.summary_label.pack(side="left", padx=10, pady=10)
+        ctk.CTkButton(top_bar, text="Reset", command=self.reset_metrics, fg_color=RED, hover_color="#c0392b", text_color=WHITE, font=("Arial", 15, "bold"), width=90).pack(side="right", padx=5, pady=10)
+        ctk.CTkButton(top_bar, text="Refresh", command=self.load_metrics, fg_color=BLUE, hover_color=DARK_BLUE, text_color=WHITE, font=("Arial", 15, "bold"), width=90).pack(side="right", padx=5, pady=10)
+
+        style = ttk.Style()
+        style.configure("Treeview", font=("Arial", 12), rowheight=32, background=WHITE, fieldbackground=WHITE)
+        style.configure("Treeview.Heading", font=("Arial", 15, "bold"), background=LIGHT_BLUE, foreground=DARK_BLUE)
+        style.map("Treeview", background=[('selected', DARK_BLUE)])
+
+        tables = ctk.CTkScrollableFrame(self, fg_color=GREY)
+        tables.pack(fill="both", expand=True)
+
+        ctk.CTkLabel(tables, text="Queries (by total time)", font=("Arial", 18, "bold"), text_color=DARK_BLUE).pack(anchor="w", padx=20, pady=(5, 5))
+        self.queries_tree = self._create_table(
+            tables, ("Query", "Calls", "Rows", "Total ms", "Avg ms", "Max ms", "Errors"),
+            (520, 70, 80, 90, 80, 80, 70), 8
+        )
+        ctk.CTkLabel(tables, text="Callers (by total time, estimated from sampled queries)", font=("Arial", 18, "bold"), text_color=DARK_BLUE).pack(anchor="w", padx=20, pady=(5, 5))
+        self.callers_tree = self._create_table(
+            tables, ("Caller", "Calls", "Rows", "Total ms", "Avg ms", "Max ms", "Errors"),
+            (520, 70, 80, 90, 80, 80, 70), 6
+        )
+        self.slow_label = ctk.CTkLabel(tables, text="Slow Queries", font=("Arial", 18, "bold"), text_color=DARK_BLUE)
+        self.slow_label.pack(anchor="w", padx=20, pady=(5, 5))
+        self.slow_tree = self._create_table(
+            tables, ("Time", "Duration ms", "Rows", "Caller", "Query"),
+            (150, 100, 70, 220, 450), 6
+        )
+        ctk.CTkLabel(tables, text="Repeated Queries per Operation (N+1)", font=("Arial", 18, "bold"), text_color=DARK_BLUE).pack(anchor="w", padx=20, pady=(5, 5))
+        self.n_plus_one_tree = self._create_table(
+            tables, ("Time", "Operation", "Calls", "Origin", "Query"),
+            (150, 220, 70, 300, 420), 6
+        )
+
+    def load_metrics(self):
+        """
+        Loads the current query statistics and pool usage into the tables.
+        """
+        snapshot = self.db.query_stats.snapshot()
+        for tree in (self.queries_tree, self.callers_tree, self.slow_tree, self.n_plus_one_tree):
+            for item in tree.get_children():
+                tree.delete(item)
+
+        for entry in snapshot["queries"]:
+            self.queries_tree.insert("", "end", values=(
+                entry["query"], entry["calls"], entry["rows"], entry["total_ms"], entry["avg_ms"], entry["max_ms"], entry["errors"]
+            ))
+        for entry in snapshot["callers"]:
+            self.callers_tree.insert("", "end", values=(
+                entry["caller"], entry["calls"], entry["rows"], entry["total_ms"], entry["avg_ms"], entry["max_ms"], entry["errors"]
+            ))
+        for entry in reversed(snapshot["slow_queries"]): # Most recent first
+            self.slow_tree.insert("", "end", values=(
+                entry["timestamp"], entry["duration_ms"], entry["rows"], entry["caller"], entry["query"]
+            ))
+        for report in reversed(self.db.profiler.reports()):
+            for entry in report["repeated"]:
+                self.n_plus_one_tree.insert("", "end", values=(
+                    report["timestamp"], report["operation"], entry["calls"], " <- ".join(entry["origin"]), entry["query"]
+                ))
+
+        self.slow_label.configure(text=f"Slow Queries (>= {snapshot['slow_query_threshold_ms']} ms)")
+        summary = f"Collecting since {snapshot['since']}"
+        if self.db.pool:
+            pool = self.db.pool.stats()
+            summary += f"  |  Pool: {pool['in_use']} in use, {pool['idle']} idle, {pool['open']}/{pool['max_size']} open"
+        cache = self.db.query_cache.stats()
+        summary += f"  |  Cache: {cache['entries']} entries, {cache['hits']} hits, {cache['misses']} misses"
+        self.summary_label.configure(text=summary)
+
+    def reset_metrics(self):
+        """
+        Clears the collected query statistics and N+1 reports after confirmation.
+        """
+        if messagebox.askyesno("Reset Metrics", "Clear all collected query statistics?"):
+            self.db.query_stats.reset()
+            self.db.profiler.reset()
+            self.load_metrics()
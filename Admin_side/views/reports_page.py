@@ -1,12 +1,12 @@
 # views/reports_page.py
 
 import customtkinter as ctk
-from tkinter import messagebox, ttk
+from tkinter import messagebox, ttk, filedialog
 from controllers.report_controller import ReportController
 from controllers.course_controller import CourseController # For filter dropdowns
 from controllers.faculty_controller import FacultyController # For filter dropdowns
 import json # For pretty printing JSON feedback
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import os
 
 # Color constants matching the dashboard theme
@@ -30,6 +30,7 @@ class ReportsPage(ctk.CTkFrame):
         self.rowconfigure(1, weight=1) # Allow treeview to expand
 
         self.current_report_data = None # Store the last generated report
+        self.current_filters = {} # Filters of the last generated report, reused by the raw export
         self.graph_images = {}  # To keep references to PhotoImage objects
 
         self.create_widgets()
@@ -133,6 +134,12 @@ class ReportsPage(ctk.CTkFrame):
         ctk.CTkButton(export_frame, text="Export to PDF", command=lambda: self.export_report("pdf"),
                      fg_color=BLUE, hover_color=DARK_BLUE, text_color=WHITE,
                      font=("Arial", 16), height=35, corner_radius=8).pack(side="left", padx=5) # PDF support noted as partial
+        ctk.CTkButton(export_frame, text="Export Graphs", command=self.export_graphs,
+                     fg_color=BLUE, hover_color=DARK_BLUE, text_color=WHITE,
+                     font=("Arial", 16), height=35, corner_radius=8).pack(side="left", padx=5)
+        ctk.CTkButton(export_frame, text="Export Raw Responses", command=self.export_raw_responses,
+                     fg_color=BLUE, hover_color=DARK_BLUE, text_color=WHITE,
+                     font=("Arial", 16), height=35, corner_radius=8).pack(side="left", padx=5)
 
     def load_filter_options(self):
         # Load courses
@@ -169,12 +176,8 @@ class ReportsPage(ctk.CTkFrame):
         template_id_str = self.template_id_entry.get().strip()
         template_id = int(template_id_str) if template_id_str.isdigit() else None
 
-        report_result = self.report_controller.get_aggregated_evaluation_report(
-            course_code=course_code,
-            batch=batch,
-            faculty_id=faculty_id,
-            template_id=template_id
-        )
+        self.current_filters = {"course_code": course_code, "batch": batch, "faculty_id": faculty_id, "template_id": template_id}
+        report_result = self.report_controller.get_aggregated_evaluation_report(**self.current_filters)
 
         self.current_report_data = report_result['report_data']
 
@@ -185,6 +188,9 @@ class ReportsPage(ctk.CTkFrame):
 
         self.summary_label.configure(text=f"Total Submissions: {report_result['total_submissions']}")
 
+        if report_result.get('error'):
+            messagebox.showerror("Error", report_result['summary'])
+            return
         if report_result['total_submissions'] == 0:
             ctk.CTkMessagebox.show_info("Report", report_result['summary'])
             return
@@ -194,21 +200,15 @@ class ReportsPage(ctk.CTkFrame):
             widget.destroy()
         self.graph_images.clear()
         
-        # Generate and display graphs
-        graph_paths = self.report_controller.generate_question_graphs(self.current_report_data)
-        for idx, (question_text, img_path) in enumerate(graph_paths.items()):
-            if os.path.exists(img_path):
-                try:
-                    img = Image.open(img_path)
-                    img = img.resize((400, 300), Image.ANTIALIAS)
-                    photo = ImageTk.PhotoImage(img)
-                except Exception:
-                    photo = ImageTk.PhotoImage(file=img_path)
-                self.graph_images[question_text] = photo
-                label = ctk.CTkLabel(self.graph_canvas_frame, text=question_text, font=("Arial", 17, "bold"), text_color=DARK_BLUE)
-                label.pack(pady=(20 if idx > 0 else 10, 5))
-                img_label = ctk.CTkLabel(self.graph_canvas_frame, image=photo, text="")
-                img_label.pack(pady=5)
+        # Generate and display graphs (rendered in memory at display size; files only on "Export Graphs")
+        charts = self.report_controller.get_question_charts(self.current_report_data, 400, 300)
+        for idx, (question_text, image) in enumerate(charts.items()):
+            photo = ImageTk.PhotoImage(image)
+            self.graph_images[question_text] = photo
+            label = ctk.CTkLabel(self.graph_canvas_frame, text=question_text, font=("Arial", 17, "bold"), text_color=DARK_BLUE)
+            label.pack(pady=(20 if idx > 0 else 10, 5))
+            img_label = ctk.CTkLabel(self.graph_canvas_frame, image=photo, text="")
+            img_label.pack(pady=5)
 
         # Display report data in treeview
         for question_text, q_data in self.current_report_data.items():
@@ -263,3 +263,34 @@ class ReportsPage(ctk.CTkFrame):
         except Exception as e:
             ctk.CTkMessagebox.show_error("Error", f"Export failed: {str(e)}")
 
+    def export_graphs(self):
+        """Writes the current report's charts as PNG files into a folder chosen by the user."""
+        if not self.current_report_data:
+            messagebox.showwarning("No Data", "Please generate a report first.")
+            return
+        output_dir = filedialog.askdirectory(title="Export Graphs To")
+        if not output_dir:
+            return
+        try:
+            image_paths = self.report_controller.generate_question_graphs(self.current_report_data, output_dir)
+            messagebox.showinfo("Success", f"Exported {len(image_paths)} graph(s) to {output_dir}.")
+        except OSError as e:
+            messagebox.showerror("Error", f"Graph export failed: {e}")
+
+    def export_raw_responses(self):
+        """Exports every submission matching the current report's filters, one row per submission."""
+        if not self.current_report_data:
+            messagebox.showwarning("No Data", "Please generate a report first.")
+            return
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("Excel files", "*.xlsx"), ("Parquet files", "*.parquet")]
+        )
+        if not file_path:
+            return
+        file_type = os.path.splitext(file_path)[1].lstrip('.').lower()
+        success, message = self.report_controller.export_raw_responses(file_path, file_type, **self.current_filters)
+        if success:
+            messagebox.showinfo("Success", message)
+        else:
+            messagebox.showerror("Error", message)
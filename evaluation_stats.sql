@@ -0,0 +1,34 @@
+-- Materialized answer counts for evaluation reports (see Admin_side/controllers/evaluation_stats_controller.py)
+-- The student API updates these tables in the same transaction as each submission.
+-- They are optional: until they exist, submissions and template updates skip them and reports are
+-- aggregated in Python. After creating them on an existing database, restart the student API (which
+-- checks for them once per process), then backfill them once with:
+--   cd Admin_side && python -m controllers.evaluation_stats_controller
+-- Only template deletions cascade to these tables (course_code '' has no course to reference):
+-- CourseController.delete_course() removes a deleted course's counts in the same transaction, and
+-- evaluations deleted any other way need EvaluationStatsController.rebuild(template_id).
+USE CourseEvaluationSystem;
+
+-- One row per (template, course, question, answer option): how often that option was chosen
+CREATE TABLE IF NOT EXISTS evaluation_question_stats (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    template_id BIGINT NOT NULL,
+    course_code VARCHAR(20) NOT NULL DEFAULT '', -- '' for batch/session-only evaluations, so the unique key also covers them
+    question_no INT NOT NULL, -- Position of the question in the template's questions_set
+    question_text TEXT NOT NULL,
+    question_type VARCHAR(32) NOT NULL, -- 'rating' or 'multiple_choice'
+    answer_option VARCHAR(255) NOT NULL,
+    responses INT NOT NULL DEFAULT 0,
+    rating_sum BIGINT NOT NULL DEFAULT 0, -- Sum of the numeric ratings, for averages (rating questions only)
+    UNIQUE (template_id, course_code, question_no, answer_option),
+    FOREIGN KEY (template_id) REFERENCES evaluation_templates(id) ON DELETE CASCADE
+);
+
+-- Number of submissions per (template, course)
+CREATE TABLE IF NOT EXISTS evaluation_submission_stats (
+    template_id BIGINT NOT NULL,
+    course_code VARCHAR(20) NOT NULL DEFAULT '',
+    submissions INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (template_id, course_code),
+    FOREIGN KEY (template_id) REFERENCES evaluation_templates(id) ON DELETE CASCADE
+);
@@ -0,0 +1,52 @@
+-- Indexes and cache versions for the student dashboard's pending-evaluations query
+-- (PENDING_EVALUATIONS_QUERY in Admin_side/controllers/student_controller.py).
+-- Each branch of that query is a lookup on one of these, so it reads only the student's
+-- own assignments and completion rows, however many templates there are.
+-- Run it on existing databases (student API submissions bump their row in cache_versions); it can be
+-- re-run safely: each index is created only if information_schema.statistics does not list it yet.
+-- Until cache_versions exists, writes still succeed but the student API does not cache pending lists.
+USE CourseEvaluationSystem;
+
+-- Courses of a student (individual assignment) and of a batch (batch assignment)
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'course_student' AND index_name = 'idx_course_student_student') = 0,
+    'CREATE INDEX idx_course_student_student ON course_student (student_id, course_code)', 'DO 0');
+PREPARE ddl FROM @ddl; EXECUTE ddl; DEALLOCATE PREPARE ddl;
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'course_student' AND index_name = 'idx_course_student_batch') = 0,
+    'CREATE INDEX idx_course_student_batch ON course_student (batch, student_id, course_code)', 'DO 0');
+PREPARE ddl FROM @ddl; EXECUTE ddl; DEALLOCATE PREPARE ddl;
+
+-- Ongoing templates of a course, batch or session
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'evaluation_templates' AND index_name = 'idx_evaluation_templates_course') = 0,
+    'CREATE INDEX idx_evaluation_templates_course ON evaluation_templates (course_code, last_date)', 'DO 0');
+PREPARE ddl FROM @ddl; EXECUTE ddl; DEALLOCATE PREPARE ddl;
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'evaluation_templates' AND index_name = 'idx_evaluation_templates_batch') = 0,
+    'CREATE INDEX idx_evaluation_templates_batch ON evaluation_templates (batch, last_date)', 'DO 0');
+PREPARE ddl FROM @ddl; EXECUTE ddl; DEALLOCATE PREPARE ddl;
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'evaluation_templates' AND index_name = 'idx_evaluation_templates_session') = 0,
+    'CREATE INDEX idx_evaluation_templates_session ON evaluation_templates (session, last_date)', 'DO 0');
+PREPARE ddl FROM @ddl; EXECUTE ddl; DEALLOCATE PREPARE ddl;
+
+-- Completed evaluations of a student
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'evaluation_completion' AND index_name = 'idx_evaluation_completion_student') = 0,
+    'CREATE INDEX idx_evaluation_completion_student ON evaluation_completion (student_id, template_id, is_completed)', 'DO 0');
+PREPARE ddl FROM @ddl; EXECUTE ddl; DEALLOCATE PREPARE ddl;
+
+-- Version counters for the student API's cache of pending evaluations (Admin_side/api/pending_cache.py):
+-- 'pending_evaluations' is bumped by the admin app on assignment and deadline changes,
+-- 'pending_evaluations:<student_id>' on that student's submissions. API processes poll rows by updated_at.
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name VARCHAR(64) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'cache_versions' AND index_name = 'idx_cache_versions_updated_at') = 0,
+    'CREATE INDEX idx_cache_versions_updated_at ON cache_versions (updated_at)', 'DO 0');
+PREPARE ddl FROM @ddl; EXECUTE ddl; DEALLOCATE PREPARE ddl;
@@ -0,0 +1,24 @@
+-- Student API session tokens (see Admin_side/api/session_store.py), used when
+-- SESSION_STORE_CONFIG['backend'] is 'database' so every API worker process shares the sessions.
+USE CourseEvaluationSystem;
+
+CREATE TABLE IF NOT EXISTS student_sessions (
+    token_hash CHAR(64) PRIMARY KEY, -- SHA-256 of the token; the token itself is never stored
+    student_id BIGINT NOT NULL,
+    expires_at DATETIME NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE
+);
+
+-- Expired sessions are purged by expires_at (created only if missing, so the script can be re-run)
+SET @ddl = IF((SELECT COUNT(*) FROM information_schema.statistics
+    WHERE table_schema = DATABASE() AND table_name = 'student_sessions' AND index_name = 'idx_student_sessions_expires_at') = 0,
+    'CREATE INDEX idx_student_sessions_expires_at ON student_sessions (expires_at)', 'DO 0');
+PREPARE ddl FROM @ddl; EXECUTE ddl; DEALLOCATE PREPARE ddl;
+
+-- Logged-out signed tokens (SESSION_STORE_CONFIG['backend'] = 'signed' with 'revocations': 'database').
+-- Rows are only needed until the token would have expired anyway.
+CREATE TABLE IF NOT EXISTS revoked_student_tokens (
+    token_id CHAR(16) PRIMARY KEY, -- The token's random 'jti' claim
+    expires_at DATETIME NOT NULL
+);